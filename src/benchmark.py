@@ -0,0 +1,225 @@
+import argparse
+import random
+import timeit
+from copy import deepcopy
+from pathlib import Path
+from typing import Any, Callable
+
+from ratroyale.backend.action_log import replay
+from ratroyale.backend.ai.random_ai import RandomAI
+from ratroyale.backend.board_template import BoardTemplate
+from ratroyale.backend.game_manager import GameManager
+from ratroyale.backend.map import Map
+from ratroyale.backend.player_info.player_info import PlayerInfo
+from ratroyale.backend.player_info.squeak import Squeak
+from ratroyale.backend.player_info.squeaks.rodents.duelist import (
+    CLANKER,
+    MORTAR,
+    PEA_PEA_POOL_POOL,
+    RAIL_RODENT,
+    RATBERT_BREWBELLY,
+    SODA_KABOOMA,
+)
+from ratroyale.backend.player_info.squeaks.rodents.specialist import MAYO, THE_ONE
+from ratroyale.backend.player_info.squeaks.rodents.support import QUARTERMASTER
+from ratroyale.backend.player_info.squeaks.rodents.tank import CRACKER
+from ratroyale.backend.player_info.squeaks.rodents.vanguard import (
+    TAILBLAZER,
+    TAILTRAIL,
+)
+from ratroyale.backend.player_info.squeaks.tricks.offense import SUNDIAL
+from ratroyale.backend.side import Side
+
+MAP_PATH = Path(__file__).parent / "ratroyale/assets/rrmaps/starting-kitchen.rrmap"
+SQUEAKS: list[Squeak] = [
+    CLANKER,
+    CRACKER,
+    MAYO,
+    MORTAR,
+    PEA_PEA_POOL_POOL,
+    QUARTERMASTER,
+    RAIL_RODENT,
+    RATBERT_BREWBELLY,
+    SODA_KABOOMA,
+    SUNDIAL,
+    TAILBLAZER,
+    TAILTRAIL,
+    THE_ONE,
+]
+
+
+def create_player_info(hand: list[Squeak]) -> PlayerInfo:
+    deck = {squeak: 2 for squeak in SQUEAKS}
+    return PlayerInfo(
+        deck,
+        [deck],
+        [{squeak: 1 for squeak in hand}],
+        selected_squeak_set_index=0,
+        exp=0,
+        cheese=0,
+        is_progression_frozen=True,
+    )
+
+
+def load_map() -> Map:
+    game_map = Map.from_file(MAP_PATH)
+    if game_map is None:
+        raise ValueError(f"Cannot load {MAP_PATH}")
+    return game_map
+
+
+def create_players_info(seed: int) -> tuple[PlayerInfo, PlayerInfo]:
+    rng = random.Random(seed)
+    return (
+        create_player_info(rng.sample(SQUEAKS, 5)),
+        create_player_info(rng.sample(SQUEAKS, 5)),
+    )
+
+
+def create_mid_game(seed: int, turns: int) -> GameManager:
+    """Play a game between 2 random AIs for some turns"""
+    random.seed(seed)
+    game_manager = GameManager(
+        load_map(),
+        create_players_info(seed),
+        Side.RAT,
+        is_disable_reward=True,
+        seed=seed,
+    )
+    ais = {side: RandomAI(game_manager, side) for side in Side}
+    for _ in range(turns):
+        if game_manager.game_over_event is not None:
+            break
+        ais[game_manager.turn].run_ai_and_update_game_manager()
+        for _ in game_manager.event_queue:
+            pass
+    return game_manager
+
+
+def get_game_summary(game_manager: GameManager) -> list[str]:
+    return [
+        str(game_manager.turn_count),
+        str(game_manager.crumbs),
+        str(game_manager.hands),
+        str(game_manager.decks),
+        *(f"{entity} {entity.health}" for entity in game_manager.board.cache.entities),
+    ]
+
+
+def time_per_call(func: Callable[[], Any], number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def benchmark_snapshot(seed: int, turns: int, number: int) -> None:
+    game_manager = create_mid_game(seed, turns)
+    # Event queue holds a lock, which can't be deep copied
+    memo = {id(game_manager.event_queue): game_manager.event_queue}
+    snapshot = game_manager.snapshot()
+    results = {
+        "deepcopy": time_per_call(lambda: deepcopy(game_manager, memo.copy()), number),
+        "snapshot": time_per_call(game_manager.snapshot, number),
+        "restore": time_per_call(lambda: game_manager.restore(snapshot), number),
+    }
+    print(
+        f"Turn {game_manager.turn_count}, "
+        f"{len(game_manager.board.cache.entities)} entities, "
+        f"{len(game_manager.board.cache.effects)} effects, "
+        f"{len(game_manager.board.cache.timers)} timers"
+    )
+    for name, seconds in results.items():
+        print(f"{name:>10}: {seconds * 1e6:10.1f} µs")
+    speedup = results["deepcopy"] / (results["snapshot"] + results["restore"])
+    print(f"snapshot + restore is {speedup:.1f}x faster than deepcopy")
+
+
+def benchmark_journal(seed: int, turns: int, number: int) -> None:
+    game_manager = create_mid_game(seed, turns)
+
+    def end_turn_and_restore() -> None:
+        snapshot = game_manager.snapshot()
+        game_manager.end_turn()
+        game_manager.restore(snapshot)
+
+    def end_turn_and_rollback() -> None:
+        journal = game_manager.begin_journal()
+        game_manager.end_turn()
+        game_manager.rollback(journal)
+
+    results = {
+        "snapshot": time_per_call(end_turn_and_restore, number),
+        "journal": time_per_call(end_turn_and_rollback, number),
+    }
+    print(f"Turn {game_manager.turn_count}, end turn then undo it")
+    for name, seconds in results.items():
+        print(f"{name:>10}: {seconds * 1e6:10.1f} µs")
+    speedup = results["snapshot"] / results["journal"]
+    print(f"journal is {speedup:.1f}x faster than snapshot")
+
+
+def benchmark_replay(seed: int, turns: int, number: int) -> None:
+    game_manager = create_mid_game(seed, turns)
+    action_log = game_manager.action_log
+    players_info = create_players_info(seed)
+    replayed, events = replay(load_map(), players_info, action_log)
+    if get_game_summary(replayed) != get_game_summary(game_manager):
+        raise ValueError("Replayed game doesn't match the recorded game")
+    seconds = time_per_call(
+        lambda: replay(load_map(), players_info, action_log, events), number
+    )
+    print(
+        f"Turn {game_manager.turn_count}, {len(action_log)} actions, "
+        f"{len(action_log.save())} bytes"
+    )
+    print(f"{'replay':>10}: {seconds * 1e3:10.2f} ms")
+
+
+def benchmark_setup(seed: int, turns: int, number: int) -> None:
+    game_map = load_map()
+    players_info = create_players_info(seed)
+    board_template = BoardTemplate(game_map)
+
+    def create_game(board_template: BoardTemplate | None) -> GameManager:
+        return GameManager(
+            game_map,
+            players_info,
+            Side.RAT,
+            is_disable_reward=True,
+            seed=seed,
+            board_template=board_template,
+        )
+
+    results = {
+        "map": time_per_call(lambda: create_game(None), number),
+        "template": time_per_call(lambda: create_game(board_template), number),
+    }
+    print(
+        f"{game_map.size_x}x{game_map.size_y} map, "
+        f"{len(game_map.features)} features, {len(game_map.entities)} entities, "
+        "set up a game"
+    )
+    for name, seconds in results.items():
+        print(f"{name:>10}: {seconds * 1e6:10.1f} µs")
+    speedup = results["map"] / results["template"]
+    print(f"template is {speedup:.1f}x faster than map")
+
+
+BENCHMARKS = {
+    "snapshot": benchmark_snapshot,
+    "journal": benchmark_journal,
+    "replay": benchmark_replay,
+    "setup": benchmark_setup,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark game backend")
+    parser.add_argument("benchmark", choices=BENCHMARKS.keys())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--number", type=int, default=20)
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args.seed, args.turns, args.number)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
+import heapq
 from dataclasses import dataclass, field
 from math import sqrt
-from queue import PriorityQueue
 from typing import Callable, Iterator, Protocol, Self
 
 from ..utils import lerp
@@ -22,6 +22,67 @@ def _coord_never_blocked(target_coord: "OddRCoord", source_coord: "OddRCoord") -
     return False
 
 
+# Hex lines and ranges are translation invariant in axial space, so they're
+# computed once around the origin and reused as offsets for every coord. Only
+# offsets up to `_TEMPLATE_MAX_REACH` are kept so the caches stay bounded, any
+# further one is computed on every call.
+_is_template_backend_enabled = True
+_TEMPLATE_MAX_REACH = 32
+_line_templates: dict[tuple[int, int], tuple[tuple[int, int], ...]] = {}
+_disk_templates: dict[int, tuple[tuple[int, int], ...]] = {}
+
+
+def set_template_backend(is_enabled: bool) -> None:
+    """
+    Choose whether `line_draw` and `all_in_range` use cached offset templates
+    or compute every coord from scratch
+    """
+    global _is_template_backend_enabled
+    _is_template_backend_enabled = is_enabled
+
+
+def is_template_backend_enabled() -> bool:
+    return _is_template_backend_enabled
+
+
+def get_line_template(dq: int, dr: int) -> tuple[tuple[int, int], ...]:
+    """
+    :returns: Axial offsets that a line from origin to (dq, dr) passes through
+    """
+    template = _line_templates.get((dq, dr))
+    if template is None:
+        template = tuple(
+            (int(cube.q), int(cube.r))
+            for cube in _CubeCoord(0, 0, 0).line_draw(_CubeCoord(dq, dr, -dq - dr))
+        )
+        if max(abs(dq), abs(dr), abs(dq + dr)) <= _TEMPLATE_MAX_REACH:
+            _line_templates[(dq, dr)] = template
+    return template
+
+
+def get_disk_template(N: int) -> tuple[tuple[int, int], ...]:
+    """
+    :returns: Axial offsets of every coord within N of origin
+    """
+    template = _disk_templates.get(N)
+    if template is None:
+        template = tuple(
+            (axial.q, axial.r) for axial in _AxialCoord(0, 0).all_in_range(N)
+        )
+        if N <= _TEMPLATE_MAX_REACH:
+            _disk_templates[N] = template
+    return template
+
+
+def precompute_templates(max_reach: int) -> None:
+    """
+    Fill line templates of every offset within max_reach ahead of time, as far
+    as the templates are cached
+    """
+    for dq, dr in get_disk_template(min(max_reach, _TEMPLATE_MAX_REACH)):
+        get_line_template(dq, dr)
+
+
 @dataclass(frozen=True)
 class OddRCoord:
     """
@@ -63,10 +124,27 @@ class OddRCoord:
         return self.to_cube().get_distance(other.to_cube())
 
     def line_draw(self, other: Self) -> Iterator["OddRCoord"]:
-        return (cube.to_odd_r() for cube in self.to_cube().line_draw(other.to_cube()))
+        if not _is_template_backend_enabled:
+            return (
+                cube.to_odd_r() for cube in self.to_cube().line_draw(other.to_cube())
+            )
+        axial = self.to_axial()
+        other_axial = other.to_axial()
+        return (
+            _AxialCoord(axial.q + dq, axial.r + dr).to_odd_r()
+            for dq, dr in get_line_template(
+                other_axial.q - axial.q, other_axial.r - axial.r
+            )
+        )
 
     def all_in_range(self, N: int) -> Iterator["OddRCoord"]:
-        return (axial.to_odd_r() for axial in self.to_axial().all_in_range(N))
+        if not _is_template_backend_enabled:
+            return (axial.to_odd_r() for axial in self.to_axial().all_in_range(N))
+        axial = self.to_axial()
+        return (
+            _AxialCoord(axial.q + dq, axial.r + dr).to_odd_r()
+            for dq, dr in get_disk_template(N)
+        )
 
     def to_pixel(
         self,
@@ -169,7 +247,7 @@ class OddRCoord:
         self,
         goal: "OddRCoord",
         is_coord_blocked: IsCoordBlocked,
-        get_cost: Callable[["OddRCoord", "OddRCoord"], float] = lambda a, b: 1.0,
+        get_cost: Callable[["OddRCoord", "OddRCoord"], float] | None = None,
     ) -> list["OddRCoord"] | None:
         """
         https://www.redblobgames.com/pathfinding/a-star/introduction.html#astar
@@ -178,28 +256,29 @@ class OddRCoord:
 
         :param goal: Goal coord
         :param is_coord_blocked: A callback function that evaluate whether target coord is accessible from source coord
-        :param get_cost: A callback function to evaluate cost to travel from first coord to second coord, defaults to `lambda: a, b: 1.0`
+        :param get_cost: A callback function to evaluate cost to travel from first coord to second coord, defaults to 1.0 per step
         :returns: Path calculated or None if goal is not reachable
         """
-        frontier: PriorityQueue[_AStarCoord] = PriorityQueue()
-        frontier.put(_AStarCoord(0, self))
+        frontier: list[_AStarCoord] = [_AStarCoord(0, self)]
         came_from: dict[OddRCoord, OddRCoord | None] = {self: None}
         cost_so_far: dict[OddRCoord, float] = {self: 0}
 
-        while not frontier.empty():
-            current = frontier.get().coord
+        while frontier:
+            current = heapq.heappop(frontier).coord
             if current == goal:
                 break
             for next_coord in current.get_neighbors():
                 if is_coord_blocked(next_coord, current):
                     continue
 
-                new_cost = cost_so_far[current] + get_cost(current, next_coord)
+                new_cost = cost_so_far[current] + (
+                    1.0 if get_cost is None else get_cost(current, next_coord)
+                )
 
                 if next_coord not in cost_so_far or new_cost < cost_so_far[next_coord]:
                     cost_so_far[next_coord] = new_cost
                     priority = new_cost + goal.get_distance(next_coord)
-                    frontier.put(_AStarCoord(priority, next_coord))
+                    heapq.heappush(frontier, _AStarCoord(priority, next_coord))
                     came_from[next_coord] = current
 
         if goal not in came_from:
@@ -214,6 +293,70 @@ class OddRCoord:
         path.reverse()
         return path
 
+    def path_find_bidirectional(
+        self, goal: "OddRCoord", is_coord_blocked: IsCoordBlocked
+    ) -> list["OddRCoord"] | None:
+        """
+        Breadth first search from both self and goal at the same time with
+        unit cost. Faster than `path_find` for long paths, but may return a
+        different path of the same length.
+
+        :param goal: Goal coord
+        :param is_coord_blocked: A callback function that evaluate whether target coord is accessible from source coord
+        :returns: Path calculated or None if goal is not reachable
+        """
+        if self == goal:
+            return []
+        forward_parents: dict[OddRCoord, OddRCoord | None] = {self: None}
+        backward_parents: dict[OddRCoord, OddRCoord | None] = {goal: None}
+        forward_fringe = [self]
+        backward_fringe = [goal]
+        meeting_coord: OddRCoord | None = None
+
+        # Expand a whole layer of the smaller side at a time. The first coord
+        # seen by both sides lies on a shortest path.
+        while forward_fringe and backward_fringe and meeting_coord is None:
+            is_forward = len(forward_fringe) <= len(backward_fringe)
+            fringe = forward_fringe if is_forward else backward_fringe
+            parents = forward_parents if is_forward else backward_parents
+            other_parents = backward_parents if is_forward else forward_parents
+            next_fringe: list[OddRCoord] = []
+            for coord in fringe:
+                for neighbor in coord.get_neighbors():
+                    if neighbor in parents:
+                        continue
+                    if is_forward and is_coord_blocked(neighbor, coord):
+                        continue
+                    if not is_forward and is_coord_blocked(coord, neighbor):
+                        continue
+                    parents[neighbor] = coord
+                    if neighbor in other_parents:
+                        meeting_coord = neighbor
+                        break
+                    next_fringe.append(neighbor)
+                if meeting_coord is not None:
+                    break
+            if is_forward:
+                forward_fringe = next_fringe
+            else:
+                backward_fringe = next_fringe
+
+        if meeting_coord is None:
+            return None
+
+        path = []
+        current: OddRCoord | None = meeting_coord
+        while current is not None:
+            path.append(current)
+            current = forward_parents[current]
+        path.pop()
+        path.reverse()
+        current = backward_parents[meeting_coord]
+        while current is not None:
+            path.append(current)
+            current = backward_parents[current]
+        return path
+
     def __str__(self) -> str:
         return f"({self.x}, {self.y})"
 
@@ -0,0 +1,306 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, ClassVar, Final, Iterable, Sequence
+
+from ratroyale.utils import DataPointer
+
+from .error import ReplayDesyncError
+from .hexagon import OddRCoord
+from .side import Side
+
+if TYPE_CHECKING:
+    from .entity import Entity
+    from .game_event import GameEvent
+    from .game_manager import GameManager
+    from .map import Map
+    from .player_info.player_info import PlayerInfo
+
+ACTION_LOG_FILE_EXTENSION = "rrlog"
+
+ENDIAN: Final = "big"
+
+
+@dataclass(frozen=True)
+class LoggedAction(ABC):
+    """
+    A player action that `GameManager` records in its `ActionLog`.
+    Entities are referred to by their position and their index on that tile.
+    """
+
+    ACTION_ID: ClassVar[int]
+    ALL_ACTIONS: ClassVar[dict[int, type["LoggedAction"]]] = {}
+
+    def __init_subclass__(cls) -> None:
+        if cls.ACTION_ID in LoggedAction.ALL_ACTIONS:
+            raise Exception(
+                f"{cls.__name__} and {LoggedAction.ALL_ACTIONS[cls.ACTION_ID]} both have the same action ID ({cls.ACTION_ID})"
+            )
+        LoggedAction.ALL_ACTIONS[cls.ACTION_ID] = cls
+
+    @abstractmethod
+    def apply(self, game_manager: "GameManager") -> None:
+        """Perform the action on the game manager"""
+        ...
+
+
+def get_entity_ref(
+    game_manager: "GameManager", entity: "Entity"
+) -> tuple[OddRCoord, int]:
+    tile = game_manager.board.get_tile(entity.pos)
+    if tile is None:
+        raise ValueError("Entity is not on the board")
+    return entity.pos, tile.entities.index(entity)
+
+
+def get_entity_from_ref(
+    game_manager: "GameManager", pos: OddRCoord, entity_index: int
+) -> "Entity":
+    tile = game_manager.board.get_tile(pos)
+    if tile is None or entity_index >= len(tile.entities):
+        raise ReplayDesyncError(f"There's no entity {entity_index} at {pos}")
+    return tile.entities[entity_index]
+
+
+@dataclass(frozen=True)
+class MoveRodentAction(LoggedAction):
+    ACTION_ID = 1
+    pos: OddRCoord
+    entity_index: int
+    target: OddRCoord
+
+    def apply(self, game_manager: "GameManager") -> None:
+        from .entities.rodent import Rodent
+
+        rodent = get_entity_from_ref(game_manager, self.pos, self.entity_index)
+        if not isinstance(rodent, Rodent):
+            raise ReplayDesyncError(f"{rodent} at {self.pos} is not a rodent")
+        game_manager.move_rodent(rodent, self.target)
+
+
+@dataclass(frozen=True)
+class ActivateSkillAction(LoggedAction):
+    ACTION_ID = 2
+    pos: OddRCoord
+    entity_index: int
+    skill_index: int
+
+    def apply(self, game_manager: "GameManager") -> None:
+        entity = get_entity_from_ref(game_manager, self.pos, self.entity_index)
+        game_manager.activate_skill(entity, self.skill_index)
+
+
+@dataclass(frozen=True)
+class SelectTargetsAction(LoggedAction):
+    ACTION_ID = 3
+    targets: tuple[OddRCoord, ...]
+
+    def apply(self, game_manager: "GameManager") -> None:
+        game_manager.apply_skill_callback(list(self.targets))
+
+
+@dataclass(frozen=True)
+class CancelTargetingAction(LoggedAction):
+    ACTION_ID = 4
+
+    def apply(self, game_manager: "GameManager") -> None:
+        game_manager.cancel_selecting_target()
+
+
+@dataclass(frozen=True)
+class PlaceSqueakAction(LoggedAction):
+    ACTION_ID = 5
+    hand_index: int
+    coord: OddRCoord
+
+    def apply(self, game_manager: "GameManager") -> None:
+        game_manager.place_squeak(self.hand_index, self.coord)
+
+
+@dataclass(frozen=True)
+class EndTurnAction(LoggedAction):
+    ACTION_ID = 6
+
+    def apply(self, game_manager: "GameManager") -> None:
+        game_manager.end_turn()
+
+
+@dataclass
+class ActionLog:
+    """
+    Seed and every player action of a game. Together with the map and both
+    players' info, it's enough to play the exact same game again.
+    """
+
+    seed: int
+    player_1: Side
+    actions: list[LoggedAction] = field(default_factory=list)
+
+    _FORMAT_SPEC = """
+        8 bytes for `seed`
+        1 byte for `player_1`
+        4 bytes for action_count
+        loop action_count times {
+            1 byte for action's ACTION_ID
+            if MoveRodentAction {
+                2 bytes for `pos.x`
+                2 bytes for `pos.y`
+                1 byte for `entity_index`
+                2 bytes for `target.x`
+                2 bytes for `target.y`
+            }
+            if ActivateSkillAction {
+                2 bytes for `pos.x`
+                2 bytes for `pos.y`
+                1 byte for `entity_index`
+                1 byte for `skill_index`
+            }
+            if SelectTargetsAction {
+                1 byte for target_count
+                loop target_count times {
+                    2 bytes for target's `OddRCoord.x`
+                    2 bytes for target's `OddRCoord.y`
+                }
+            }
+            if PlaceSqueakAction {
+                1 byte for `hand_index`
+                2 bytes for `coord.x`
+                2 bytes for `coord.y`
+            }
+        }
+        """
+    """Binary format specification"""
+
+    def __len__(self) -> int:
+        return len(self.actions)
+
+    def append(self, action: LoggedAction) -> None:
+        self.actions.append(action)
+
+    @classmethod
+    def from_file(cls, file_path: Path) -> "ActionLog":
+        with file_path.open("rb") as file:
+            return cls.load(file.read())
+
+    def to_file(self, file_path: Path) -> None:
+        with file_path.open("wb") as file:
+            file.write(self.save())
+
+    def save(self) -> bytes:
+        data = bytearray()
+        data.extend(self.seed.to_bytes(8, ENDIAN))
+        data.append(Side.to_int(self.player_1))
+        data.extend(len(self.actions).to_bytes(4, ENDIAN))
+        for action in self.actions:
+            data.append(action.ACTION_ID)
+            match action:
+                case MoveRodentAction(pos, entity_index, target):
+                    _save_coord(data, pos)
+                    data.append(entity_index)
+                    _save_coord(data, target)
+                case ActivateSkillAction(pos, entity_index, skill_index):
+                    _save_coord(data, pos)
+                    data.append(entity_index)
+                    data.append(skill_index)
+                case SelectTargetsAction(targets):
+                    data.append(len(targets))
+                    for target in targets:
+                        _save_coord(data, target)
+                case PlaceSqueakAction(hand_index, coord):
+                    data.append(hand_index)
+                    _save_coord(data, coord)
+        return bytes(data)
+
+    @classmethod
+    def load(cls, data: bytes) -> "ActionLog":
+        data_pointer = DataPointer(data, ENDIAN)
+        seed = data_pointer.get_byte(8)
+        player_1 = Side.from_int(data_pointer.get_byte())
+        if player_1 is None:
+            raise ValueError("Player 1 cannot have side of None")
+        action_log = cls(seed, player_1)
+        for _ in range(data_pointer.get_byte(4)):
+            action_class = LoggedAction.ALL_ACTIONS[data_pointer.get_byte()]
+            action: LoggedAction
+            if action_class is MoveRodentAction:
+                action = MoveRodentAction(
+                    _load_coord(data_pointer),
+                    data_pointer.get_byte(),
+                    _load_coord(data_pointer),
+                )
+            elif action_class is ActivateSkillAction:
+                action = ActivateSkillAction(
+                    _load_coord(data_pointer),
+                    data_pointer.get_byte(),
+                    data_pointer.get_byte(),
+                )
+            elif action_class is SelectTargetsAction:
+                target_count = data_pointer.get_byte()
+                action = SelectTargetsAction(
+                    tuple(_load_coord(data_pointer) for _ in range(target_count))
+                )
+            elif action_class is PlaceSqueakAction:
+                action = PlaceSqueakAction(
+                    data_pointer.get_byte(), _load_coord(data_pointer)
+                )
+            else:
+                action = action_class()
+            action_log.append(action)
+        if not data_pointer.verify_end():
+            raise ValueError("Action log has trailing data")
+        return action_log
+
+
+def _save_coord(data: bytearray, coord: OddRCoord) -> None:
+    data.extend(coord.x.to_bytes(2, ENDIAN))
+    data.extend(coord.y.to_bytes(2, ENDIAN))
+
+
+def _load_coord(data_pointer: DataPointer) -> OddRCoord:
+    x = data_pointer.get_byte(2)
+    y = data_pointer.get_byte(2)
+    return OddRCoord(x, y)
+
+
+def replay(
+    map: "Map",
+    players_info: tuple["PlayerInfo", "PlayerInfo"],
+    action_log: ActionLog,
+    expected_events: Sequence[Sequence[str]] | None = None,
+) -> tuple["GameManager", list[list[str]]]:
+    """
+    Play every action in the log again without any rendering
+
+    :param expected_events: Events of each action as strings, raise
+        `ReplayDesyncError` at the first action that doesn't match
+    :returns: Game manager after the last action and events of each action
+        as strings, taken right after the action
+    """
+    from .game_manager import GameManager
+
+    game_manager = GameManager(
+        map,
+        players_info,
+        action_log.player_1,
+        is_disable_reward=True,
+        seed=action_log.seed,
+    )
+    _drain_events(game_manager.event_queue)
+    all_events: list[list[str]] = []
+    for action_index, action in enumerate(action_log.actions):
+        action.apply(game_manager)
+        events = _drain_events(game_manager.event_queue)
+        all_events.append(events)
+        if expected_events is None:
+            continue
+        if action_index >= len(expected_events):
+            raise ReplayDesyncError(f"No events expected for action {action_index}")
+        if events != list(expected_events[action_index]):
+            raise ReplayDesyncError(
+                f"Action {action_index} ({action}) expected {list(expected_events[action_index])} but got {events}"
+            )
+    return game_manager, all_events
+
+
+def _drain_events(events: Iterable["GameEvent"]) -> list[str]:
+    return [str(event) for event in events]
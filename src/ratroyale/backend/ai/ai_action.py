@@ -1,10 +1,13 @@
 from dataclasses import dataclass, field
-from typing import Sequence
+from typing import Any, Callable, Sequence, TypeVar
 
 from ..entity import CallableEntitySkill, Entity, SkillTargeting
 from ..hexagon import OddRCoord
 from ..player_info.squeak import Squeak
 
+AIAction_T = TypeVar("AIAction_T", bound="AIAction")
+ActionLoader = Callable[[], list[AIAction_T]] | None
+
 
 @dataclass(frozen=True)
 class AIAction:
@@ -66,12 +69,53 @@ class EndTurn(AIAction):
 
 
 class AIActions:
-    def __init__(self) -> None:
-        self.move_ally: list[MoveAlly] = []
-        self.activate_skill: list[ActivateSkill] = []
-        self.select_targets: list[SelectTargets] = []
-        self.place_squeak: list[PlaceSqueak] = []
-        self.end_turn: list[EndTurn] = []
+    """
+    Every action an AI can take, by category. A category with a loader is only
+    generated the first time it's used, so selectors that only look at some
+    categories don't pay for the others. Categories without a loader are empty.
+    """
+
+    CATEGORIES = (
+        "move_ally",
+        "activate_skill",
+        "select_targets",
+        "place_squeak",
+        "end_turn",
+    )
+
+    move_ally: list[MoveAlly]
+    activate_skill: list[ActivateSkill]
+    select_targets: list[SelectTargets]
+    place_squeak: list[PlaceSqueak]
+    end_turn: list[EndTurn]
+
+    def __init__(
+        self,
+        *,
+        move_ally: ActionLoader[MoveAlly] = None,
+        activate_skill: ActionLoader[ActivateSkill] = None,
+        select_targets: ActionLoader[SelectTargets] = None,
+        place_squeak: ActionLoader[PlaceSqueak] = None,
+        end_turn: ActionLoader[EndTurn] = None,
+    ) -> None:
+        loaders = (move_ally, activate_skill, select_targets, place_squeak, end_turn)
+        self._loaders: dict[str, Callable[[], list[Any]]] = {}
+        for category, loader in zip(self.CATEGORIES, loaders):
+            if loader is None:
+                setattr(self, category, [])
+            else:
+                self._loaders[category] = loader
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for categories that haven't been loaded yet
+        loaders: dict[str, Callable[[], list[Any]]] = self.__dict__.get("_loaders", {})
+        if name not in loaders:
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {name!r}"
+            )
+        actions = loaders.pop(name)()
+        setattr(self, name, actions)
+        return actions
 
     def flatten(self) -> Sequence[AIAction]:
         return (
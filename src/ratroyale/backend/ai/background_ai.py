@@ -0,0 +1,156 @@
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass
+
+from ..action_log import ActionLog, LoggedAction
+from ..game_manager import GameManager
+from ..map import Map
+from ..player_info.player_info import PlayerInfo
+from ..side import Side
+from .base_ai import BaseAI
+
+
+@dataclass(frozen=True)
+class AITurn:
+    """Actions the AI played in a turn, starting from `action_count` actions"""
+
+    action_count: int
+    actions: list[LoggedAction]
+
+
+class BackgroundAI:
+    """
+    Plays the AI's turns on a copy of the game in a worker process, so
+    whoever owns the game manager never blocks while the AI thinks. The chosen
+    actions come back in an `AITurn` to be applied with `apply_turn`.
+    """
+
+    def __init__(
+        self,
+        game_manager: GameManager,
+        ai_type: type[BaseAI],
+        ai_side: Side,
+        executor: Executor | None = None,
+    ) -> None:
+        """
+        :param executor: Executor the AI runs in. A process of its own if None.
+        """
+        self.game_manager = game_manager
+        self.ai_type = ai_type
+        self.ai_side = ai_side
+        self._is_owning_executor = executor is None
+        self._executor = executor
+        self._map = game_manager.map.save()
+
+    def is_ai_turn(self) -> bool:
+        if self.game_manager.game_over_event is not None:
+            return False
+        return self.game_manager.turn == self.ai_side
+
+    def start_turn(self) -> Future[AITurn]:
+        """Start playing the AI's turn from the current state of the game"""
+        if not self.is_ai_turn():
+            raise ValueError("Starting AI turn outside of the AI's turn")
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=1)
+        game_manager = self.game_manager
+        player_1_info = game_manager.players_info[game_manager.player_1]
+        player_2_info = game_manager.players_info[game_manager.player_1.other_side()]
+        return self._executor.submit(
+            _play_turn_in_worker,
+            _TurnTask(
+                self._map,
+                player_1_info.save(),
+                player_2_info.save(),
+                game_manager.action_log.save(),
+                self.ai_type,
+                Side.to_int(self.ai_side),
+            ),
+        )
+
+    def apply_turn(self, ai_turn: AITurn) -> bool:
+        """
+        Play the actions of the AI's turn on the game manager
+
+        :returns: Whether they were applied. They aren't if the game has moved
+            on since the turn started.
+        """
+        if len(self.game_manager.action_log) != ai_turn.action_count:
+            return False
+        for action in ai_turn.actions:
+            action.apply(self.game_manager)
+        return True
+
+    def play_turn(self) -> None:
+        """
+        Play the AI's turn on the game manager itself, blocking until it's
+        done. For when the turn couldn't be played in the background. If the
+        AI fails here too, its turn is ended so the game doesn't get stuck.
+        """
+        ai = self.ai_type(self.game_manager, self.ai_side)
+        try:
+            ai.run_ai_and_update_game_manager()
+        except Exception:
+            self.game_manager.cancel_selecting_target()
+            if self.is_ai_turn():
+                self.game_manager.end_turn()
+        finally:
+            ai.close()
+
+    def close(self) -> None:
+        if self._is_owning_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+
+@dataclass(frozen=True)
+class _TurnTask:
+    map: bytes
+    player_1_info: bytes
+    player_2_info: bytes
+    action_log: bytes
+    ai_type: type[BaseAI]
+    ai_side: int
+
+
+_worker_game: tuple[tuple[bytes, bytes, bytes], GameManager, BaseAI] | None = None
+"""Game and AI a worker played last time, reused if the game continued"""
+
+
+def _play_turn_in_worker(task: _TurnTask) -> AITurn:
+    global _worker_game
+    game_data = (task.map, task.player_1_info, task.player_2_info)
+    action_log = ActionLog.load(task.action_log)
+    ai_side = Side.from_int(task.ai_side)
+    assert ai_side is not None
+    game_manager = None
+    if _worker_game is not None and _worker_game[0] == game_data:
+        game_manager, ai = _worker_game[1], _worker_game[2]
+        played_actions = game_manager.action_log.actions
+        if (
+            game_manager.seed != action_log.seed
+            or type(ai) is not task.ai_type
+            or ai.ai_side != ai_side
+            or action_log.actions[: len(played_actions)] != played_actions
+        ):
+            ai.close()
+            game_manager = None
+    if game_manager is None:
+        game_manager = GameManager(
+            Map.load(task.map),
+            (PlayerInfo.load(task.player_1_info), PlayerInfo.load(task.player_2_info)),
+            action_log.player_1,
+            is_disable_reward=True,
+            seed=action_log.seed,
+        )
+        ai = task.ai_type(game_manager, ai_side)
+        _worker_game = (game_data, game_manager, ai)
+    for action in action_log.actions[len(game_manager.action_log) :]:
+        action.apply(game_manager)
+    for _ in game_manager.event_queue:
+        pass
+
+    action_count = len(game_manager.action_log)
+    ai.run_ai_and_update_game_manager()
+    for _ in game_manager.event_queue:
+        pass
+    return AITurn(action_count, game_manager.action_log.actions[action_count:])
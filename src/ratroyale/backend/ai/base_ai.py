@@ -1,9 +1,10 @@
 from abc import ABC, abstractmethod
-from itertools import chain, combinations, count
-from typing import Iterable
+import random
+from itertools import count
+from typing import Iterable, Iterator
 
 from ..entities.rodent import Rodent
-from ..entity import SkillCompleted, SkillTargeting
+from ..entity import SkillCompleted, SkillResult, SkillTargeting
 from ..error import NotAITurnError
 from ..game_manager import GameManager
 from ..side import Side
@@ -16,12 +17,29 @@ from .ai_action import (
     PlaceSqueak,
     SelectTargets,
 )
+from .incremental_actions import IncrementalActions
+from .target_combinations import TargetScore, iter_target_combinations
 
 
 class BaseAI(ABC):
+    max_select_targets: int | None = 1000
+    """
+    Most target combinations `_get_all_actions` gives for a skill, picked
+    evenly spaced so the same state always gives the same actions. None for
+    no limit.
+    """
+
     def __init__(self, game_manager: GameManager, ai_side: Side) -> None:
         self.game_manager = game_manager
         self.ai_side = ai_side
+        self.incremental_actions = IncrementalActions(game_manager, ai_side)
+        game_manager.event_queue.listeners.append(self.incremental_actions)
+
+    def close(self) -> None:
+        """Stop listening to the game manager's events"""
+        listeners = self.game_manager.event_queue.listeners
+        if self.incremental_actions in listeners:
+            listeners.remove(self.incremental_actions)
 
     def is_ai_turn(self) -> bool:
         if self.game_manager.game_over_event is not None:
@@ -60,33 +78,37 @@ class BaseAI(ABC):
                 except ValueError:
                     pass
             action = self.select_action(actions)
+            skill_result = self.perform_action(action)
             match action:
-                case EndTurn():
-                    self.game_manager.end_turn()
-                    is_banned_actions_updated = False
-                case MoveAlly(_, ally, target_coord, custom_path):
-                    if isinstance(ally, Rodent):
-                        self.game_manager.move_rodent(ally, target_coord, custom_path)
-                        is_banned_actions_updated = False
-                    else:
-                        self.game_manager.move_entity_uncheck(ally, target_coord)
-                        is_banned_actions_updated = False
-                case ActivateSkill(_, entity, skill_index):
-                    skill_result = self.game_manager.activate_skill(entity, skill_index)
+                case ActivateSkill():
                     if skill_result == SkillCompleted.CANCELLED:
                         banned_actions.append(action)
                         is_banned_actions_updated = True
                     elif skill_result == SkillCompleted.SUCCESS:
                         is_banned_actions_updated = False
-                case SelectTargets(skill_targeting, selected_targets):
-                    assert self.game_manager.skill_targeting is skill_targeting
-                    self.game_manager.apply_skill_callback(list(selected_targets))
-                    is_banned_actions_updated = False
-                case PlaceSqueak(_, target_coord, hand_index, _):
-                    self.game_manager.place_squeak(hand_index, target_coord)
-                    is_banned_actions_updated = False
                 case _:
-                    raise ValueError("action not handled")
+                    is_banned_actions_updated = False
+
+    def perform_action(self, action: AIAction) -> SkillResult | None:
+        """Apply the action to the game manager"""
+        match action:
+            case EndTurn():
+                self.game_manager.end_turn()
+            case MoveAlly(_, ally, target_coord, custom_path):
+                if isinstance(ally, Rodent):
+                    self.game_manager.move_rodent(ally, target_coord, custom_path)
+                else:
+                    self.game_manager.move_entity_uncheck(ally, target_coord)
+            case ActivateSkill(_, entity, skill_index):
+                return self.game_manager.activate_skill(entity, skill_index)
+            case SelectTargets(skill_targeting, selected_targets):
+                assert self.game_manager.skill_targeting is skill_targeting
+                return self.game_manager.apply_skill_callback(list(selected_targets))
+            case PlaceSqueak(_, target_coord, hand_index, _):
+                self.game_manager.place_squeak(hand_index, target_coord)
+            case _:
+                raise ValueError("action not handled")
+        return None
 
     @abstractmethod
     def select_action(self, actions: AIActions) -> AIAction:
@@ -103,54 +125,46 @@ class BaseAI(ABC):
         ...
 
     def _get_all_actions(self) -> AIActions:
+        """
+        Every action the AI can take right now. Each category is only
+        generated when it's used.
+        """
         skill_targeting = self.game_manager.skill_targeting
         if skill_targeting is not None:
-            return self.__get_selecting_target_actions(skill_targeting)
-        return self.__get_non_selecting_target_actions()
+            return AIActions(
+                select_targets=lambda: list(
+                    self.iter_select_targets(
+                        skill_targeting, max_count=self.max_select_targets
+                    )
+                )
+            )
+        return AIActions(
+            move_ally=self.incremental_actions.get_move_ally,
+            activate_skill=self.incremental_actions.get_activate_skill,
+            place_squeak=self.incremental_actions.get_place_squeak,
+            end_turn=lambda: [EndTurn()],
+        )
 
-    def __get_selecting_target_actions(
-        self, skill_targeting: SkillTargeting
-    ) -> AIActions:
-        all_actions = AIActions()
-        # SelectTarget
-        for targets in combinations(
-            skill_targeting.available_targets, skill_targeting.target_count
+    def iter_select_targets(
+        self,
+        skill_targeting: SkillTargeting,
+        *,
+        score: TargetScore | None = None,
+        top_k: int | None = None,
+        is_unique: bool = False,
+        max_count: int | None = None,
+        rng: random.Random | None = None,
+    ) -> Iterator[SelectTargets]:
+        """
+        Stream the targets the AI can select instead of building every
+        combination. See `iter_target_combinations` for the options.
+        """
+        for targets in iter_target_combinations(
+            skill_targeting,
+            score=score,
+            top_k=top_k,
+            is_unique=is_unique,
+            max_count=max_count,
+            rng=rng,
         ):
-            all_actions.select_targets.append(SelectTargets(skill_targeting, targets))
-        return all_actions
-
-    def __get_non_selecting_target_actions(self) -> AIActions:
-        all_actions = AIActions()
-        all_actions.end_turn.append(EndTurn())
-        cache = self.game_manager.board.cache
-        # MoveAlly
-        for ally in cache.sides[self.ai_side]:
-            if not isinstance(ally, Rodent):
-                continue
-            if ally.move_stamina <= 0:
-                continue
-            if self.game_manager.crumbs < ally.move_cost:
-                continue
-            for move_target_coord in self.game_manager.board.get_reachable_coords(ally):
-                all_actions.move_ally.append(
-                    MoveAlly(ally.move_cost, ally, move_target_coord)
-                )
-        # ActivateSkill
-        for entity in chain(cache.sides[self.ai_side], cache.sides[None]):
-            if entity.skill_stamina is not None and entity.skill_stamina <= 0:
-                continue
-            for i, skill in enumerate(entity.skills):
-                if self.game_manager.crumbs < skill.crumb_cost:
-                    continue
-                all_actions.activate_skill.append(
-                    ActivateSkill(skill.crumb_cost, entity, i)
-                )
-        # PlaceSqueak
-        for hand_index, squeak in enumerate(self.game_manager.hands[self.ai_side]):
-            if self.game_manager.crumbs < squeak.crumb_cost:
-                continue
-            for target_coord in squeak.get_placable_tiles(self.game_manager):
-                all_actions.place_squeak.append(
-                    PlaceSqueak(squeak.crumb_cost, target_coord, hand_index, squeak)
-                )
-        return all_actions
+            yield SelectTargets(skill_targeting, targets)
@@ -0,0 +1,225 @@
+from itertools import chain
+from typing import TYPE_CHECKING
+
+from ..entities.rodent import Rodent
+from ..game_event import (
+    CrumbChangeEvent,
+    EntityDamagedEvent,
+    EntityDieEvent,
+    EntityEffectUpdateEvent,
+    EntityHealedEvent,
+    EntityMoveEvent,
+    EntitySkillActivatedEvent,
+    EntitySkillCallbackEvent,
+    EntitySpawnEvent,
+    FeatureDamagedEvent,
+    GameEvent,
+    SqueakDrawnEvent,
+    SqueakPlacedEvent,
+)
+from ..hexagon import OddRCoord
+from ..player_info.squeak import Squeak, SqueakGetPlacableTiles
+from ..side import Side
+from .ai_action import ActivateSkill, MoveAlly, PlaceSqueak
+
+if TYPE_CHECKING:
+    from ..entity import Entity
+    from ..game_manager import GameManager
+
+_MoveKey = tuple[OddRCoord, int, bool, int]
+"""Everything about a rodent its reachable coords and move actions depend on"""
+
+
+class _MoveEntry:
+    __slots__ = ("key", "region", "actions")
+
+    def __init__(
+        self, key: _MoveKey, region: set[OddRCoord], actions: list[MoveAlly]
+    ) -> None:
+        self.key = key
+        self.region = region
+        """Reachable coords and the rodent's own pos"""
+        self.actions = actions
+
+
+class IncrementalActions:
+    """
+    Actions of an AI that are kept between steps and only generated again when
+    the `GameEvent`s since the last step could have changed them. Listens to
+    the event queue of the game manager, so it sees every event even if
+    someone else gets them from the queue.
+
+    Actions come out in the same order a full generation would give them.
+    Crumbs and stamina are checked on every step since they change on
+    nearly every action.
+    """
+
+    def __init__(self, game_manager: "GameManager", ai_side: Side) -> None:
+        self.game_manager = game_manager
+        self.ai_side = ai_side
+        self._move_entries: dict[Rodent, _MoveEntry] = {}
+        self._placable_tiles: dict[SqueakGetPlacableTiles, list[OddRCoord]] = {}
+        self._place_actions: dict[int, tuple[Squeak, list[PlaceSqueak]]] = {}
+        self._dirty_coords: set[OddRCoord] = set()
+        self._dirty_entities: set["Entity"] = set()
+        self._is_placement_dirty = False
+        self._is_all_dirty = True
+
+    def on_event(self, event: GameEvent) -> None:
+        match event:
+            case CrumbChangeEvent() | SqueakPlacedEvent() | SqueakDrawnEvent():
+                # Crumbs are checked on every step and hand slots are checked
+                # against the squeak in them
+                pass
+            case EntityMoveEvent(_, entity, from_pos):
+                self._dirty_entities.add(entity)
+                self._dirty_coords.add(from_pos)
+                self._dirty_coords.add(event.to_pos)
+            case EntitySpawnEvent(entity) | EntityDieEvent(entity):
+                self._dirty_entities.add(entity)
+                self._dirty_coords.add(event.pos)
+                self._is_placement_dirty = True
+            case (
+                EntityDamagedEvent(entity)
+                | EntityHealedEvent(entity)
+                | EntitySkillActivatedEvent(_, entity)
+                | EntitySkillCallbackEvent(_, entity)
+            ):
+                # Health decides what can be placed, skills can change height
+                self._dirty_entities.add(entity)
+                self._dirty_coords.add(event.pos)
+                self._is_placement_dirty = True
+            case EntityEffectUpdateEvent(effect):
+                self._dirty_entities.add(effect.entity)
+                self._dirty_coords.add(effect.entity.pos)
+            case FeatureDamagedEvent():
+                self._is_placement_dirty = True
+            case _:
+                self._is_all_dirty = True
+
+    def on_replace(self) -> None:
+        self._is_all_dirty = True
+
+    def get_move_ally(self) -> list[MoveAlly]:
+        self._update()
+        game_manager = self.game_manager
+        board = game_manager.board
+        allies: list[Rodent] = []
+        stale_allies: list[Rodent] = []
+        for ally in board.cache.sides[self.ai_side]:
+            if not isinstance(ally, Rodent):
+                continue
+            if ally.move_stamina <= 0:
+                continue
+            if game_manager.crumbs < ally.move_cost:
+                continue
+            allies.append(ally)
+            entry = self._move_entries.get(ally)
+            if entry is None or entry.key != self._get_move_key(ally):
+                stale_allies.append(ally)
+        if stale_allies:
+            # Search every stale ally in one pass instead of one by one
+            masks = board.get_all_reachable_coords(stale_allies)
+            for ally in stale_allies:
+                reachable_coords = board.grid.get_coords_from_mask(masks[ally])
+                self._move_entries[ally] = _MoveEntry(
+                    self._get_move_key(ally),
+                    {ally.pos, *reachable_coords},
+                    [
+                        MoveAlly(ally.move_cost, ally, move_target_coord)
+                        for move_target_coord in reachable_coords
+                    ],
+                )
+        actions: list[MoveAlly] = []
+        for ally in allies:
+            actions.extend(self._move_entries[ally].actions)
+        return actions
+
+    @staticmethod
+    def _get_move_key(ally: Rodent) -> _MoveKey:
+        return (ally.pos, ally.speed, ally.collision, ally.move_cost)
+
+    def get_activate_skill(self) -> list[ActivateSkill]:
+        game_manager = self.game_manager
+        cache = game_manager.board.cache
+        actions: list[ActivateSkill] = []
+        for entity in chain(cache.sides[self.ai_side], cache.sides[None]):
+            if entity.skill_stamina is not None and entity.skill_stamina <= 0:
+                continue
+            for i, skill in enumerate(entity.skills):
+                if game_manager.crumbs < skill.crumb_cost:
+                    continue
+                # Skip skills that would only get cancelled
+                if not entity.can_activate(i, game_manager):
+                    continue
+                actions.append(ActivateSkill(skill.crumb_cost, entity, i))
+        return actions
+
+    def get_place_squeak(self) -> list[PlaceSqueak]:
+        self._update()
+        game_manager = self.game_manager
+        actions: list[PlaceSqueak] = []
+        for hand_index, squeak in enumerate(game_manager.hands[self.ai_side]):
+            if game_manager.crumbs < squeak.crumb_cost:
+                continue
+            place_actions = self._place_actions.get(hand_index)
+            if place_actions is None or place_actions[0] is not squeak:
+                place_actions = (
+                    squeak,
+                    [
+                        PlaceSqueak(squeak.crumb_cost, target_coord, hand_index, squeak)
+                        for target_coord in self._get_placable_tiles(squeak)
+                    ],
+                )
+                self._place_actions[hand_index] = place_actions
+            actions.extend(place_actions[1])
+        return actions
+
+    def _get_placable_tiles(self, squeak: Squeak) -> list[OddRCoord]:
+        placable_tiles = self._placable_tiles.get(squeak.get_placable_tiles)
+        if placable_tiles is None:
+            placable_tiles = list(squeak.get_placable_tiles(self.game_manager))
+            self._placable_tiles[squeak.get_placable_tiles] = placable_tiles
+        return placable_tiles
+
+    def _update(self) -> None:
+        """Forget every action the events since the last step could've changed"""
+        if self._is_all_dirty:
+            self._move_entries.clear()
+            self._clear_placement()
+        elif self._dirty_coords or self._dirty_entities:
+            self._update_move_entries()
+            if self._is_placement_dirty or self._is_deployment_zone_dirty():
+                self._clear_placement()
+        elif self._is_placement_dirty:
+            self._clear_placement()
+        self._dirty_coords.clear()
+        self._dirty_entities.clear()
+        self._is_placement_dirty = False
+        self._is_all_dirty = False
+
+    def _update_move_entries(self) -> None:
+        """
+        A move entry stays valid if nothing changed on its reachable coords
+        and on their neighbors, since that's all the search walks through
+        """
+        changed_coords = set(self._dirty_coords)
+        for coord in self._dirty_coords:
+            changed_coords.update(coord.get_neighbors())
+        for rodent in list(self._move_entries):
+            if rodent in self._dirty_entities or not self._move_entries[
+                rodent
+            ].region.isdisjoint(changed_coords):
+                del self._move_entries[rodent]
+
+    def _is_deployment_zone_dirty(self) -> bool:
+        for deployment_zone in self.game_manager.board.cache.deployment_zones[
+            self.ai_side
+        ]:
+            if not self._dirty_coords.isdisjoint(deployment_zone.shape):
+                return True
+        return False
+
+    def _clear_placement(self) -> None:
+        self._placable_tiles.clear()
+        self._place_actions.clear()
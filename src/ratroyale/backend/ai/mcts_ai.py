@@ -0,0 +1,395 @@
+import random
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from math import inf, log, sqrt
+from typing import Sequence
+
+from ..action_log import ActionLog
+from ..entities.rodent import Rodent
+from ..error import RatRoyaleBackendError
+from ..game_manager import GameManager
+from ..map import Map
+from ..player_info.player_info import PlayerInfo
+from ..side import Side
+from .ai_action import AIAction, AIActions, EndTurn
+from .base_ai import BaseAI
+
+DEFAULT_TIME_BUDGET = 1.0
+"""Seconds the AI may think in each of its turns"""
+DECISION_TIME_SHARE = 0.5
+"""Share of the remaining time budget of the turn that each decision gets"""
+MIN_DECISION_TIME = 0.005
+"""Below this many seconds left in the turn, the AI stops searching"""
+WORKER_GRACE_TIME = 0.05
+"""Seconds to wait for worker searches after the deadline"""
+LAIR_WEIGHT = 5
+"""How many times a lair's health is worth compared to a rodent's"""
+CLOSENESS_WEIGHT = 0.3
+"""Weight of rodents' closeness to the enemy lair in the evaluation"""
+
+RootStats = dict[str, tuple[int, float]]
+"""Visits and total value of each root action, keyed by its string"""
+
+
+class MCTSNode:
+    __slots__ = ("children", "untried", "visits", "value")
+
+    def __init__(self) -> None:
+        self.children: dict[int, MCTSNode] = {}
+        """Child nodes keyed by index of their action in the node's actions"""
+        self.untried: list[int] | None = None
+        """Indices of actions not expanded yet, None until the node is reached"""
+        self.visits = 0
+        self.value = 0.0
+
+    def select_child(self, exploration: float) -> tuple[int, "MCTSNode"]:
+        """Pick the child with the highest upper confidence bound"""
+        log_visits = log(self.visits)
+        best_index = -1
+        best_child = self
+        best_bound = -inf
+        for index, child in self.children.items():
+            bound = child.value / child.visits + exploration * sqrt(
+                log_visits / child.visits
+            )
+            if bound > best_bound:
+                best_index, best_child, best_bound = index, child, bound
+        return best_index, best_child
+
+
+class MCTSAI(BaseAI):
+    """
+    Monte Carlo Tree Search over the actions of its own turn. Every iteration
+    plays actions on the real game inside a journal and rolls them back, so
+    search never copies the game. Each decision gets a share of the turn's
+    time budget and/or a fixed number of iterations.
+
+    With `workers`, the same search also runs in worker processes, each of
+    them replaying the game's action log to get the same game, and the
+    visits of every action are added up.
+    """
+
+    def __init__(
+        self,
+        game_manager: GameManager,
+        ai_side: Side,
+        *,
+        iterations: int | None = None,
+        time_budget: float | None = DEFAULT_TIME_BUDGET,
+        workers: int = 0,
+        exploration: float = sqrt(2),
+        rollout_depth: int = 0,
+    ) -> None:
+        """
+        :param iterations: Iterations for each decision, split across processes
+        :param time_budget: Seconds to think in each turn
+        :param workers: Worker processes to search in besides this one
+        :param rollout_depth: Random actions played from a new node before
+            evaluating it
+        """
+        super().__init__(game_manager, ai_side)
+        if iterations is None and time_budget is None:
+            raise ValueError("MCTS AI needs either an iteration or a time budget")
+        self.iterations = iterations
+        self.time_budget = time_budget
+        self.workers = workers
+        self.exploration = exploration
+        self.rollout_depth = rollout_depth
+        self.random = random.Random(random.getrandbits(64))
+        self._turn: tuple[int, Side] | None = None
+        self._turn_deadline = inf
+        self._executor: ProcessPoolExecutor | None = None
+        self._game_data: tuple[bytes, bytes, bytes] | None = None
+
+    def get_name_and_description(self) -> tuple[str, str]:
+        return (
+            "MCTS-AI",
+            "Tries out many ways to play its turn and picks the one that works out best.",
+        )
+
+    def close(self) -> None:
+        """Shut down worker processes"""
+        super().close()
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def select_action(self, actions: AIActions) -> AIAction:
+        root_actions = actions.flatten()
+        if len(root_actions) == 1:
+            return root_actions[0]
+        deadline = self._get_decision_deadline()
+        if deadline is not None and deadline <= time.perf_counter():
+            return self._select_without_search(root_actions)
+        root_keys = [str(action) for action in root_actions]
+        futures = self._submit_worker_searches(root_keys, deadline)
+        iterations = self.iterations
+        if iterations is not None:
+            iterations = max(1, iterations // (len(futures) + 1))
+        root = self.search(root_actions, iterations, deadline)
+        visits = [0] * len(root_actions)
+        values = [0.0] * len(root_actions)
+        for index, child in root.children.items():
+            visits[index] += child.visits
+            values[index] += child.value
+        for worker_stats in self._collect_worker_searches(futures, deadline):
+            for index, key in enumerate(root_keys):
+                worker_visits, worker_value = worker_stats.get(key, (0, 0.0))
+                visits[index] += worker_visits
+                values[index] += worker_value
+        if not any(visits):
+            return self._select_without_search(root_actions)
+        best_index = max(
+            range(len(root_actions)), key=lambda index: (visits[index], values[index])
+        )
+        return root_actions[best_index]
+
+    def search(
+        self,
+        root_actions: Sequence[AIAction],
+        iterations: int | None,
+        deadline: float | None,
+    ) -> MCTSNode:
+        """Search until the budget runs out, leaving the game as it was"""
+        root = MCTSNode()
+        iteration = 0
+        while (iterations is None or iteration < iterations) and (
+            deadline is None or time.perf_counter() < deadline
+        ):
+            self._run_iteration(root, root_actions)
+            iteration += 1
+        return root
+
+    def evaluate(self) -> float:
+        """
+        How good the game is for the AI, from 0 (lost) to 1 (won). Mostly the
+        AI's share of health on the board, lairs included, and partly how
+        close its rodents are to the enemy lair.
+        """
+        game_over_event = self.game_manager.game_over_event
+        if game_over_event is not None:
+            return 1.0 if game_over_event.victory_side == self.ai_side else 0.0
+        cache = self.game_manager.board.cache
+        enemy_side = self.ai_side.other_side()
+        health = {self.ai_side: 0, enemy_side: 0}
+        for side in health:
+            for entity in cache.sides.get(side, ()):
+                health[side] += entity.health or 0
+            for lair in cache.lairs.get(side, ()):
+                health[side] += LAIR_WEIGHT * (lair.health or 0)
+        total_health = health[self.ai_side] + health[enemy_side]
+        health_share = health[self.ai_side] / total_health if total_health else 0.5
+        enemy_lair_coords = [
+            coord for lair in cache.lairs.get(enemy_side, ()) for coord in lair.shape
+        ]
+        closeness = 0.0
+        rodent_count = 0
+        for entity in cache.sides.get(self.ai_side, ()):
+            if not isinstance(entity, Rodent) or not enemy_lair_coords:
+                continue
+            distance = min(
+                [entity.pos.get_distance(coord) for coord in enemy_lair_coords]
+            )
+            closeness += 1 / (1 + distance)
+            rodent_count += 1
+        if rodent_count:
+            closeness /= rodent_count
+        return (1 - CLOSENESS_WEIGHT) * health_share + CLOSENESS_WEIGHT * closeness
+
+    def _is_search_over(self) -> bool:
+        return (
+            self.game_manager.game_over_event is not None
+            or self.game_manager.turn != self.ai_side
+        )
+
+    def _run_iteration(self, root: MCTSNode, root_actions: Sequence[AIAction]) -> None:
+        journal = self.game_manager.begin_journal()
+        path = [root]
+        node = root
+        actions = root_actions
+        try:
+            while True:
+                if node.untried is None:
+                    node.untried = list(range(len(actions)))
+                    self.random.shuffle(node.untried)
+                if node.untried:
+                    index = node.untried.pop()
+                    child = MCTSNode()
+                    node.children[index] = child
+                    path.append(child)
+                    self.perform_action(actions[index])
+                    value = self._rollout()
+                    break
+                if not node.children:
+                    value = self.evaluate()
+                    break
+                index, node = node.select_child(self.exploration)
+                path.append(node)
+                self.perform_action(actions[index])
+                if self._is_search_over():
+                    value = self.evaluate()
+                    break
+                actions = self._get_all_actions().flatten()
+        except RatRoyaleBackendError:
+            value = 0.0
+        finally:
+            self.game_manager.rollback(journal)
+        for node in path:
+            node.visits += 1
+            node.value += value
+
+    def _rollout(self) -> float:
+        for _ in range(self.rollout_depth):
+            if self._is_search_over():
+                break
+            actions = self._get_all_actions().flatten()
+            if not actions:
+                break
+            self.perform_action(self.random.choice(actions))
+        return self.evaluate()
+
+    def _get_decision_deadline(self) -> float | None:
+        if self.time_budget is None:
+            return None
+        now = time.perf_counter()
+        turn = (self.game_manager.turn_count, self.game_manager.turn)
+        if turn != self._turn:
+            self._turn = turn
+            self._turn_deadline = now + self.time_budget
+        remaining = self._turn_deadline - now
+        if remaining < MIN_DECISION_TIME:
+            return now
+        return now + remaining * DECISION_TIME_SHARE
+
+    @staticmethod
+    def _select_without_search(actions: Sequence[AIAction]) -> AIAction:
+        for action in actions:
+            if isinstance(action, EndTurn):
+                return action
+        return actions[0]
+
+    def _submit_worker_searches(
+        self, root_keys: list[str], deadline: float | None
+    ) -> list[Future[RootStats]]:
+        if self.workers <= 0:
+            return []
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        if self._game_data is None:
+            players_info = self.game_manager.players_info
+            player_1 = self.game_manager.player_1
+            self._game_data = (
+                self.game_manager.map.save(),
+                players_info[player_1].save(),
+                players_info[player_1.other_side()].save(),
+            )
+        iterations = self.iterations
+        if iterations is not None:
+            iterations = max(1, iterations // (self.workers + 1))
+        time_limit = None if deadline is None else deadline - time.perf_counter()
+        action_log = self.game_manager.action_log.save()
+        return [
+            self._executor.submit(
+                _search_in_worker,
+                _WorkerTask(
+                    *self._game_data,
+                    action_log,
+                    Side.to_int(self.ai_side),
+                    root_keys,
+                    iterations,
+                    time_limit,
+                    self.exploration,
+                    self.rollout_depth,
+                    self.random.getrandbits(64),
+                ),
+            )
+            for _ in range(self.workers)
+        ]
+
+    @staticmethod
+    def _collect_worker_searches(
+        futures: list[Future[RootStats]], deadline: float | None
+    ) -> list[RootStats]:
+        if not futures:
+            return []
+        timeout = None
+        if deadline is not None:
+            timeout = max(0.0, deadline - time.perf_counter()) + WORKER_GRACE_TIME
+        done, _ = wait(futures, timeout=timeout)
+        return [future.result() for future in done if future.exception() is None]
+
+
+@dataclass(frozen=True)
+class _WorkerTask:
+    map: bytes
+    player_1_info: bytes
+    player_2_info: bytes
+    action_log: bytes
+    ai_side: int
+    root_keys: list[str]
+    iterations: int | None
+    time_limit: float | None
+    exploration: float
+    rollout_depth: int
+    seed: int
+
+
+_worker_game: tuple[tuple[bytes, bytes, bytes], GameManager] | None = None
+"""Game a worker process searched last time, reused if the game continued"""
+
+
+def _search_in_worker(task: _WorkerTask) -> RootStats:
+    global _worker_game
+    deadline = None
+    if task.time_limit is not None:
+        deadline = time.perf_counter() + task.time_limit
+    game_data = (task.map, task.player_1_info, task.player_2_info)
+    action_log = ActionLog.load(task.action_log)
+    game_manager = None
+    if _worker_game is not None and _worker_game[0] == game_data:
+        game_manager = _worker_game[1]
+        played_actions = game_manager.action_log.actions
+        if (
+            game_manager.seed != action_log.seed
+            or action_log.actions[: len(played_actions)] != played_actions
+        ):
+            game_manager = None
+    if game_manager is None:
+        game_manager = GameManager(
+            Map.load(task.map),
+            (PlayerInfo.load(task.player_1_info), PlayerInfo.load(task.player_2_info)),
+            action_log.player_1,
+            is_disable_reward=True,
+            seed=action_log.seed,
+        )
+        _worker_game = (game_data, game_manager)
+    for action in action_log.actions[len(game_manager.action_log) :]:
+        action.apply(game_manager)
+    for _ in game_manager.event_queue:
+        pass
+
+    ai_side = Side.from_int(task.ai_side)
+    assert ai_side is not None
+    ai = MCTSAI(
+        game_manager,
+        ai_side,
+        iterations=task.iterations,
+        time_budget=task.time_limit,
+        exploration=task.exploration,
+        rollout_depth=task.rollout_depth,
+    )
+    ai.random.seed(task.seed)
+    try:
+        actions = {str(action): action for action in ai._get_all_actions().flatten()}
+        root_actions = [actions[key] for key in task.root_keys if key in actions]
+        if len(root_actions) != len(task.root_keys):
+            return {}
+        root = ai.search(root_actions, task.iterations, deadline)
+    finally:
+        # The game is kept for the next search, so don't leave listeners on it
+        ai.close()
+    return {
+        task.root_keys[index]: (child.visits, child.value)
+        for index, child in root.children.items()
+    }
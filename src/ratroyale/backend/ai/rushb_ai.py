@@ -1,6 +1,7 @@
 import random
 from dataclasses import dataclass
-from functools import cmp_to_key, lru_cache
+from functools import lru_cache
+from math import inf
 
 from ..entities.rodent import Rodent
 from ..entity import CallableEntitySkill
@@ -46,52 +47,32 @@ class RushBAI(BaseAI):
                 return entity
         return None
 
-    def compare_hands(self, a: PlaceSqueak, b: PlaceSqueak) -> int:
-        if a.crumb_cost != b.crumb_cost:
-            return a.crumb_cost - b.crumb_cost
-        if not isinstance(a.squeak.squeak_info, RodentSqueakInfo):
-            return 1
-        if not isinstance(b.squeak.squeak_info, RodentSqueakInfo):
-            return 1
-
-        a_to_lair = a.target_coord.path_find(
-            self.choose_lair_coord(),
-            self.game_manager.board._is_coord_blocked(
-                a.squeak.squeak_info.rodent.collision, self.ai_side
+    def get_distance_to_lair(self, coord: OddRCoord, collision: bool) -> float:
+        """
+        :returns: Steps from coord to the nearest tile of the chosen lair, or
+        infinity if it can't get there
+        """
+        distance = self.game_manager.board.get_distance_map(
+            self.choose_lair().shape, collision, self.ai_side
+        ).get_distance(coord)
+        return inf if distance is None else distance
+
+    def get_hand_rank(self, hand: PlaceSqueak) -> tuple[int, bool, float]:
+        if not isinstance(hand.squeak.squeak_info, RodentSqueakInfo):
+            return hand.crumb_cost, True, inf
+        return (
+            hand.crumb_cost,
+            False,
+            self.get_distance_to_lair(
+                hand.target_coord, hand.squeak.squeak_info.rodent.collision
             ),
         )
-        if a_to_lair is None:
-            return 1
-        b_to_lair = b.target_coord.path_find(
-            self.choose_lair_coord(),
-            self.game_manager.board._is_coord_blocked(
-                b.squeak.squeak_info.rodent.collision, self.ai_side
-            ),
-        )
-        if b_to_lair is None:
-            return 1
-        return len(b_to_lair) - len(a_to_lair)
-
-    def compare_moves(self, a: MoveAlly, b: MoveAlly) -> int:
-        a_to_lair = a.target_coord.path_find(
-            self.choose_lair_coord(),
-            self.game_manager.board.is_coord_blocked(a.ally),
-        )
-        if a_to_lair is None:
-            return 1
-        b_to_lair = b.target_coord.path_find(
-            self.choose_lair_coord(),
-            self.game_manager.board.is_coord_blocked(b.ally),
-        )
-        if b_to_lair is None:
-            return 1
-        return len(b_to_lair) - len(a_to_lair)
+
+    def get_move_rank(self, move: MoveAlly) -> float:
+        return self.get_distance_to_lair(move.target_coord, move.ally.collision)
 
     def select_hand(self, hands: list[PlaceSqueak]) -> PlaceSqueak | None:
-        is_collision = self.choose_lair().is_collision
-        self.choose_lair().is_collision = lambda: False  # type: ignore[method-assign]
-        sorted_hands = sorted(hands, key=cmp_to_key(self.compare_hands))
-        self.choose_lair().is_collision = is_collision  # type: ignore[method-assign]
+        sorted_hands = sorted(hands, key=self.get_hand_rank)
         if len(sorted_hands) == 0:
             return None
         for hand in sorted_hands:
@@ -104,11 +85,15 @@ class RushBAI(BaseAI):
         return sorted_hands[0]
 
     def select_action(self, actions: AIActions) -> AIAction:
-        if self.game_manager.is_selecting_target:
-            for select_targets in actions.select_targets:
-                if self.choose_lair_coord() in select_targets.selected_targets:
-                    return select_targets
-            return actions.select_targets[0]
+        skill_targeting = self.game_manager.skill_targeting
+        if skill_targeting is not None:
+            # Targets with the lair come first, so only the first one is needed
+            lair_coord = self.choose_lair_coord()
+            return next(
+                self.iter_select_targets(
+                    skill_targeting, score=lambda coord: coord == lair_coord
+                )
+            )
 
         ally_on_field = self.get_ally_on_field()
         # If there's no ally on field, place squeak.
@@ -133,14 +118,16 @@ class RushBAI(BaseAI):
         self.last_rodent_and_skill_in_lair_range = None
 
         # Check if lair is now within range
+        board = self.game_manager.board
+        attackable_masks = board.get_attackable_masks(self.ai_side)
         for activate_skill in actions.activate_skill:
             if activate_skill.entity is not ally_on_field:
                 continue
             assert isinstance(activate_skill.entity, Rodent)
             skill = activate_skill.get_skill()
-            if (
-                self.choose_lair_coord()
-                in self.game_manager.board.get_attackable_coords(ally_on_field, skill)
+            mask = attackable_masks.get((ally_on_field, activate_skill.skill_index))
+            if mask is not None and board.grid.is_coord_in_mask(
+                mask, self.choose_lair_coord()
             ):
                 self.last_rodent_and_skill_in_lair_range = RodentAndSkill(
                     ally_on_field, skill
@@ -150,8 +137,4 @@ class RushBAI(BaseAI):
         # Move rodent to enemy lair
         if not actions.move_ally:
             return EndTurn()
-        is_collision = self.choose_lair().is_collision
-        self.choose_lair().is_collision = lambda: False  # type: ignore[method-assign]
-        best_move = max(actions.move_ally, key=cmp_to_key(self.compare_moves))
-        self.choose_lair().is_collision = is_collision  # type: ignore[method-assign]
-        return best_move
+        return min(actions.move_ally, key=self.get_move_rank)
@@ -0,0 +1,73 @@
+import random
+from itertools import combinations
+from math import comb
+from typing import Callable, Iterator, Sequence
+
+from ..entity import SkillTargeting
+from ..hexagon import OddRCoord
+
+TargetScore = Callable[[OddRCoord], float]
+
+
+def iter_target_combinations(
+    skill_targeting: SkillTargeting,
+    *,
+    score: TargetScore | None = None,
+    top_k: int | None = None,
+    is_unique: bool = False,
+    max_count: int | None = None,
+    rng: random.Random | None = None,
+) -> Iterator[tuple[OddRCoord, ...]]:
+    """
+    Lazily go through every combination of targets a skill can select, without
+    ever building them all at once
+
+    :param score: Heuristic score of a target. Higher scoring targets come
+        first, so combinations come out best first.
+    :param top_k: Only combine the `top_k` best targets by `score`, or the
+        first `top_k` targets without a score
+    :param is_unique: Skip targets that are already in the list, since
+        selecting the same coord twice does the same thing
+    :param max_count: Give at most this many combinations. If there are more,
+        pick that many of them, in the same order they'd come out.
+    :param rng: Random used for picking. If None, they're picked evenly spaced
+        instead, so the same targets always give the same combinations.
+    """
+    targets: Sequence[OddRCoord] = skill_targeting.available_targets
+    if is_unique:
+        targets = list(dict.fromkeys(targets))
+    if score is not None:
+        targets = sorted(targets, key=score, reverse=True)
+    if top_k is not None:
+        targets = targets[:top_k]
+    target_count = skill_targeting.target_count
+    total = comb(len(targets), target_count)
+    if max_count is None or total <= max_count:
+        yield from combinations(targets, target_count)
+        return
+    if rng is None:
+        ranks = [i * total // max_count for i in range(max_count)]
+    else:
+        picked_ranks: set[int] = set()
+        while len(picked_ranks) < max_count:
+            picked_ranks.add(rng.randrange(total))
+        ranks = sorted(picked_ranks)
+    for rank in ranks:
+        yield tuple(
+            targets[i] for i in _unrank_combination(len(targets), target_count, rank)
+        )
+
+
+def _unrank_combination(n: int, k: int, rank: int) -> list[int]:
+    """Indices of the `rank`-th combination that `itertools.combinations` gives"""
+    indices = []
+    start = 0
+    for remaining in range(k, 0, -1):
+        for i in range(start, n):
+            count = comb(n - i - 1, remaining - 1)
+            if rank < count:
+                indices.append(i)
+                start = i + 1
+                break
+            rank -= count
+    return indices
@@ -1,9 +1,16 @@
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
 from copy import deepcopy
-from typing import TYPE_CHECKING, Iterable
+from itertools import count
+from typing import TYPE_CHECKING, Callable, Hashable, Iterable, TypeVar
 
-from .cython_board import get_attackable_coords
-from ..utils import EventQueue, is_ellipsis_body
+from .cython_board import (
+    BoardGrid,
+    BoardIsCoordBlocked,
+    DistanceMap,
+    ThreatMap,
+    get_attackable_coords,
+)
+from ..utils import EventQueue, OrderedSet
 from .entities.rodent import ENTITY_JUMP_HEIGHT, Rodent
 from .entity import CallableEntitySkill, Entity
 from .entity_effect import EntityEffect
@@ -11,9 +18,11 @@ from .error import EntityInvalidPosError
 from .feature import Feature
 from .features.common import DeploymentZone, Lair
 from .game_event import EntitySpawnEvent, GameEvent
+from .game_snapshot import GameJournal
 from .hexagon import IsCoordBlocked, OddRCoord
 from .map import Map
 from .side import Side
+from .tags import EntityTag
 from .tile import Tile
 from .timer import Timer
 
@@ -24,39 +33,185 @@ if TYPE_CHECKING:
 
 class Cache:
     def __init__(self) -> None:
-        self.rodents: list[Rodent] = []
-        self.sides: dict[Side | None, list[Entity]] = defaultdict(list)
-        self.entities: list[Entity] = []
-        self.entities_with_hp: list[Entity] = []
-        self.sides_with_hp: dict[Side | None, list[Entity]] = defaultdict(list)
+        self.rodents: OrderedSet[Rodent] = OrderedSet()
+        self.sides: dict[Side | None, OrderedSet[Entity]] = defaultdict(OrderedSet)
+        self.entities: OrderedSet[Entity] = OrderedSet()
+        self.entities_with_hp: OrderedSet[Entity] = OrderedSet()
+        self.sides_with_hp: dict[Side | None, OrderedSet[Entity]] = defaultdict(
+            OrderedSet
+        )
         self.features: list[Feature] = []
         self.deployment_zones: dict[Side | None, list[DeploymentZone]] = defaultdict(
             list
         )
         self.lairs: dict[Side, list[Lair]] = defaultdict(list)
-        self.effects: list[EntityEffect] = []
-        self.timers: list[Timer] = []
-        self.entities_with_turn_change: list[Entity] = []
+        self.effects: OrderedSet[EntityEffect] = OrderedSet()
+        self.timers: OrderedSet[Timer] = OrderedSet()
+        self.entity_effects: dict[Entity, OrderedSet[EntityEffect]] = defaultdict(
+            OrderedSet
+        )
+        """Every effect in `effects` by the entity it's on"""
+        self.entity_timers: dict[Entity, OrderedSet[Timer]] = defaultdict(OrderedSet)
+        """Every timer in `timers` by the entity it's on"""
+        self.effects_with_turn_change: OrderedSet[EntityEffect] = OrderedSet()
+        self.timers_with_turn_change: OrderedSet[Timer] = OrderedSet()
+        self.effect_wheel: dict[int, list[EntityEffect]] = defaultdict(list)
+        """
+        Effects by the turn count their duration runs out on. Effects that
+        were removed or changed duration since are left in and skipped.
+        """
+        self.timer_wheel: dict[int, list[Timer]] = defaultdict(list)
+        """Timers by the turn count their duration runs out on, like `effect_wheel`"""
+        self.added_count = 0
+        """Effects and timers added so far, to give each its `cache_order`"""
+        self.entities_with_turn_change: OrderedSet[Entity] = OrderedSet()
         self.entities_in_features: dict[Entity, list[Feature]] = defaultdict(list)
-        self.entities_with_on_enemy_move: dict[Side, list[Entity]] = defaultdict(list)
-        self.entities_with_on_ally_move: dict[Side, list[Entity]] = defaultdict(list)
+        self.entities_with_on_enemy_move: dict[Side, OrderedSet[Entity]] = defaultdict(
+            OrderedSet
+        )
+        self.entities_with_on_ally_move: dict[Side, OrderedSet[Entity]] = defaultdict(
+            OrderedSet
+        )
         self.the_ones: dict[Side, TheOne | None] = defaultdict(lambda: None)
 
+    def add_effect(self, effect: EntityEffect) -> None:
+        effect.cache_order = self.added_count
+        self.added_count += 1
+        self.effects.append(effect)
+        self.entity_effects[effect.entity].append(effect)
+        if effect.has_on_turn_change:
+            self.effects_with_turn_change.append(effect)
+        self.schedule_effect(effect)
+
+    def remove_effect(self, effect: EntityEffect) -> None:
+        self.effects.remove(effect)
+        self.entity_effects[effect.entity].remove(effect)
+        self.effects_with_turn_change.discard(effect)
+        effect.stop()
+
+    def schedule_effect(self, effect: EntityEffect) -> None:
+        """Call after the duration of an effect in `effects` is changed"""
+        if effect.expiry_turn is not None:
+            self.effect_wheel[effect.expiry_turn].append(effect)
+
+    def add_timer(self, timer: Timer) -> None:
+        timer.cache_order = self.added_count
+        self.added_count += 1
+        self.timers.append(timer)
+        self.entity_timers[timer.entity].append(timer)
+        if timer.has_on_turn_change:
+            self.timers_with_turn_change.append(timer)
+        if timer.expiry_turn is not None:
+            self.timer_wheel[timer.expiry_turn].append(timer)
+
+    def remove_timer(self, timer: Timer) -> None:
+        self.timers.remove(timer)
+        self.entity_timers[timer.entity].remove(timer)
+        self.timers_with_turn_change.discard(timer)
+        timer.stop()
+
+    def get_turn_change_effects(self, turn_count: int) -> list[EntityEffect]:
+        """
+        Effects that have `on_turn_change` or run out on `turn_count`, in the
+        order of `effects`
+        """
+        effects = set(self.effects_with_turn_change)
+        for effect in self.effect_wheel.get(turn_count, ()):
+            if effect.expiry_turn == turn_count and effect in self.effects:
+                effects.add(effect)
+        return sorted(effects, key=lambda effect: effect.cache_order)
+
+    def get_turn_change_timers(self, turn_count: int) -> list[Timer]:
+        """
+        Timers that have `on_turn_change` or run out on `turn_count`, in the
+        order of `timers`
+        """
+        timers = set(self.timers_with_turn_change)
+        for timer in self.timer_wheel.get(turn_count, ()):
+            if timer.expiry_turn == turn_count and timer in self.timers:
+                timers.add(timer)
+        return sorted(timers, key=lambda timer: timer.cache_order)
+
     def get_all_lairs(self) -> Iterable[Lair]:
         for side_lair in self.lairs.values():
             for lair in side_lair:
                 yield lair
 
 
+T = TypeVar("T")
+
+
+class QueryCache:
+    """
+    Bounded LRU cache of board query results. Keys should contain board version
+    so results from before a mutation are never returned.
+    """
+
+    def __init__(self, max_size: int = 1024) -> None:
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._results: OrderedDict[Hashable, object] = OrderedDict()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], T]) -> T:
+        try:
+            result = self._results[key]
+        except KeyError:
+            self.misses += 1
+            result = compute()
+            self.put(key, result)
+            return result
+        self.hits += 1
+        self._results.move_to_end(key)
+        return result  # type: ignore[return-value]
+
+    def get(self, key: Hashable) -> object | None:
+        """
+        :returns: Cached result or None if it's not cached
+        """
+        result = self._results.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._results.move_to_end(key)
+        return result
+
+    def put(self, key: Hashable, result: object) -> None:
+        self._results[key] = result
+        if len(self._results) > self.max_size:
+            self._results.popitem(last=False)
+
+    def clear(self) -> None:
+        self._results.clear()
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+
+_versions = count(1)
+"""Shared by every board so a version number is never reused, even after restoring a snapshot"""
+
+
 class Board:
     size_x: int
     size_y: int
     tiles: list[list[Tile | None]]
+    grid: BoardGrid
+    """Flat index-addressed view of `tiles` for fast queries"""
     cache: Cache
     event_queue: EventQueue[GameEvent]
+    version: int
+    """Changes every time tiles, entities or features that queries depend on change"""
+    query_cache: QueryCache
+    journals: list[GameJournal]
+    """Every journal that is currently recording, innermost last"""
 
     def __init__(self, map: Map) -> None:
         self.cache = Cache()
+        self.version = next(_versions)
+        self.query_cache = QueryCache()
+        self.journals = []
         map = deepcopy(map)
         self.tiles = map.tiles
         self.cache.features = map.features
@@ -69,6 +224,7 @@ class Board:
                 self.cache.lairs[feature.side].append(feature)
         self.size_y = len(map.tiles)
         self.size_x = len(map.tiles[0])
+        self.grid = BoardGrid(self.tiles)
         self.event_queue = EventQueue()
         for entity in map.entities:
             self.add_entity(entity)
@@ -76,6 +232,11 @@ class Board:
     def add_entity(
         self, entity: Entity, game_manager: "GameManager | None" = None
     ) -> None:
+        tile = self.get_tile(entity.pos)
+        if tile is None:
+            raise EntityInvalidPosError()
+        self.record(self.cache)
+        self.record_tile(tile)
         self.cache.entities.append(entity)
         self.cache.sides[entity.side].append(entity)
         if entity.health is not None:
@@ -83,20 +244,20 @@ class Board:
             self.cache.sides_with_hp[entity.side].append(entity)
         if isinstance(entity, Rodent):
             self.cache.rodents.append(entity)
-        if not is_ellipsis_body(entity.on_turn_change):
+        hooks = entity.overridden_hooks
+        if "on_turn_change" in hooks:
             self.cache.entities_with_turn_change.append(entity)
-        if not is_ellipsis_body(entity.on_ally_move):
+        if "on_ally_move" in hooks:
             if entity.side is None:
                 raise ValueError("Entity with no side can't trigger on ally move")
             self.cache.entities_with_on_ally_move[entity.side].append(entity)
-        if not is_ellipsis_body(entity.on_enemy_move):
+        if "on_enemy_move" in hooks:
             if entity.side is None:
                 raise ValueError("Entity with no side can't trigger on ally move")
             self.cache.entities_with_on_enemy_move[entity.side].append(entity)
-        tile = self.get_tile(entity.pos)
-        if tile is None:
-            raise EntityInvalidPosError()
         tile.entities.append(entity)
+        self.grid.add_entity(entity)
+        self.bump_version()
         if game_manager is not None:
             entity.on_summon(game_manager)
         entity.on_spawn(self)
@@ -104,6 +265,8 @@ class Board:
 
     def remove_entity(self, entity: Entity) -> None:
         """Remove entity from cache"""
+        self.record(self.cache)
+        self.bump_version()
         self.cache.entities.remove(entity)
         self.cache.sides[entity.side].remove(entity)
         if entity in self.cache.entities_in_features:
@@ -113,26 +276,68 @@ class Board:
             self.cache.sides_with_hp[entity.side].remove(entity)
         if isinstance(entity, Rodent):
             self.cache.rodents.remove(entity)
-        if not is_ellipsis_body(entity.on_turn_change):
+        hooks = entity.overridden_hooks
+        if "on_turn_change" in hooks:
             self.cache.entities_with_turn_change.remove(entity)
-        if not is_ellipsis_body(entity.on_ally_move):
+        if "on_ally_move" in hooks:
             assert entity.side is not None
             self.cache.entities_with_on_ally_move[entity.side].remove(entity)
-        if not is_ellipsis_body(entity.on_enemy_move):
+        if "on_enemy_move" in hooks:
             assert entity.side is not None
             self.cache.entities_with_on_enemy_move[entity.side].remove(entity)
-        for timer in self.cache.timers:
-            if timer.entity is entity:
-                self.cache.timers.remove(timer)
-        for effect in self.cache.effects:
-            if effect.entity is entity:
-                self.cache.effects.remove(effect)
-        self.cache.timers = [
-            timer for timer in self.cache.timers if timer.entity is not entity
-        ]
-        self.cache.effects = [
-            effect for effect in self.cache.effects if effect.entity is not entity
-        ]
+        for timer in self.cache.entity_timers.pop(entity, ()):
+            self.record(timer)
+            self.cache.timers.remove(timer)
+            self.cache.timers_with_turn_change.discard(timer)
+            timer.stop()
+        for effect in self.cache.entity_effects.pop(entity, ()):
+            self.record(effect)
+            self.cache.effects.remove(effect)
+            self.cache.effects_with_turn_change.discard(effect)
+            effect.stop()
+
+    def remove_feature(self, feature: Feature) -> None:
+        """Remove feature from tiles and cache"""
+        self.record(self.cache)
+        for pos in feature.shape:
+            tile = self.get_tile(pos)
+            if tile is None:
+                raise ValueError("Feature is existing on invalid tile")
+            self.record_tile(tile)
+            tile.features.remove(feature)
+        self.grid.remove_feature(feature)
+        self.bump_version()
+        self.cache.features.remove(feature)
+        if isinstance(feature, DeploymentZone):
+            self.cache.deployment_zones[feature.side].remove(feature)
+        elif isinstance(feature, Lair):
+            if feature.side is None:
+                raise ValueError("Lair cannot have side of None")
+            self.cache.lairs[feature.side].remove(feature)
+
+    def set_entity_height(self, entity: Entity, height: int) -> None:
+        """Change height of an entity that is on the board"""
+        tile = self.get_tile(entity.pos)
+        if tile is not None:
+            self.record_tile(tile)
+        self.record(entity)
+        entity.height = height
+        self.grid.update_entity_height(entity)
+        self.bump_version()
+
+    def record(self, obj: object) -> None:
+        """Call before changing attributes or containers of an object"""
+        for journal in self.journals:
+            journal.record(obj)
+
+    def record_tile(self, tile: Tile) -> None:
+        """Call before changing entities or features on a tile"""
+        for journal in self.journals:
+            journal.record_tile(tile)
+
+    def bump_version(self) -> None:
+        """Call after changing anything that board queries depend on"""
+        self.version = next(_versions)
 
     def get_tile(self, coord: OddRCoord) -> Tile | None:
         if coord.x < 0 or coord.x >= self.size_x:
@@ -151,25 +356,7 @@ class Board:
     ) -> IsCoordBlocked:
         if custom_jump_height is None:
             custom_jump_height = ENTITY_JUMP_HEIGHT
-
-        def is_coord_blocked(target_coord: OddRCoord, source_coord: OddRCoord) -> bool:
-            target_tile = self.get_tile(target_coord)
-            if target_tile is None:
-                return True
-            if collision and any(_entity.collision for _entity in target_tile.entities):
-                return True
-            if any(feature.is_collision() for feature in target_tile.features):
-                return True
-            previous_tile = self.get_tile(source_coord)
-            if previous_tile is None:
-                return True
-            return (
-                target_tile.get_total_height(side)
-                - previous_tile.get_total_height(side)
-                > custom_jump_height
-            )
-
-        return is_coord_blocked
+        return BoardIsCoordBlocked(self.grid, collision, side, custom_jump_height)
 
     def line_of_sight_check(
         self,
@@ -179,19 +366,9 @@ class Board:
         turn: Side | None,
         max_range: int | None = None,
     ) -> bool:
-        if max_range is not None and start_coord.get_distance(end_coord) > max_range:
-            return False
-        start_tile = self.get_tile(start_coord)
-        if start_tile is None:
-            raise ValueError("Start tile has invalid pos")
-        start_height = start_tile.get_total_height(turn)
-        for coord in start_coord.line_draw(end_coord):
-            tile = self.get_tile(coord)
-            if tile is None:
-                return False
-            if tile.get_total_height(turn) + altitude < start_height:
-                return False
-        return True
+        return self.grid.line_of_sight_check(
+            start_coord, end_coord, altitude, turn, max_range
+        )
 
     def try_move(self, entity: Entity, path: list[OddRCoord]) -> bool:
         """
@@ -216,9 +393,15 @@ class Board:
                 return False
         end_tile = path_tile
         assert end_tile is not None
+        self.record(entity)
+        self.record_tile(start_tile)
+        self.record_tile(end_tile)
         end_tile.entities.append(entity)
         start_tile.entities.remove(entity)
+        self.grid.remove_entity(entity)
         entity.pos = path[-1]
+        self.grid.add_entity(entity)
+        self.bump_version()
 
         return True
 
@@ -232,19 +415,192 @@ class Board:
         :param is_include_self: Whether to include the coord of rodent itself in the result
         :returns: Set of reachable coords
         """
-        return rodent.pos.get_reachable_coords(
+        key = (
+            "get_reachable_coords",
+            rodent.pos,
+            rodent.speed,
+            rodent.collision,
+            rodent.side,
+            self.version,
+        )
+        coords = self.query_cache.get_or_compute(
+            key,
+            lambda: self.grid.get_reachable_coords(
+                rodent.pos,
+                rodent.speed,
+                rodent.collision,
+                rodent.side,
+                ENTITY_JUMP_HEIGHT,
+            ),
+        )
+        # Same insertion order as `OddRCoord.get_reachable_coords`, so iteration
+        # order of the set doesn't depend on whether it was cached.
+        reachable_coords = {rodent.pos, *coords}
+        if not is_include_self:
+            reachable_coords.discard(rodent.pos)
+        return reachable_coords
+
+    def get_all_reachable_coords(self, rodents: Iterable[Rodent]) -> dict[Rodent, int]:
+        """
+        Get every coords each rodent can reach within its movement limit, for
+        all rodents together. Rodents with the same collision and side are
+        searched in one pass over the board. Same as `get_reachable_coords`
+        except for the order.
+
+        :param rodents: The rodents
+        :returns: Mask of reachable coords excluding its own pos of each
+        rodent, turned into coords with `BoardGrid.get_coords_from_mask`
+        """
+        masks: dict[Rodent, int] = {}
+        groups: dict[tuple[bool, Side | None], list[Rodent]] = defaultdict(list)
+        for rodent in rodents:
+            mask = self.query_cache.get(self._get_reachable_mask_key(rodent))
+            if isinstance(mask, int):
+                masks[rodent] = mask
+            else:
+                groups[rodent.collision, rodent.side].append(rodent)
+        for (collision, side), group in groups.items():
+            group_masks = self.grid.get_reachable_masks(
+                [rodent.pos for rodent in group],
+                [rodent.speed for rodent in group],
+                collision,
+                side,
+                ENTITY_JUMP_HEIGHT,
+            )
+            for rodent, mask in zip(group, group_masks):
+                self.query_cache.put(self._get_reachable_mask_key(rodent), mask)
+                masks[rodent] = mask
+        return masks
+
+    def _get_reachable_mask_key(self, rodent: Rodent) -> Hashable:
+        return (
+            "get_reachable_mask",
+            rodent.pos,
             rodent.speed,
-            self.is_coord_blocked(rodent),
-            is_include_self=is_include_self,
+            rodent.collision,
+            rodent.side,
+            self.version,
         )
 
     def path_find(
-        self, entity: Entity, goal: OddRCoord, custom_jump_height: int | None = None
+        self,
+        entity: Entity,
+        goal: OddRCoord,
+        custom_jump_height: int | None = None,
+        *,
+        is_bidirectional: bool = False,
     ) -> list[OddRCoord] | None:
-        return entity.pos.path_find(
-            goal, self.is_coord_blocked(entity, custom_jump_height)
+        """
+        Find a path for entity to goal
+
+        :param is_bidirectional: Search from both ends, faster for long paths but
+        may pick a different path of the same length
+        :returns: Path excluding entity's current pos or None if goal is not reachable
+        """
+        key = (
+            "path_find",
+            entity.pos,
+            goal,
+            entity.collision,
+            entity.side,
+            custom_jump_height,
+            is_bidirectional,
+            self.version,
+        )
+
+        def compute() -> list[OddRCoord] | None:
+            if is_bidirectional:
+                return entity.pos.path_find_bidirectional(
+                    goal, self.is_coord_blocked(entity, custom_jump_height)
+                )
+            return entity.pos.path_find(
+                goal, self.is_coord_blocked(entity, custom_jump_height)
+            )
+
+        path = self.query_cache.get_or_compute(key, compute)
+        return None if path is None else list(path)
+
+    def get_distance_map(
+        self,
+        goals: Iterable[OddRCoord],
+        collision: bool,
+        side: Side | None,
+        custom_jump_height: int | None = None,
+    ) -> DistanceMap:
+        """
+        Get distance and next step towards the nearest goal from every tile.
+        Cached until the board changes.
+
+        :param goals: Coords to path find to, never blocked by collision
+        :param collision: Collision of the entity that would walk
+        :param side: Side of the entity that would walk
+        :returns: Distance map of the goals
+        """
+        jump_height = (
+            ENTITY_JUMP_HEIGHT if custom_jump_height is None else custom_jump_height
+        )
+        goals = tuple(goals)
+        key = ("get_distance_map", goals, collision, side, jump_height, self.version)
+        return self.query_cache.get_or_compute(
+            key, lambda: DistanceMap(self.grid, goals, collision, side, jump_height)
+        )
+
+    def get_threat_map(self) -> ThreatMap:
+        """
+        Get damage each side could deal to every tile on its next turn and
+        which side controls each tile. Cached until the board changes.
+        """
+        rodents = [
+            rodent
+            for rodent in self.cache.rodents
+            if EntityTag.NO_ATTACK not in rodent.entity_tags
+        ]
+        # Effects can change speed and attack without changing the board
+        key = (
+            "get_threat_map",
+            tuple((rodent, rodent.speed, rodent.attack) for rodent in rodents),
+            self.version,
+        )
+        return self.query_cache.get_or_compute(
+            key, lambda: ThreatMap(self.grid, rodents, ENTITY_JUMP_HEIGHT)
         )
 
+    def get_attackable_masks(self, side: Side) -> dict[tuple[Rodent, int], int]:
+        """
+        Get every coords each rodent of a side can attack with each of its
+        skills with reach, all in one pass. Cached until the board changes.
+
+        :param side: Side of the rodents
+        :returns: Mask of attackable coords of each rodent and skill index,
+        checked with `BoardGrid.is_coord_in_mask` and turned into coords with
+        `BoardGrid.get_coords_from_mask`
+        """
+
+        def compute() -> dict[tuple[Rodent, int], int]:
+            pairs: list[tuple[Rodent, int]] = []
+            for entity in self.cache.sides[side]:
+                if not isinstance(entity, Rodent):
+                    continue
+                for skill_index, skill in enumerate(entity.skills):
+                    if skill.reach is not None:
+                        pairs.append((entity, skill_index))
+            masks = self.grid.get_attackable_masks(
+                [rodent.pos for rodent, _ in pairs],
+                [rodent.side for rodent, _ in pairs],
+                [
+                    rodent.skills[skill_index].reach or 0
+                    for rodent, skill_index in pairs
+                ],
+                [
+                    rodent.skills[skill_index].altitude or 0
+                    for rodent, skill_index in pairs
+                ],
+            )
+            return dict(zip(pairs, masks))
+
+        key = ("get_attackable_masks", side, self.version)
+        return self.query_cache.get_or_compute(key, compute)
+
     def get_attackable_coords(
         self, rodent: Rodent, skill: CallableEntitySkill
     ) -> Iterable[OddRCoord]:
@@ -255,7 +611,19 @@ class Board:
         :param skill: Which skills of the rodent to use in calculation
         :returns: All attackable coords
         """
-        return get_attackable_coords(self, rodent, skill)
+        key = (
+            "get_attackable_coords",
+            rodent.pos,
+            rodent.side,
+            skill.reach,
+            skill.altitude,
+            self.version,
+        )
+        return list(
+            self.query_cache.get_or_compute(
+                key, lambda: get_attackable_coords(self, rodent, skill)
+            )
+        )
         # rodent_tile = self.get_tile(rodent.pos)
         # if rodent_tile is None:
         #     raise ValueError("Rodent has invalid pos")
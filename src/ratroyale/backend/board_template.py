@@ -0,0 +1,98 @@
+from collections import defaultdict
+from typing import Any
+
+from ..utils import EventQueue, OrderedSet
+from .board import Board, Cache, QueryCache
+from .map import Map
+from .tile import Tile
+
+
+def _clone_value(value: Any, memo: dict[int, Any]) -> Any:
+    """
+    Clone of an object from `memo`, or a copy of a builtin container with
+    everything in it cloned. Anything else is shared since it's never changed.
+    """
+    clone = memo.get(id(value))
+    if clone is not None:
+        return clone
+    if isinstance(value, list):
+        return [_clone_value(item, memo) for item in value]
+    if isinstance(value, OrderedSet):
+        return OrderedSet(_clone_value(item, memo) for item in value)
+    if isinstance(value, dict):
+        items = (
+            (_clone_value(key, memo), _clone_value(item, memo))
+            for key, item in value.items()
+        )
+        if isinstance(value, defaultdict):
+            return defaultdict(value.default_factory, items)
+        return dict(items)
+    return value
+
+
+def _clone_state(obj: Any, clone: Any, memo: dict[int, Any]) -> None:
+    clone.__dict__.update(
+        {name: _clone_value(value, memo) for name, value in obj.__dict__.items()}
+    )
+
+
+class BoardTemplate:
+    """
+    Board built once from a map, that fresh boards for each game on the map
+    are cloned from. Cloning copies the tiles, entities, features and cache
+    structurally, so it skips deep copying the map and adding every pre-placed
+    entity again.
+    """
+
+    def __init__(self, map: Map) -> None:
+        self.map = map
+        self._board = Board(map)
+
+    def create_board(self) -> Board:
+        """Fresh board, the same as `Board(self.map)` would give"""
+        template = self._board
+        cache = template.cache
+        memo: dict[int, Any] = {}
+        objects: list[Any] = [
+            *cache.entities,
+            *cache.features,
+            *cache.effects,
+            *cache.timers,
+        ]
+        # Every object gets its clone before any state is copied, since they
+        # can refer to each other
+        for obj in objects:
+            memo[id(obj)] = object.__new__(type(obj))
+        for obj in objects:
+            _clone_state(obj, memo[id(obj)], memo)
+
+        board = Board.__new__(Board)
+        board.bump_version()
+        board.query_cache = QueryCache()
+        board.journals = []
+        board.size_x = template.size_x
+        board.size_y = template.size_y
+        board.tiles = [
+            [self._clone_tile(tile, memo) for tile in row] for row in template.tiles
+        ]
+        board.grid = template.grid.copy(board.tiles)
+        board.cache = Cache.__new__(Cache)
+        _clone_state(cache, board.cache, memo)
+        board.event_queue = EventQueue()
+        for event in template.event_queue.queue:
+            event_clone = object.__new__(type(event))
+            _clone_state(event, event_clone, memo)
+            board.event_queue.put_nowait(event_clone)
+        return board
+
+    @staticmethod
+    def _clone_tile(tile: Tile | None, memo: dict[int, Any]) -> Tile | None:
+        if tile is None:
+            return None
+        return Tile(
+            tile.tile_id,
+            tile.coord,
+            tile.height,
+            [memo[id(entity)] for entity in tile.entities],
+            [memo[id(feature)] for feature in tile.features],
+        )
@@ -0,0 +1,71 @@
+from typing import Protocol
+
+
+class TurnClock(Protocol):
+    @property
+    def turn_count(self) -> int: ...
+
+
+class Countdown:
+    """
+    Duration in turns that counts down on its own once it's started on a
+    clock, instead of being decremented every turn. A duration of 1 runs out
+    on the current turn count and None never runs out.
+    """
+
+    _clock: TurnClock | None = None
+    _duration: int | None
+    _duration_turn = 0
+    """Turn count `_duration` was set on"""
+    _turn_passed = 0
+    _start_turn = 0
+    """Turn count `_turn_passed` was set on"""
+    cache_order: int = 0
+    """When it was last added to a cache, to go through them in cache order"""
+
+    @property
+    def duration(self) -> int | None:
+        if self._clock is None or self._duration is None:
+            return self._duration
+        return self._duration - (self._clock.turn_count - self._duration_turn)
+
+    @duration.setter
+    def duration(self, duration: int | None) -> None:
+        self._duration = duration
+        if self._clock is not None:
+            self._duration_turn = self._clock.turn_count
+
+    @property
+    def turn_passed(self) -> int:
+        if self._clock is None:
+            return self._turn_passed
+        return self._turn_passed + (self._clock.turn_count - self._start_turn)
+
+    @turn_passed.setter
+    def turn_passed(self, turn_passed: int) -> None:
+        self._turn_passed = turn_passed
+        if self._clock is not None:
+            self._start_turn = self._clock.turn_count
+
+    @property
+    def expiry_turn(self) -> int | None:
+        """Turn count the duration is 1 on, or None if it isn't counting down"""
+        if self._clock is None or self._duration is None:
+            return None
+        return self._duration_turn + self._duration - 1
+
+    def start(self, clock: TurnClock) -> None:
+        """Start counting down from the current duration as `clock` goes on"""
+        duration = self.duration
+        turn_passed = self.turn_passed
+        self._clock = clock
+        self.duration = duration
+        self.turn_passed = turn_passed
+
+    def stop(self) -> None:
+        """Stop counting down, keeping the current duration"""
+        duration = self.duration
+        turn_passed = self.turn_passed
+        self._clock = None
+        self.duration = duration
+        self.turn_passed = turn_passed
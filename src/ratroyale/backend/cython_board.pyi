@@ -1,9 +1,290 @@
+from array import array
 from typing import Iterable
 from .entities.rodent import Rodent
-from .entity import CallableEntitySkill
-from .hexagon import OddRCoord
+from .entity import CallableEntitySkill, Entity
+from .feature import Feature
+from .hexagon import IsCoordBlocked, OddRCoord
+from .side import Side
+from .tile import Tile
 from .board import Board
 
+class BoardGrid:
+    """
+    Flat, index-addressed core of the board. Tile at `OddRCoord(x, y)` has
+    index `y * size_x + x`. Neighbor of a tile at direction `d` is
+    `neighbors[index * 6 + d]`, or -1 if there's no tile there.
+    Total height of a tile on a turn is
+    `total_heights[Side.to_int(turn) * tile_count + index]`.
+    """
+
+    size_x: int
+    size_y: int
+    tile_count: int
+    tiles: list[Tile | None]
+    heights: array[int]
+    """Tile heights without any entity"""
+    total_heights: array[int]
+    """
+    Same as `Tile.get_total_height` of every tile for each turn, kept up to date
+    as entities enter, leave, die or change height
+    """
+    tile_exists: array[int]
+    entity_collisions: array[int]
+    """Amount of entities with collision on each tile"""
+    feature_collisions: array[int]
+    """Amount of features with collision on each tile"""
+    neighbors: array[int]
+
+    def __init__(self, tiles: list[list[Tile | None]]) -> None: ...
+    def get_index(self, coord: OddRCoord) -> int:
+        """
+        :returns: Index of the coord or -1 if it's out of bound
+        """
+        ...
+
+    def get_coord(self, index: int) -> OddRCoord: ...
+    def add_entity(self, entity: Entity) -> None:
+        """Call after entity is added to its tile"""
+        ...
+
+    def remove_entity(self, entity: Entity) -> None:
+        """Call after entity is removed from its tile"""
+        ...
+
+    def update_entity_height(self, entity: Entity) -> None:
+        """Call after height of entity is changed"""
+        ...
+
+    def update_total_heights(self, index: int) -> None:
+        """Recalculate total heights of a tile for every turn from its entities"""
+        ...
+
+    def add_feature(self, feature: Feature) -> None: ...
+    def remove_feature(self, feature: Feature) -> None: ...
+    def get_state(self) -> tuple[array[int], array[int], array[int]]:
+        """Copy of every array that changes as entities and features change"""
+        ...
+
+    def set_state(self, state: tuple[array[int], array[int], array[int]]) -> None:
+        """Overwrite arrays in place with a copy from `get_state`"""
+        ...
+
+    def copy(self, tiles: list[list[Tile | None]]) -> "BoardGrid":
+        """
+        Same grid over `tiles`, a copy of the tiles it was built from, without
+        reading the tiles again
+        """
+        ...
+
+    def get_tile_state(self, index: int) -> tuple[int, int, int, int, int]:
+        """Values of a tile from every array that `get_state` copies"""
+        ...
+
+    def set_tile_state(
+        self, index: int, state: tuple[int, int, int, int, int]
+    ) -> None: ...
+    def get_total_height(self, index: int, side: Side | None) -> int: ...
+    def is_blocked(
+        self,
+        target_index: int,
+        source_index: int,
+        collision: bool,
+        side: Side | None,
+        jump_height: int,
+    ) -> bool:
+        """
+        Whether an entity can't step from source tile to target tile
+        """
+        ...
+
+    def get_reachable_coords(
+        self,
+        start: OddRCoord,
+        reach: int,
+        collision: bool,
+        side: Side | None,
+        jump_height: int,
+    ) -> list[OddRCoord]:
+        """
+        Same as `OddRCoord.get_reachable_coords` with board's blocked check,
+        but walks the neighbor table instead of allocating coords.
+
+        :returns: Reachable coords excluding start in the order they're found
+        """
+        ...
+
+    def get_reachable_masks(
+        self,
+        starts: list[OddRCoord],
+        reaches: list[int],
+        collision: bool,
+        side: Side | None,
+        jump_height: int,
+    ) -> list[int]:
+        """
+        Same as `get_reachable_coords` for many entities with the same
+        collision and side at once. Each tile keeps a bit per entity, so one
+        sweep over the board moves every entity's fringe a step.
+
+        :returns: Mask of reachable tiles excluding start for each start, with
+        bit `index` set if the tile at `index` is reachable
+        """
+        ...
+
+    def get_attackable_masks(
+        self,
+        starts: list[OddRCoord],
+        sides: list[Side | None],
+        reaches: list[int],
+        altitudes: list[int],
+    ) -> list[int]:
+        """
+        Same as `get_attackable_coords` for many attackers at once, each at a
+        start with a side, a skill reach and a skill altitude. Coords out of
+        bound are left out since masks only cover the board.
+
+        :returns: Mask of attackable tiles for each attacker, with bit `index`
+        set if the tile at `index` is attackable
+        """
+        ...
+
+    def is_coord_in_mask(self, mask: int, coord: OddRCoord) -> bool:
+        """Whether the bit of the coord is set in the mask"""
+        ...
+
+    def get_coords_from_mask(self, mask: int) -> list[OddRCoord]:
+        """
+        :returns: Coords of every tile with its bit set in the mask, by index
+        """
+        ...
+
+    def path_find(
+        self,
+        start_index: int,
+        goal_index: int,
+        collision: bool,
+        side: Side | None,
+        jump_height: int,
+    ) -> list[OddRCoord] | None:
+        """
+        Same as `OddRCoord.path_find` with board's blocked check and unit cost.
+        Visits tiles in the same order, so it returns the same path.
+        """
+        ...
+
+    def path_find_bidirectional(
+        self,
+        start_index: int,
+        goal_index: int,
+        collision: bool,
+        side: Side | None,
+        jump_height: int,
+    ) -> list[OddRCoord] | None:
+        """
+        Breadth first search from both start and goal at the same time.
+        Returns a shortest path, but not necessarily the same one as `path_find`.
+        """
+        ...
+
+    def line_of_sight_check(
+        self,
+        start_coord: OddRCoord,
+        end_coord: OddRCoord,
+        altitude: int,
+        turn: Side | None,
+        max_range: int | None = None,
+    ) -> bool: ...
+
+class DistanceMap:
+    """
+    Distance and next step towards the nearest goal for every tile, computed
+    with one breadth first search backward from all goals. Goal tiles
+    themselves are never blocked by collision, so a feature like a lair can be
+    used as goals.
+    """
+
+    grid: BoardGrid
+    distances: array[int]
+    """Steps to the nearest goal of each tile, -1 if there's no path"""
+    next_steps: array[int]
+    """Index of the next tile towards the nearest goal, -1 if there's none"""
+
+    def __init__(
+        self,
+        grid: BoardGrid,
+        goals: Iterable[OddRCoord],
+        collision: bool,
+        side: Side | None,
+        jump_height: int,
+    ) -> None: ...
+    def get_distance(self, coord: OddRCoord) -> int | None:
+        """
+        :returns: Steps to the nearest goal or None if it can't reach any
+        """
+        ...
+
+    def get_next_step(self, coord: OddRCoord) -> OddRCoord | None:
+        """
+        :returns: Next coord towards the nearest goal or None if there's none
+        """
+        ...
+
+    def get_path(self, coord: OddRCoord) -> list[OddRCoord] | None:
+        """
+        :returns: Path to the nearest goal excluding coord itself or None if
+        it can't reach any
+        """
+        ...
+
+class ThreatMap:
+    """
+    Damage the rodents of each side could deal to every tile on their next
+    turn, by moving anywhere they can reach and attacking from there with any
+    skill with reach. Each rodent counts once per tile with its attack.
+    """
+
+    grid: BoardGrid
+    damages: array[int]
+    """Damage of a side on a tile at `damages[Side.to_int(side) * tile_count + index]`"""
+
+    def __init__(
+        self, grid: BoardGrid, rodents: Iterable[Rodent], jump_height: int
+    ) -> None: ...
+    def get_damage(self, coord: OddRCoord, side: Side) -> int:
+        """
+        :returns: Damage rodents of the side could deal to the coord
+        """
+        ...
+
+    def get_threat(self, coord: OddRCoord, side: Side) -> int:
+        """
+        :returns: Damage enemies of the side could deal to the coord
+        """
+        ...
+
+    def get_controller(self, coord: OddRCoord) -> Side | None:
+        """
+        :returns: Side that could deal more damage to the coord or None if
+        neither could deal more
+        """
+        ...
+
+class BoardIsCoordBlocked(IsCoordBlocked):
+    """
+    `is_coord_blocked` of a board for an entity with given `collision`, `side`
+    and `jump_height`. Evaluated against `BoardGrid` without leaving C.
+    """
+
+    grid: BoardGrid
+    collision: bool
+    side: Side | None
+    jump_height: int
+
+    def __init__(
+        self, grid: BoardGrid, collision: bool, side: Side | None, jump_height: int
+    ) -> None: ...
+    def __call__(self, target_coord: OddRCoord, source_coord: OddRCoord) -> bool: ...
+
 def get_attackable_coords(
     board: Board, rodent: Rodent, skill: CallableEntitySkill
 ) -> Iterable[OddRCoord]: ...
@@ -1,4 +1,1060 @@
-from .hexagon cimport OddRCoord
+from cpython cimport array
+from libc.string cimport memcpy
+import array
+
+from .side import Side
+
+from .hexagon cimport (
+    IsCoordBlocked,
+    OddRCoord,
+    _AStarHeap,
+    _AxialCoord,
+    get_disk_template,
+    get_line_template,
+    is_template_backend_enabled,
+)
+
+
+cdef array.array _INT_TEMPLATE = array.array("i", [])
+cdef array.array _UCHAR_TEMPLATE = array.array("B", [])
+cdef array.array _FLOAT_TEMPLATE = array.array("f", [])
+cdef array.array _ULONGLONG_TEMPLATE = array.array("Q", [])
+
+cdef enum:
+    _BATCH_SIZE = 64
+
+
+cdef inline int _get_side_int(object side):
+    if side is None:
+        return 0
+    return side.value
+
+
+cdef inline int _get_distance(int x1, int y1, int x2, int y2) noexcept:
+    cdef int q1 = x1 - (y1 - (y1 & 1)) // 2
+    cdef int q2 = x2 - (y2 - (y2 & 1)) // 2
+    cdef int dq = q1 - q2
+    cdef int dr = y1 - y2
+    cdef int ds = -dq - dr
+    return (abs(dq) + abs(dr) + abs(ds)) // 2
+
+
+cdef class BoardGrid:
+    """
+    Flat, index-addressed core of the board. Tile at `OddRCoord(x, y)` has
+    index `y * size_x + x`. Neighbor of a tile at direction `d` is
+    `neighbors[index * 6 + d]`, or -1 if there's no tile there.
+    Total height of a tile on a turn is
+    `total_heights[Side.to_int(turn) * tile_count + index]`.
+    """
+
+    cdef readonly int size_x, size_y, tile_count
+    cdef readonly list tiles
+    cdef readonly array.array heights
+    cdef readonly array.array total_heights
+    cdef readonly array.array tile_exists
+    cdef readonly array.array entity_collisions
+    cdef readonly array.array feature_collisions
+    cdef readonly array.array neighbors
+
+    def __init__(self, list tiles):
+        cdef int index, direction, neighbor_index
+        cdef OddRCoord coord, neighbor
+        cdef object tile
+
+        self.size_y = len(tiles)
+        self.size_x = len(tiles[0])
+        self.tile_count = self.size_x * self.size_y
+        self.tiles = [tile for row in tiles for tile in row]
+        self.heights = array.clone(_INT_TEMPLATE, self.tile_count, zero=True)
+        self.total_heights = array.clone(
+            _INT_TEMPLATE, self.tile_count * 3, zero=True
+        )
+        self.tile_exists = array.clone(_UCHAR_TEMPLATE, self.tile_count, zero=True)
+        self.entity_collisions = array.clone(
+            _INT_TEMPLATE, self.tile_count, zero=True
+        )
+        self.feature_collisions = array.clone(
+            _INT_TEMPLATE, self.tile_count, zero=True
+        )
+        self.neighbors = array.clone(_INT_TEMPLATE, self.tile_count * 6, zero=False)
+
+        for index in range(self.tile_count):
+            tile = self.tiles[index]
+            if tile is None:
+                continue
+            self.tile_exists.data.as_uchars[index] = 1
+            self.heights.data.as_ints[index] = tile.height
+            for entity in tile.entities:
+                if entity.collision:
+                    self.entity_collisions.data.as_ints[index] += 1
+            for feature in tile.features:
+                if feature.is_collision():
+                    self.feature_collisions.data.as_ints[index] += 1
+            self.update_total_heights(index)
+
+        for index in range(self.tile_count):
+            coord = self.get_coord(index)
+            for direction in range(6):
+                neighbor = coord.get_neighbor(direction)
+                neighbor_index = self.get_index(neighbor)
+                if (
+                    neighbor_index != -1
+                    and not self.tile_exists.data.as_uchars[neighbor_index]
+                ):
+                    neighbor_index = -1
+                self.neighbors.data.as_ints[index * 6 + direction] = neighbor_index
+
+    cpdef int get_index(self, OddRCoord coord):
+        if coord.x < 0 or coord.x >= self.size_x:
+            return -1
+        if coord.y < 0 or coord.y >= self.size_y:
+            return -1
+        return coord.y * self.size_x + coord.x
+
+    cpdef OddRCoord get_coord(self, int index):
+        return OddRCoord(index % self.size_x, index // self.size_x)
+
+    cpdef void add_entity(self, object entity):
+        """Call after entity is added to its tile"""
+        cdef int index = self.get_index(entity.pos)
+        if index == -1:
+            return
+        if entity.collision:
+            self.entity_collisions.data.as_ints[index] += 1
+        self.update_total_heights(index)
+
+    cpdef void remove_entity(self, object entity):
+        """Call after entity is removed from its tile"""
+        cdef int index = self.get_index(entity.pos)
+        if index == -1:
+            return
+        if entity.collision:
+            self.entity_collisions.data.as_ints[index] -= 1
+        self.update_total_heights(index)
+
+    cpdef void update_entity_height(self, object entity):
+        """Call after height of entity is changed"""
+        cdef int index = self.get_index(entity.pos)
+        if index == -1:
+            return
+        self.update_total_heights(index)
+
+    cpdef void update_total_heights(self, int index):
+        """Recalculate total heights of a tile for every turn from its entities"""
+        cdef object tile = self.tiles[index]
+        cdef int side_int, entity_side_int, entity_height
+        cdef int[3] max_heights = [0, 0, 0]
+        if tile is None:
+            return
+        for entity in tile.entities:
+            entity_side_int = _get_side_int(entity.side)
+            entity_height = entity.height
+            for side_int in range(3):
+                if side_int != entity_side_int and entity_height > max_heights[side_int]:
+                    max_heights[side_int] = entity_height
+        for side_int in range(3):
+            self.total_heights.data.as_ints[side_int * self.tile_count + index] = (
+                tile.height + max_heights[side_int]
+            )
+
+    cpdef void add_feature(self, object feature):
+        cdef int index
+        if not feature.is_collision():
+            return
+        for pos in feature.shape:
+            index = self.get_index(pos)
+            if index == -1:
+                continue
+            self.feature_collisions.data.as_ints[index] += 1
+
+    cpdef void remove_feature(self, object feature):
+        cdef int index
+        if not feature.is_collision():
+            return
+        for pos in feature.shape:
+            index = self.get_index(pos)
+            if index == -1:
+                continue
+            self.feature_collisions.data.as_ints[index] -= 1
+
+    cpdef tuple get_state(self):
+        """Copy of every array that changes as entities and features change"""
+        return (
+            array.copy(self.total_heights),
+            array.copy(self.entity_collisions),
+            array.copy(self.feature_collisions),
+        )
+
+    cpdef void set_state(self, tuple state):
+        """Overwrite arrays in place with a copy from `get_state`"""
+        cdef array.array total_heights = state[0]
+        cdef array.array entity_collisions = state[1]
+        cdef array.array feature_collisions = state[2]
+        memcpy(
+            self.total_heights.data.as_ints,
+            total_heights.data.as_ints,
+            self.tile_count * 3 * sizeof(int),
+        )
+        memcpy(
+            self.entity_collisions.data.as_ints,
+            entity_collisions.data.as_ints,
+            self.tile_count * sizeof(int),
+        )
+        memcpy(
+            self.feature_collisions.data.as_ints,
+            feature_collisions.data.as_ints,
+            self.tile_count * sizeof(int),
+        )
+
+    cpdef BoardGrid copy(self, list tiles):
+        """
+        Same grid over `tiles`, a copy of the tiles it was built from, without
+        reading the tiles again
+        """
+        cdef BoardGrid grid = BoardGrid.__new__(BoardGrid)
+        grid.size_x = self.size_x
+        grid.size_y = self.size_y
+        grid.tile_count = self.tile_count
+        grid.tiles = [tile for row in tiles for tile in row]
+        grid.heights = array.copy(self.heights)
+        grid.total_heights = array.copy(self.total_heights)
+        grid.tile_exists = array.copy(self.tile_exists)
+        grid.entity_collisions = array.copy(self.entity_collisions)
+        grid.feature_collisions = array.copy(self.feature_collisions)
+        grid.neighbors = array.copy(self.neighbors)
+        return grid
+
+    cpdef tuple get_tile_state(self, int index):
+        """Values of a tile from every array that `get_state` copies"""
+        return (
+            self.total_heights.data.as_ints[index],
+            self.total_heights.data.as_ints[self.tile_count + index],
+            self.total_heights.data.as_ints[self.tile_count * 2 + index],
+            self.entity_collisions.data.as_ints[index],
+            self.feature_collisions.data.as_ints[index],
+        )
+
+    cpdef void set_tile_state(self, int index, tuple state):
+        self.total_heights.data.as_ints[index] = state[0]
+        self.total_heights.data.as_ints[self.tile_count + index] = state[1]
+        self.total_heights.data.as_ints[self.tile_count * 2 + index] = state[2]
+        self.entity_collisions.data.as_ints[index] = state[3]
+        self.feature_collisions.data.as_ints[index] = state[4]
+
+    cpdef int get_total_height(self, int index, object side):
+        return self.total_heights.data.as_ints[
+            _get_side_int(side) * self.tile_count + index
+        ]
+
+    cdef inline bint _is_blocked(
+        self,
+        int target_index,
+        int source_index,
+        bint collision,
+        int *total_heights,
+        int jump_height,
+    ) noexcept:
+        if target_index == -1 or not self.tile_exists.data.as_uchars[target_index]:
+            return 1
+        if collision and self.entity_collisions.data.as_ints[target_index] > 0:
+            return 1
+        if self.feature_collisions.data.as_ints[target_index] > 0:
+            return 1
+        if source_index == -1 or not self.tile_exists.data.as_uchars[source_index]:
+            return 1
+        return total_heights[target_index] - total_heights[source_index] > jump_height
+
+    cdef inline int *_get_total_heights(self, object side):
+        """Pointer to total heights of every tile on a turn"""
+        return self.total_heights.data.as_ints + _get_side_int(side) * self.tile_count
+
+    cpdef bint is_blocked(
+        self,
+        int target_index,
+        int source_index,
+        bint collision,
+        object side,
+        int jump_height,
+    ):
+        """
+        Whether an entity can't step from source tile to target tile
+        """
+        return self._is_blocked(
+            target_index,
+            source_index,
+            collision,
+            self._get_total_heights(side),
+            jump_height,
+        )
+
+    cpdef list get_reachable_coords(
+        self,
+        OddRCoord start,
+        int reach,
+        bint collision,
+        object side,
+        int jump_height,
+    ):
+        """
+        Same as `OddRCoord.get_reachable_coords` with board's blocked check,
+        but walks the neighbor table instead of allocating coords.
+
+        :returns: Reachable coords excluding start in the order they're found
+        """
+        cdef int start_index = self.get_index(start)
+        cdef int k, i, direction, index, neighbor_index
+        cdef array.array visited
+        cdef list fringe, next_fringe
+        cdef list result = []
+        cdef int *neighbors = self.neighbors.data.as_ints
+        cdef int *entity_collisions = self.entity_collisions.data.as_ints
+        cdef int *feature_collisions = self.feature_collisions.data.as_ints
+        cdef int *heights = self._get_total_heights(side)
+
+        if start_index == -1 or not self.tile_exists.data.as_uchars[start_index]:
+            return result
+
+        visited = array.clone(_UCHAR_TEMPLATE, self.tile_count, zero=True)
+        visited.data.as_uchars[start_index] = 1
+        fringe = [start_index]
+
+        for k in range(reach):
+            next_fringe = []
+            for i in range(len(fringe)):
+                index = fringe[i]
+                for direction in range(6):
+                    neighbor_index = neighbors[index * 6 + direction]
+                    if neighbor_index == -1:
+                        continue
+                    if visited.data.as_uchars[neighbor_index]:
+                        continue
+                    if collision and entity_collisions[neighbor_index] > 0:
+                        continue
+                    if feature_collisions[neighbor_index] > 0:
+                        continue
+                    if heights[neighbor_index] - heights[index] > jump_height:
+                        continue
+                    visited.data.as_uchars[neighbor_index] = 1
+                    next_fringe.append(neighbor_index)
+                    result.append(self.get_coord(neighbor_index))
+            fringe = next_fringe
+
+        return result
+
+    cpdef list get_reachable_masks(
+        self,
+        list starts,
+        list reaches,
+        bint collision,
+        object side,
+        int jump_height,
+    ):
+        """
+        Same as `get_reachable_coords` for many entities with the same
+        collision and side at once. Each tile keeps a bit per entity, so one
+        sweep over the board moves every entity's fringe a step.
+
+        :returns: Mask of reachable tiles excluding start for each start, with
+        bit `index` set if the tile at `index` is reachable
+        """
+        cdef list masks = []
+        cdef int batch_start
+        for batch_start in range(0, len(starts), _BATCH_SIZE):
+            masks.extend(
+                self._get_reachable_masks(
+                    starts[batch_start : batch_start + _BATCH_SIZE],
+                    reaches[batch_start : batch_start + _BATCH_SIZE],
+                    collision,
+                    self._get_total_heights(side),
+                    jump_height,
+                )
+            )
+        return masks
+
+    cdef list _get_reachable_masks(
+        self,
+        list starts,
+        list reaches,
+        bint collision,
+        int *heights,
+        int jump_height,
+    ):
+        cdef int count = len(starts)
+        cdef int i, j, k, index, direction, neighbor_index, max_reach = 0
+        cdef int fringe_count = 0
+        cdef int next_count
+        cdef int[_BATCH_SIZE] start_indices
+        cdef int[_BATCH_SIZE] batch_reaches
+        cdef unsigned long long bit, bits, new_bits, active
+        cdef array.array visited_array, fringe_array, next_fringe_array
+        cdef array.array fringe_indices_array, next_indices_array
+        cdef unsigned long long *visited
+        cdef unsigned long long *fringe
+        cdef unsigned long long *next_fringe
+        cdef unsigned long long *swap
+        cdef int *fringe_indices
+        cdef int *next_indices
+        cdef int *swap_indices
+        cdef int *neighbors = self.neighbors.data.as_ints
+        cdef int *entity_collisions = self.entity_collisions.data.as_ints
+        cdef int *feature_collisions = self.feature_collisions.data.as_ints
+        cdef bytearray mask
+        cdef unsigned char *mask_data
+        cdef list masks = []
+
+        visited_array = array.clone(_ULONGLONG_TEMPLATE, self.tile_count, zero=True)
+        fringe_array = array.clone(_ULONGLONG_TEMPLATE, self.tile_count, zero=True)
+        next_fringe_array = array.clone(
+            _ULONGLONG_TEMPLATE, self.tile_count, zero=True
+        )
+        fringe_indices_array = array.clone(_INT_TEMPLATE, self.tile_count, zero=False)
+        next_indices_array = array.clone(_INT_TEMPLATE, self.tile_count, zero=False)
+        visited = visited_array.data.as_ulonglongs
+        fringe = fringe_array.data.as_ulonglongs
+        next_fringe = next_fringe_array.data.as_ulonglongs
+        fringe_indices = fringe_indices_array.data.as_ints
+        next_indices = next_indices_array.data.as_ints
+
+        for i in range(count):
+            index = self.get_index(starts[i])
+            batch_reaches[i] = reaches[i]
+            if index == -1 or not self.tile_exists.data.as_uchars[index]:
+                start_indices[i] = -1
+                continue
+            start_indices[i] = index
+            bit = 1ULL << i
+            visited[index] |= bit
+            if not fringe[index]:
+                fringe_indices[fringe_count] = index
+                fringe_count += 1
+            fringe[index] |= bit
+            if batch_reaches[i] > max_reach:
+                max_reach = batch_reaches[i]
+
+        for k in range(max_reach):
+            active = 0
+            for i in range(count):
+                if batch_reaches[i] > k:
+                    active |= 1ULL << i
+            next_count = 0
+            for j in range(fringe_count):
+                index = fringe_indices[j]
+                bits = fringe[index] & active
+                # Clear as it goes, so it's empty when it becomes next fringe
+                fringe[index] = 0
+                if not bits:
+                    continue
+                for direction in range(6):
+                    neighbor_index = neighbors[index * 6 + direction]
+                    if neighbor_index == -1:
+                        continue
+                    if collision and entity_collisions[neighbor_index] > 0:
+                        continue
+                    if feature_collisions[neighbor_index] > 0:
+                        continue
+                    if heights[neighbor_index] - heights[index] > jump_height:
+                        continue
+                    new_bits = bits & ~visited[neighbor_index]
+                    if not new_bits:
+                        continue
+                    if not next_fringe[neighbor_index]:
+                        next_indices[next_count] = neighbor_index
+                        next_count += 1
+                    next_fringe[neighbor_index] |= new_bits
+            for j in range(next_count):
+                index = next_indices[j]
+                visited[index] |= next_fringe[index]
+            swap = fringe
+            fringe = next_fringe
+            next_fringe = swap
+            swap_indices = fringe_indices
+            fringe_indices = next_indices
+            next_indices = swap_indices
+            fringe_count = next_count
+
+        for i in range(count):
+            if start_indices[i] == -1:
+                masks.append(0)
+                continue
+            bit = 1ULL << i
+            mask = bytearray((self.tile_count + 7) // 8)
+            mask_data = mask
+            for index in range(self.tile_count):
+                if visited[index] & bit and index != start_indices[i]:
+                    mask_data[index >> 3] |= 1 << (index & 7)
+            masks.append(int.from_bytes(mask, "little"))
+        return masks
+
+    cpdef list get_attackable_masks(
+        self, list starts, list sides, list reaches, list altitudes
+    ):
+        """
+        Same as `get_attackable_coords` for many attackers at once, each at a
+        start with a side, a skill reach and a skill altitude. Coords out of
+        bound are left out since masks only cover the board.
+
+        :returns: Mask of attackable tiles for each attacker, with bit `index`
+        set if the tile at `index` is attackable
+        """
+        cdef int i, dq, dr, start_index, target_index, max_altitude
+        cdef int *total_heights
+        cdef OddRCoord start
+        cdef _AxialCoord axial
+        cdef bytearray mask
+        cdef unsigned char *mask_data
+        cdef list masks = []
+
+        for i in range(len(starts)):
+            start = starts[i]
+            start_index = self.get_index(start)
+            if start_index == -1 or not self.tile_exists.data.as_uchars[start_index]:
+                raise ValueError("Attacker has invalid pos")
+            total_heights = self._get_total_heights(sides[i])
+            max_altitude = total_heights[start_index] + altitudes[i]
+            axial = start.to_axial()
+            mask = bytearray((self.tile_count + 7) // 8)
+            mask_data = mask
+            for dq, dr in get_disk_template(reaches[i]):
+                target_index = _get_axial_index(self, axial.q + dq, axial.r + dr)
+                if target_index == -1:
+                    continue
+                if _is_attackable(self, axial, dq, dr, total_heights, max_altitude):
+                    mask_data[target_index >> 3] |= 1 << (target_index & 7)
+            masks.append(int.from_bytes(mask, "little"))
+        return masks
+
+    cpdef bint is_coord_in_mask(self, object mask, OddRCoord coord):
+        """Whether the bit of the coord is set in the mask"""
+        cdef int index = self.get_index(coord)
+        if index == -1:
+            return 0
+        return (mask >> index) & 1
+
+    cpdef list get_coords_from_mask(self, object mask):
+        """
+        :returns: Coords of every tile with its bit set in the mask, by index
+        """
+        cdef bytes data = mask.to_bytes((self.tile_count + 7) // 8, "little")
+        cdef const unsigned char *data_pointer = data
+        cdef int byte_index, bit_index
+        cdef unsigned char byte
+        cdef list coords = []
+        for byte_index in range(len(data)):
+            byte = data_pointer[byte_index]
+            if not byte:
+                continue
+            for bit_index in range(8):
+                if byte & (1 << bit_index):
+                    coords.append(self.get_coord(byte_index * 8 + bit_index))
+        return coords
+
+    cpdef list path_find(
+        self,
+        int start_index,
+        int goal_index,
+        bint collision,
+        object side,
+        int jump_height,
+    ):
+        """
+        Same as `OddRCoord.path_find` with board's blocked check and unit cost.
+        Visits tiles in the same order, so it returns the same path.
+        """
+        cdef _AStarHeap frontier = _AStarHeap()
+        cdef array.array came_from
+        cdef array.array cost_so_far
+        cdef array.array seen
+        cdef int current, direction, next_index, goal_x, goal_y
+        cdef float new_cost, priority
+        cdef list path
+        cdef int *neighbors = self.neighbors.data.as_ints
+        cdef int *total_heights = self._get_total_heights(side)
+
+        if start_index == -1 or not self.tile_exists.data.as_uchars[start_index]:
+            raise ValueError("Start tile has invalid pos")
+        if goal_index == -1 or not self.tile_exists.data.as_uchars[goal_index]:
+            return None
+
+        came_from = array.clone(_INT_TEMPLATE, self.tile_count, zero=False)
+        cost_so_far = array.clone(_FLOAT_TEMPLATE, self.tile_count, zero=False)
+        seen = array.clone(_UCHAR_TEMPLATE, self.tile_count, zero=True)
+        goal_x = goal_index % self.size_x
+        goal_y = goal_index // self.size_x
+        came_from.data.as_ints[start_index] = -1
+        cost_so_far.data.as_floats[start_index] = 0.0
+        seen.data.as_uchars[start_index] = 1
+        frontier.push(0.0, start_index)
+
+        while frontier.size:
+            current = frontier.pop()
+            if current == goal_index:
+                break
+            for direction in range(6):
+                next_index = neighbors[current * 6 + direction]
+                if self._is_blocked(
+                    next_index, current, collision, total_heights, jump_height
+                ):
+                    continue
+                new_cost = cost_so_far.data.as_floats[current] + 1.0
+                if (
+                    seen.data.as_uchars[next_index]
+                    and new_cost >= cost_so_far.data.as_floats[next_index]
+                ):
+                    continue
+                seen.data.as_uchars[next_index] = 1
+                cost_so_far.data.as_floats[next_index] = new_cost
+                priority = new_cost + _get_distance(
+                    goal_x,
+                    goal_y,
+                    next_index % self.size_x,
+                    next_index // self.size_x,
+                )
+                frontier.push(priority, next_index)
+                came_from.data.as_ints[next_index] = current
+
+        if not seen.data.as_uchars[goal_index]:
+            return None
+
+        path = []
+        current = goal_index
+        while current != -1:
+            path.append(self.get_coord(current))
+            current = came_from.data.as_ints[current]
+        path.pop()
+        path.reverse()
+        return path
+
+    cpdef list path_find_bidirectional(
+        self,
+        int start_index,
+        int goal_index,
+        bint collision,
+        object side,
+        int jump_height,
+    ):
+        """
+        Breadth first search from both start and goal at the same time.
+        Returns a shortest path, but not necessarily the same one as `path_find`.
+        """
+        # -2 means not visited, -1 means the root of the search
+        cdef array.array forward_parents
+        cdef array.array backward_parents
+        cdef list forward_fringe, backward_fringe, next_fringe
+        cdef list path
+        cdef int i, index, direction, neighbor_index, current
+        cdef int meeting_index = -1
+        cdef int *neighbors = self.neighbors.data.as_ints
+        cdef int *forward
+        cdef int *backward
+        cdef int *total_heights = self._get_total_heights(side)
+
+        if start_index == -1 or not self.tile_exists.data.as_uchars[start_index]:
+            raise ValueError("Start tile has invalid pos")
+        if goal_index == -1 or not self.tile_exists.data.as_uchars[goal_index]:
+            return None
+        if start_index == goal_index:
+            return []
+
+        forward_parents = array.array("i", [-2]) * self.tile_count
+        backward_parents = array.array("i", [-2]) * self.tile_count
+        forward = forward_parents.data.as_ints
+        backward = backward_parents.data.as_ints
+        forward[start_index] = -1
+        backward[goal_index] = -1
+        forward_fringe = [start_index]
+        backward_fringe = [goal_index]
+
+        while forward_fringe and backward_fringe and meeting_index == -1:
+            next_fringe = []
+            if len(forward_fringe) <= len(backward_fringe):
+                for i in range(len(forward_fringe)):
+                    index = forward_fringe[i]
+                    for direction in range(6):
+                        neighbor_index = neighbors[index * 6 + direction]
+                        if neighbor_index == -1 or forward[neighbor_index] != -2:
+                            continue
+                        if self._is_blocked(
+                            neighbor_index, index, collision, total_heights, jump_height
+                        ):
+                            continue
+                        forward[neighbor_index] = index
+                        if backward[neighbor_index] != -2:
+                            meeting_index = neighbor_index
+                            break
+                        next_fringe.append(neighbor_index)
+                    if meeting_index != -1:
+                        break
+                forward_fringe = next_fringe
+            else:
+                for i in range(len(backward_fringe)):
+                    index = backward_fringe[i]
+                    for direction in range(6):
+                        neighbor_index = neighbors[index * 6 + direction]
+                        if neighbor_index == -1 or backward[neighbor_index] != -2:
+                            continue
+                        if self._is_blocked(
+                            index, neighbor_index, collision, total_heights, jump_height
+                        ):
+                            continue
+                        backward[neighbor_index] = index
+                        if forward[neighbor_index] != -2:
+                            meeting_index = neighbor_index
+                            break
+                        next_fringe.append(neighbor_index)
+                    if meeting_index != -1:
+                        break
+                backward_fringe = next_fringe
+
+        if meeting_index == -1:
+            return None
+
+        path = []
+        current = meeting_index
+        while current != -1:
+            path.append(self.get_coord(current))
+            current = forward[current]
+        path.pop()
+        path.reverse()
+        current = backward[meeting_index]
+        while current != -1:
+            path.append(self.get_coord(current))
+            current = backward[current]
+        return path
+
+    cpdef bint line_of_sight_check(
+        self,
+        OddRCoord start_coord,
+        OddRCoord end_coord,
+        int altitude,
+        object turn,
+        object max_range = None,
+    ):
+        cdef int start_index, index, start_height
+        cdef OddRCoord coord
+        cdef int *total_heights = self._get_total_heights(turn)
+        if max_range is not None and start_coord.get_distance(end_coord) > max_range:
+            return 0
+        start_index = self.get_index(start_coord)
+        if start_index == -1 or not self.tile_exists.data.as_uchars[start_index]:
+            raise ValueError("Start tile has invalid pos")
+        start_height = total_heights[start_index]
+        for coord in start_coord.line_draw(end_coord):
+            index = self.get_index(coord)
+            if index == -1 or not self.tile_exists.data.as_uchars[index]:
+                return 0
+            if total_heights[index] + altitude < start_height:
+                return 0
+        return 1
+
+
+cdef class DistanceMap:
+    """
+    Distance and next step towards the nearest goal for every tile, computed
+    with one breadth first search backward from all goals. Goal tiles
+    themselves are never blocked by collision, so a feature like a lair can be
+    used as goals.
+    """
+
+    cdef readonly BoardGrid grid
+    cdef readonly array.array distances
+    """Steps to the nearest goal of each tile, -1 if there's no path"""
+    cdef readonly array.array next_steps
+    """Index of the next tile towards the nearest goal, -1 if there's none"""
+
+    def __init__(
+        self,
+        BoardGrid grid,
+        object goals,
+        bint collision,
+        object side,
+        int jump_height,
+    ):
+        cdef OddRCoord goal
+        cdef array.array is_goal
+        cdef list fringe = []
+        cdef list next_fringe
+        cdef int i, index, direction, neighbor_index, distance
+        cdef int *neighbors = grid.neighbors.data.as_ints
+        cdef int *distances
+        cdef int *next_steps
+        cdef int *total_heights = grid._get_total_heights(side)
+        cdef bint is_blocked
+
+        self.grid = grid
+        self.distances = array.array("i", [-1]) * grid.tile_count
+        self.next_steps = array.array("i", [-1]) * grid.tile_count
+        distances = self.distances.data.as_ints
+        next_steps = self.next_steps.data.as_ints
+        is_goal = array.clone(_UCHAR_TEMPLATE, grid.tile_count, zero=True)
+
+        for goal in goals:
+            index = grid.get_index(goal)
+            if index == -1 or not grid.tile_exists.data.as_uchars[index]:
+                continue
+            if distances[index] == 0:
+                continue
+            distances[index] = 0
+            is_goal.data.as_uchars[index] = 1
+            fringe.append(index)
+
+        distance = 0
+        while fringe:
+            distance += 1
+            next_fringe = []
+            for i in range(len(fringe)):
+                index = fringe[i]
+                for direction in range(6):
+                    neighbor_index = neighbors[index * 6 + direction]
+                    if neighbor_index == -1 or distances[neighbor_index] != -1:
+                        continue
+                    # Stepping from neighbor into index
+                    if is_goal.data.as_uchars[index]:
+                        is_blocked = (
+                            total_heights[index] - total_heights[neighbor_index]
+                            > jump_height
+                        )
+                    else:
+                        is_blocked = grid._is_blocked(
+                            index, neighbor_index, collision, total_heights, jump_height
+                        )
+                    if is_blocked:
+                        continue
+                    distances[neighbor_index] = distance
+                    next_steps[neighbor_index] = index
+                    next_fringe.append(neighbor_index)
+            fringe = next_fringe
+
+    cpdef object get_distance(self, OddRCoord coord):
+        """
+        :returns: Steps to the nearest goal or None if it can't reach any
+        """
+        cdef int index = self.grid.get_index(coord)
+        if index == -1 or self.distances.data.as_ints[index] == -1:
+            return None
+        return self.distances.data.as_ints[index]
+
+    cpdef object get_next_step(self, OddRCoord coord):
+        """
+        :returns: Next coord towards the nearest goal or None if there's none
+        """
+        cdef int index = self.grid.get_index(coord)
+        if index == -1 or self.next_steps.data.as_ints[index] == -1:
+            return None
+        return self.grid.get_coord(self.next_steps.data.as_ints[index])
+
+    cpdef object get_path(self, OddRCoord coord):
+        """
+        :returns: Path to the nearest goal excluding coord itself or None if
+        it can't reach any
+        """
+        cdef int index = self.grid.get_index(coord)
+        cdef list path = []
+        if index == -1 or self.distances.data.as_ints[index] == -1:
+            return None
+        index = self.next_steps.data.as_ints[index]
+        while index != -1:
+            path.append(self.grid.get_coord(index))
+            index = self.next_steps.data.as_ints[index]
+        return path
+
+
+cdef class ThreatMap:
+    """
+    Damage the rodents of each side could deal to every tile on their next
+    turn, by moving anywhere they can reach and attacking from there with any
+    skill with reach. Each rodent counts once per tile with its attack.
+    """
+
+    cdef readonly BoardGrid grid
+    cdef readonly array.array damages
+    """Damage of a side on a tile at `damages[Side.to_int(side) * tile_count + index]`"""
+
+    def __init__(self, BoardGrid grid, object rodents, int jump_height):
+        cdef OddRCoord pos
+        cdef array.array stamps
+        cdef int stamp = 0
+        cdef int start_index, max_altitude, side_int, attack
+        cdef int *total_heights
+        cdef int *damages
+        cdef list reaches
+
+        self.grid = grid
+        self.damages = array.clone(_INT_TEMPLATE, grid.tile_count * 3, zero=True)
+        # Tile is already hit by the current rodent if its stamp is the rodent's
+        stamps = array.clone(_INT_TEMPLATE, grid.tile_count, zero=True)
+        for rodent in rodents:
+            reaches = list(
+                {
+                    (skill.reach, skill.altitude or 0)
+                    for skill in rodent.skills
+                    if skill.reach is not None
+                }
+            )
+            if not reaches:
+                continue
+            start_index = grid.get_index(rodent.pos)
+            if start_index == -1 or not grid.tile_exists.data.as_uchars[start_index]:
+                continue
+            stamp += 1
+            side_int = _get_side_int(rodent.side)
+            attack = rodent.attack
+            total_heights = grid._get_total_heights(rodent.side)
+            damages = self.damages.data.as_ints + side_int * grid.tile_count
+            for pos in [rodent.pos] + grid.get_reachable_coords(
+                rodent.pos, rodent.speed, rodent.collision, rodent.side, jump_height
+            ):
+                start_index = grid.get_index(pos)
+                for reach, altitude in reaches:
+                    max_altitude = total_heights[start_index] + altitude
+                    _add_attackable_damage(
+                        grid,
+                        pos,
+                        total_heights,
+                        max_altitude,
+                        reach,
+                        stamps.data.as_ints,
+                        stamp,
+                        damages,
+                        attack,
+                    )
+
+    cpdef int get_damage(self, OddRCoord coord, object side):
+        """
+        :returns: Damage rodents of the side could deal to the coord
+        """
+        cdef int index = self.grid.get_index(coord)
+        if index == -1:
+            return 0
+        return self.damages.data.as_ints[
+            _get_side_int(side) * self.grid.tile_count + index
+        ]
+
+    cpdef int get_threat(self, OddRCoord coord, object side):
+        """
+        :returns: Damage enemies of the side could deal to the coord
+        """
+        return self.get_damage(coord, side.other_side())
+
+    cpdef object get_controller(self, OddRCoord coord):
+        """
+        :returns: Side that could deal more damage to the coord or None if
+        neither could deal more
+        """
+        cdef int rat_damage = self.get_damage(coord, Side.RAT)
+        cdef int mouse_damage = self.get_damage(coord, Side.MOUSE)
+        if rat_damage > mouse_damage:
+            return Side.RAT
+        if mouse_damage > rat_damage:
+            return Side.MOUSE
+        return None
+
+
+cdef void _add_attackable_damage(
+    BoardGrid grid,
+    OddRCoord pos,
+    int *total_heights,
+    int max_altitude,
+    int reach,
+    int *stamps,
+    int stamp,
+    int *damages,
+    int attack,
+):
+    """
+    Add damage to every tile attackable from pos that isn't stamped yet, same
+    line of sight as `get_attackable_coords`
+    """
+    cdef _AxialCoord axial = pos.to_axial()
+    cdef int dq, dr, target_index
+
+    for dq, dr in get_disk_template(reach):
+        target_index = _get_axial_index(grid, axial.q + dq, axial.r + dr)
+        if target_index == -1 or stamps[target_index] == stamp:
+            continue
+        if _is_attackable(grid, axial, dq, dr, total_heights, max_altitude):
+            stamps[target_index] = stamp
+            damages[target_index] += attack
+
+
+cdef inline int _get_axial_index(BoardGrid grid, int q, int r) noexcept:
+    """Index of the tile at axial coord or -1 if it's out of bound"""
+    cdef int x = q + (r - (r & 1)) // 2
+    if x < 0 or x >= grid.size_x or r < 0 or r >= grid.size_y:
+        return -1
+    return r * grid.size_x + x
+
+
+cdef bint _is_attackable(
+    BoardGrid grid,
+    _AxialCoord axial,
+    int dq,
+    int dr,
+    int *total_heights,
+    int max_altitude,
+) except -1:
+    """
+    Whether every tile on the line from axial to its offset exists and isn't
+    higher than max altitude
+    """
+    cdef int passed_dq, passed_dr, index
+    for passed_dq, passed_dr in get_line_template(dq, dr):
+        index = _get_axial_index(grid, axial.q + passed_dq, axial.r + passed_dr)
+        if index == -1 or not grid.tile_exists.data.as_uchars[index]:
+            return 0
+        if total_heights[index] > max_altitude:
+            return 0
+    return 1
+
+
+cdef class BoardIsCoordBlocked(IsCoordBlocked):
+    """
+    `is_coord_blocked` of a board for an entity with given `collision`, `side`
+    and `jump_height`. Evaluated against `BoardGrid` without leaving C.
+    """
+
+    cdef readonly BoardGrid grid
+    cdef readonly bint collision
+    cdef readonly object side
+    cdef readonly int jump_height
+
+    def __init__(
+        self, BoardGrid grid, bint collision, object side, int jump_height
+    ):
+        self.grid = grid
+        self.collision = collision
+        self.side = side
+        self.jump_height = jump_height
+
+    cdef bint is_blocked(self, OddRCoord target_coord, OddRCoord source_coord) except -1:
+        return self.grid._is_blocked(
+            self.grid.get_index(target_coord),
+            self.grid.get_index(source_coord),
+            self.collision,
+            self.grid._get_total_heights(self.side),
+            self.jump_height,
+        )
+
+    cdef object search_path(self, OddRCoord start, OddRCoord goal, bint is_bidirectional):
+        cdef int start_index = self.grid.get_index(start)
+        if start_index == -1 or not self.grid.tile_exists.data.as_uchars[start_index]:
+            return NotImplemented
+        if is_bidirectional:
+            return self.grid.path_find_bidirectional(
+                start_index,
+                self.grid.get_index(goal),
+                self.collision,
+                self.side,
+                self.jump_height,
+            )
+        return self.grid.path_find(
+            start_index,
+            self.grid.get_index(goal),
+            self.collision,
+            self.side,
+            self.jump_height,
+        )
+
 
 cpdef list get_attackable_coords(
     object board,
@@ -13,17 +1069,22 @@ cpdef list get_attackable_coords(
         OddRCoord passed_coord
         object passed_tile
         list attackable_coords = []
-    
+
     rodent_tile = board.get_tile(rodent.pos)
     if rodent_tile is None:
         raise ValueError("Rodent has invalid pos")
-    
+
     max_altitude = rodent_tile.get_total_height(rodent.side) + (skill.altitude or 0)
     reach = skill.reach
-    
+
     if reach is None:
         raise ValueError("'get_attackable_coords is called on skill without reach")
-    
+
+    if is_template_backend_enabled():
+        return _get_attackable_coords_from_templates(
+            board.grid, rodent.pos, rodent.side, max_altitude, reach
+        )
+
     for target_coord in rodent.pos.all_in_range(reach):
         for passed_coord in rodent.pos.line_draw(target_coord):
             passed_tile = board.get_tile(passed_coord)
@@ -33,5 +1094,29 @@ cpdef list get_attackable_coords(
                 break
         else:
             attackable_coords.append(target_coord)
-    
+
+    return attackable_coords
+
+
+cdef list _get_attackable_coords_from_templates(
+    BoardGrid grid,
+    OddRCoord pos,
+    object side,
+    int max_altitude,
+    int reach,
+):
+    """
+    Same as `get_attackable_coords` but walks line templates over grid indices
+    """
+    cdef _AxialCoord axial = pos.to_axial()
+    cdef int dq, dr, q, r
+    cdef list attackable_coords = []
+    cdef int *total_heights = grid._get_total_heights(side)
+
+    for dq, dr in get_disk_template(reach):
+        if _is_attackable(grid, axial, dq, dr, total_heights, max_altitude):
+            q = axial.q + dq
+            r = axial.r + dr
+            attackable_coords.append(OddRCoord(q + (r - (r & 1)) // 2, r))
+
     return attackable_coords
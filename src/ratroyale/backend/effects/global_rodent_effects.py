@@ -9,9 +9,6 @@ if TYPE_CHECKING:
 
 @effect_data(EffectClearSide.ALLY, name="Slowed")
 class Slowed(EntityEffect):
-    def on_turn_change(self, game_manager: "GameManager") -> None:
-        pass
-
     def on_applied(self, game_manager: "GameManager", *, is_overriding: bool) -> None:
         if isinstance(self.entity, Rodent):
             self.entity.speed -= int(self.intensity)
@@ -30,9 +27,6 @@ class Slowed(EntityEffect):
 
 @effect_data(EffectClearSide.ALLY, name="Stunned")
 class Stunned(EntityEffect):
-    def on_turn_change(self, game_manager: "GameManager") -> None:
-        pass
-
     def on_applied(self, game_manager: "GameManager", *, is_overriding: bool) -> None:
         if self.entity.max_skill_stamina is not None:
             self.entity.max_skill_stamina -= 999
@@ -110,9 +104,6 @@ class MoraleBoost(EntityEffect):
             return None
         self.entity.attack += 1
 
-    def on_turn_change(self, game_manager: "GameManager") -> None:
-        pass
-
     def effect_descriptions(self) -> str:
         return f"Increase attack by {self.intensity:.0f}."
 
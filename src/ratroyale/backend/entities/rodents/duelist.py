@@ -258,9 +258,6 @@ class Mortar(Rodent):
 
 @effect_data(EffectClearSide.ALLY, name="Railgun Charged")
 class RailgunCharged(EntityEffect):
-    def on_turn_change(self, game_manager: "GameManager") -> None:
-        pass
-
     def on_applied(self, game_manager: "GameManager", *, is_overriding: bool) -> None:
         pass
 
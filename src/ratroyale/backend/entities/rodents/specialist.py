@@ -1,4 +1,3 @@
-import random
 from typing import TYPE_CHECKING
 
 from .common_skills import SelectTarget, TargetAction
@@ -78,7 +77,7 @@ class Mayo(Rodent):
             return None
         if source.pos.get_distance(self.pos) < self.DODGE_MIN_DISTANCE:
             return None
-        if random.random() < self.DODGE_CHANCE:
+        if game_manager.random.random() < self.DODGE_CHANCE:
             return 0
         return None
 
@@ -102,9 +101,6 @@ class TheOneBrace(EntityEffect):
         assert isinstance(self.entity, TheOne)
         self.entity.defense += 5
 
-    def on_turn_change(self, game_manager: "GameManager") -> None:
-        pass
-
     def on_cleared(self, game_manager: "GameManager", *, is_overridden: bool) -> None:
         self.entity.defense -= 5
 
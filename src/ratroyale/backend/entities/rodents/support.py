@@ -33,9 +33,6 @@ class QuartermasterSoul(EntityEffect):
             return None
         self.entity.defense += 1
 
-    def on_turn_change(self, game_manager: "GameManager") -> None:
-        pass
-
     def effect_descriptions(self) -> str:
         return "Someone entrusted their soul to you"
 
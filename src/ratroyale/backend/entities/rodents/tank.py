@@ -60,7 +60,7 @@ class Cracker(Rodent):
         if self.is_bread_abandoned:
             return SkillCompleted.CANCELLED
         self.is_bread_abandoned = True
-        self.height -= 1
+        game_manager.board.set_entity_height(self, self.height - 1)
         self.defense -= type(self).defense
         self.speed += 12
         return SkillCompleted.SUCCESS
@@ -34,6 +34,7 @@ class Sundial(Entity):
     def explode(self, timer: Timer, game_manager: "GameManager") -> None:
         assert self.side is not None
         for lair in game_manager.board.cache.lairs[self.side]:
+            game_manager.board.record(lair)
             lair.health = 1
 
         for entity in game_manager.board.cache.entities_with_hp:
@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING, Callable, ClassVar, TypeAlias, TypeVar, cast
 
 
 from .entity_effect import EntityEffect
+from .error import RatRoyaleBackendError
 from .hexagon import OddRCoord
 from .instant_kill import InstantKill
 from .side import Side
@@ -79,6 +80,14 @@ class Entity:
     is_dead: bool
     PRE_PLACED_ENTITIES: ClassVar[dict[int, type["Entity"]]] = {}
     """Map of preplaced-able entities' IDs to the entity class"""
+    OPT_IN_HOOKS: ClassVar[tuple[str, ...]] = (
+        "on_turn_change",
+        "on_ally_move",
+        "on_enemy_move",
+    )
+    """Hooks that only run on entities whose class overrides them"""
+    overridden_hooks: ClassVar[frozenset[str]] = frozenset()
+    """Hooks in `OPT_IN_HOOKS` the class overrides, found once when it's created"""
 
     @classmethod
     def PRE_PLACED_ENTITY_ID(cls) -> int | None:
@@ -86,6 +95,11 @@ class Entity:
         return None
 
     def __init_subclass__(cls) -> None:
+        cls.overridden_hooks = frozenset(
+            hook
+            for hook in cls.OPT_IN_HOOKS
+            if getattr(cls, hook) is not getattr(Entity, hook)
+        )
         entity_id = cls.PRE_PLACED_ENTITY_ID()
         if entity_id is None:
             return
@@ -150,7 +164,7 @@ class Entity:
         self, game_manager: "GameManager", turn_change_to: Side
     ) -> (
         None
-    ): ...  # This has to be `...` to avoid having GameManager running on_turn_change on every entity. It'll detect the ellipsis to cache them.
+    ): ...  # Only called on entities whose class overrides it, see `overridden_hooks`
 
     def on_kill_entity(
         self, game_manager: "GameManager", target_killed: "Entity"
@@ -165,6 +179,39 @@ class Entity:
     def reset_stamina(self) -> None:
         self.skill_stamina = self.max_skill_stamina
 
+    def can_activate(self, skill_index: int, game_manager: "GameManager") -> bool:
+        """
+        Whether activating the skill right now wouldn't get cancelled or fail,
+        without running it for real
+        """
+        if self.is_dead:
+            return False
+        if game_manager.crumbs < self.skills[skill_index].crumb_cost:
+            return False
+        if self.skill_stamina is not None and self.skill_stamina <= 0:
+            return False
+        try:
+            skill_result = game_manager.preview_skill(self, skill_index)
+        except RatRoyaleBackendError:
+            return False
+        if isinstance(skill_result, SkillTargeting):
+            return bool(skill_result.available_targets)
+        return skill_result == SkillCompleted.SUCCESS
+
+    def preview_targets(
+        self, skill_index: int, game_manager: "GameManager"
+    ) -> list[OddRCoord] | None:
+        """
+        Targets the skill would let you select right now, without running it
+        for real
+
+        :returns: Available targets or None if the skill doesn't need targets
+        """
+        skill_result = game_manager.preview_skill(self, skill_index)
+        if isinstance(skill_result, SkillTargeting):
+            return list(skill_result.available_targets)
+        return None
+
     def on_death(self, source: SourceOfDamageOrHeal) -> bool:
         """
         Method called when entity dies
@@ -1,7 +1,8 @@
 from abc import ABC, abstractmethod
 from enum import Enum, auto
-from typing import TYPE_CHECKING, Callable, TypeVar
+from typing import TYPE_CHECKING, Callable, ClassVar, TypeVar
 
+from .countdown import Countdown
 from .side import Side
 
 if TYPE_CHECKING:
@@ -16,16 +17,18 @@ class EffectClearSide(Enum):
     """Clear on turn of one who goes second"""
 
 
-class EntityEffect(ABC):
+class EntityEffect(Countdown, ABC):
     _has_effect_data = False
     name: str
     entity: "Entity"
-    duration: int | None
-    """Effect is cleared at the end of the turn."""
-    turn_passed: int
     effect_clear_side: EffectClearSide
     intensity: float
     overridden_effects: list["EntityEffect"]
+    has_on_turn_change: ClassVar[bool] = False
+    """Whether the class overrides `on_turn_change`, found once when it's created"""
+
+    def __init_subclass__(cls) -> None:
+        cls.has_on_turn_change = cls.on_turn_change is not EntityEffect.on_turn_change
 
     def __init__(
         self, entity: "Entity", *, duration: int | None, intensity: float = 0
@@ -59,8 +62,8 @@ class EntityEffect(ABC):
             case EffectClearSide.ANY:
                 return True
 
-    @abstractmethod
-    def on_turn_change(self, game_manager: "GameManager") -> None: ...
+    def on_turn_change(self, game_manager: "GameManager") -> None:
+        """Only called on effects whose class overrides it"""
 
     @abstractmethod
     def on_applied(
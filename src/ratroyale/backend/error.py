@@ -70,6 +70,12 @@ class InvalidDeckError(RatRoyaleBackendError):
     pass
 
 
+class ReplayDesyncError(RatRoyaleBackendError):
+    """Replaying an action log didn't produce the same game"""
+
+    pass
+
+
 class UpdatingTheDeadError(RatRoyaleBackendError):
     def __init__(self, the_dead: "Feature | Entity") -> None:
         assert the_dead.is_dead
@@ -1,12 +1,23 @@
-from random import shuffle
+import random
 from typing import Iterator
 from dataclasses import dataclass, field
 from collections import defaultdict
 
+from .action_log import (
+    ActionLog,
+    ActivateSkillAction,
+    CancelTargetingAction,
+    EndTurnAction,
+    MoveRodentAction,
+    PlaceSqueakAction,
+    SelectTargetsAction,
+    get_entity_ref,
+)
 from .crumbs_per_turn_modifier import CrumbsPerTurnModifier
 from .instant_kill import InstantKill
 from ..utils import EventQueue
 from .board import Board
+from .board_template import BoardTemplate
 from .entities.rodent import Rodent
 from .entity import Entity, SkillCompleted, SkillResult, SkillTargeting
 from .entity_effect import EntityEffect
@@ -21,7 +32,8 @@ from .error import (
     UpdatingTheDeadError,
 )
 from .feature import Feature
-from .features.common import DeploymentZone, Lair
+from .features.common import Lair
+from .game_snapshot import GameJournal, GameSnapshot
 from .game_event import (
     CrumbChangeEvent,
     EndTurnEvent,
@@ -80,6 +92,13 @@ class GameManager:
     player_1: Side
     game_stats: GameStats
     is_disable_reward: bool
+    seed: int
+    random: random.Random
+    """Source of every random outcome in the game, seeded with `seed`"""
+    action_log: ActionLog
+    """Every player action so far, enough to replay the game"""
+    map: Map
+    """Map the game started from, which `Board` copies instead of changing"""
 
     def __init__(
         self,
@@ -87,14 +106,30 @@ class GameManager:
         players_info: tuple[PlayerInfo, PlayerInfo],
         player_1: Side,
         is_disable_reward: bool = False,
+        seed: int | None = None,
+        board_template: BoardTemplate | None = None,
     ) -> None:
+        """
+        :param board_template: Template of `map` to clone the board from,
+            instead of building it from the map
+        """
+        if board_template is not None and board_template.map is not map:
+            raise ValueError("Board template is of a different map")
         self.is_disable_reward = is_disable_reward
+        if seed is None:
+            seed = random.getrandbits(63)
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.action_log = ActionLog(seed, player_1)
+        self.map = map
         self.turn = player_1
         self.player_1 = player_1
         self.turn_count = 1
         self.crumbs_per_turn_modifier = CrumbsPerTurnModifier(map.base_crumbs_per_turn)
         self.set_crumbs()
-        self.board = Board(map)
+        self.board = (
+            Board(map) if board_template is None else board_template.create_board()
+        )
         self.players_info = {
             player_1: players_info[0],
             player_1.other_side(): players_info[1],
@@ -103,7 +138,7 @@ class GameManager:
         self.hands: dict[Side, list[Squeak]] = {}
         for side in Side:
             decks, hands = self.players_info[side].get_squeak_set().get_deck_and_hand()
-            shuffle(decks)
+            self.random.shuffle(decks)
             assert len(hands) == HAND_LENGTH
             self.decks[side] = decks
             self.hands[side] = hands
@@ -132,11 +167,55 @@ class GameManager:
     def set_crumbs(self) -> None:
         self.crumbs = self.get_crumbs(self.turn_count)[0]
 
+    def snapshot(self) -> GameSnapshot:
+        """
+        Capture current game state. Much cheaper than `deepcopy` since only
+        containers and attributes are copied, not the objects in them.
+        """
+        return GameSnapshot(self)
+
+    def restore(self, snapshot: GameSnapshot) -> None:
+        """Bring game state back to when the snapshot was taken"""
+        if snapshot.game_manager is not self:
+            raise ValueError("Snapshot was taken from another game manager")
+        snapshot.restore()
+
+    def begin_journal(self, *, is_recording_events: bool = True) -> GameJournal:
+        """
+        Start recording changes so they can be undone with `rollback`. Journals
+        can be nested but must be rolled back or ended innermost first.
+
+        :param is_recording_events: Whether to bring back the event queue on
+            rollback. Only skip it if no event is put or gotten in the meantime.
+        """
+        journal = GameJournal(self, is_recording_events=is_recording_events)
+        self.board.journals.append(journal)
+        return journal
+
+    def rollback(self, journal: GameJournal) -> None:
+        """Undo every change since the journal began and stop recording it"""
+        self.end_journal(journal)
+        journal.rollback()
+
+    def end_journal(self, journal: GameJournal) -> None:
+        """Stop recording changes to the journal, keeping the changes"""
+        if not self.board.journals or self.board.journals[-1] is not journal:
+            raise ValueError("Only the innermost journal can be ended")
+        self.board.journals.pop()
+
+    def _record_game_manager(self) -> None:
+        self.board.record(self)
+        self.board.record(self.crumbs_per_turn_modifier)
+        self.board.record(self.game_stats)
+
     @property
     def is_selecting_target(self) -> bool:
         return self.skill_targeting is not None
 
     def cancel_selecting_target(self) -> None:
+        if self.skill_targeting is not None:
+            self._record_game_manager()
+            self.action_log.append(CancelTargetingAction())
         self.skill_targeting = None
 
     def _validate_not_selecting_target(self) -> None:
@@ -152,6 +231,9 @@ class GameManager:
     ) -> "SkillResult":
         if self.skill_targeting is None:
             raise GameManagerSkillCallBackInNonSelectingMode()
+        self._record_game_manager()
+        self.board.record(self.skill_targeting.source_enitity)
+        self.action_log.append(SelectTargetsAction(tuple(selected_targets)))
         skill_result = self.skill_targeting._callback(self, selected_targets)
         event = EntitySkillCallbackEvent(
             skill_result,
@@ -202,6 +284,11 @@ class GameManager:
             raise NotEnoughCrumbError()
         if entity.skill_stamina is not None and entity.skill_stamina <= 0:
             raise NotEnoughSkillStaminaError()
+        self._record_game_manager()
+        self.board.record(entity)
+        self.action_log.append(
+            ActivateSkillAction(*get_entity_ref(self, entity), skill_index)
+        )
         skill_result = skill.func(entity, self)
         event = EntitySkillActivatedEvent(skill_result, entity, skill_index)
         self.event_queue.put_nowait(event)
@@ -219,6 +306,36 @@ class GameManager:
             self.skill_targeting = skill_result
         return skill_result
 
+    def preview_skill(self, entity: Entity, skill_index: int) -> SkillResult:
+        """
+        What activating a skill would result in right now, without changing
+        anything or putting any event. Crumbs and stamina aren't checked.
+        The result is cached until the board changes or an event is put.
+        Never call back the `SkillTargeting` it returns.
+        """
+        key = (
+            "preview_skill",
+            entity,
+            skill_index,
+            self.board.version,
+            self.event_queue.generation,
+        )
+        return self.board.query_cache.get_or_compute(
+            key, lambda: self._run_skill_preview(entity, skill_index)
+        )
+
+    def _run_skill_preview(self, entity: Entity, skill_index: int) -> SkillResult:
+        journal = self.begin_journal(is_recording_events=False)
+        self.event_queue.is_muted = True
+        try:
+            # Skills change the entity without recording it, `activate_skill`
+            # records it for them
+            self.board.record(entity)
+            return entity.skills[skill_index].func(entity, self)
+        finally:
+            self.event_queue.is_muted = False
+            self.rollback(journal)
+
     def get_both_side_on_pos(self, pos: OddRCoord) -> Entity | None:
         """
         Get enemy or ally at the end of the list (top) at position or None if there's nothing there
@@ -233,12 +350,15 @@ class GameManager:
         return None
 
     def _trigger_feature_on_move(self, path: list[OddRCoord], entity: Entity) -> None:
+        self.board.record(self.board.cache)
+        self._record_game_manager()
         for path_coord in path:
             path_tile = self.board.get_tile(path_coord)
             if path_tile is None:
                 continue
             new_entity_in_features: list[Feature] = []
             for feature in self.board.cache.entities_in_features[entity]:
+                self.board.record(feature)
                 if feature in path_tile.features:
                     feature.on_entity_moving_by(self, entity, path_coord)
                     new_entity_in_features.append(feature)
@@ -248,6 +368,7 @@ class GameManager:
 
             for feature in path_tile.features:
                 if feature not in self.board.cache.entities_in_features[entity]:
+                    self.board.record(feature)
                     feature.on_entity_enter(self, entity, path_coord)
                     self.board.cache.entities_in_features[entity].append(feature)
 
@@ -280,9 +401,12 @@ class GameManager:
         path = self.board.path_find(rodent, target)
         if path is None:
             raise InvalidMoveTargetError()
+        pos, entity_index = get_entity_ref(self, rodent)
         is_success = self.board.try_move(rodent, path)
         if not is_success:
             raise InvalidMoveTargetError("Cannot move rodent there")
+        self._record_game_manager()
+        self.action_log.append(MoveRodentAction(pos, entity_index, target))
         self._trigger_feature_on_move(path, rodent)
         old_crumbs = self.crumbs
         self.crumbs -= rodent.move_cost
@@ -292,10 +416,12 @@ class GameManager:
         self.event_queue.put_nowait(CrumbChangeEvent(old_crumbs, self.crumbs, event))
         if rodent.side is not None:
             for entity in self.board.cache.entities_with_on_ally_move[rodent.side]:
+                self.board.record(entity)
                 entity.on_ally_move(self, rodent, path, origin)
             for entity in self.board.cache.entities_with_on_enemy_move[
                 rodent.side.other_side()
             ]:
+                self.board.record(entity)
                 entity.on_enemy_move(self, rodent, path, origin)
         return path
 
@@ -324,10 +450,12 @@ class GameManager:
         self.event_queue.put(EntityMoveEvent(path, entity, origin))
         if entity.side is not None:
             for _entity in self.board.cache.entities_with_on_ally_move[entity.side]:
+                self.board.record(_entity)
                 _entity.on_ally_move(self, entity, path, origin)
             for _entity in self.board.cache.entities_with_on_enemy_move[
                 entity.side.other_side()
             ]:
+                self.board.record(entity)
                 entity.on_enemy_move(self, entity, path, origin)
         return path
 
@@ -353,7 +481,7 @@ class GameManager:
             return self.decks[side].pop()
         self.event_queue.put_nowait(SqueakSetResetEvent())
         self.decks[side] = self.players_info[side].get_squeak_set().get_new_deck()
-        shuffle(self.decks[side])
+        self.random.shuffle(self.decks[side])
         return self.decks[side].pop()
 
     def place_squeak(self, hand_index: int, coord: OddRCoord) -> None:
@@ -363,6 +491,8 @@ class GameManager:
         squeak = self.hands[self.turn][hand_index]
         if self.crumbs < squeak.crumb_cost:
             raise NotEnoughCrumbError()
+        self._record_game_manager()
+        self.action_log.append(PlaceSqueakAction(hand_index, coord))
         self.event_queue.put_nowait(SqueakPlacedEvent(hand_index, squeak, coord))
         self.game_stats.squeak_placed[self.turn] += 1
         new_squeak = squeak.on_place(self, coord)
@@ -377,43 +507,60 @@ class GameManager:
 
     def end_turn(self) -> None:
         self._validate_not_selecting_target()
-        for effect in self.board.cache.effects:
+        self._record_game_manager()
+        self.action_log.append(EndTurnAction())
+        cache = self.board.cache
+        for effect in cache.get_turn_change_effects(self.turn_count):
+            if effect not in cache.effects:
+                continue
+            self.board.record(effect)
+            self.board.record(effect.entity)
             effect.on_turn_change(self)
             if effect.duration == 1 and effect.should_clear(self.turn):
                 active_effect = effect.entity.effects[effect.name]
                 if active_effect is not effect:
+                    self.board.record(active_effect)
                     active_effect.overridden_effects.remove(effect)
                 else:
                     self.effect_duration_over(effect)
-        new_timers: list[Timer] = []
-        for timer in self.board.cache.timers:
+        for timer in cache.get_turn_change_timers(self.turn_count):
+            if timer not in cache.timers:
+                continue
+            self.board.record(timer)
+            self.board.record(timer.entity)
             timer.on_turn_change(timer, self)
             if timer.duration == 1 and timer.should_clear(self.turn):
+                self.board.record(self.board.cache)
+                self.board.cache.remove_timer(timer)
                 timer.on_timer_over(timer, self)
-            else:
-                new_timers.append(timer)
-        self.board.cache.timers = new_timers
         from_side = self.turn
         self.turn = self.turn.other_side()
         for entity in self.board.cache.entities_with_turn_change:
+            self.board.record(entity)
             entity.on_turn_change(self, turn_change_to=self.turn)
         for entity, features in self.board.cache.entities_in_features.items():
+            self.board.record(entity)
             for feature in features:
+                self.board.record(feature)
                 feature.on_entity_turn_change(self, entity)
         if self.turn == self.player_1:
-            for effect in self.board.cache.effects:
-                effect.turn_passed += 1
-                if effect.duration is not None:
-                    effect.duration -= 1
-            for timer in self.board.cache.timers:
-                timer.duration -= 1
+            # Durations count down from the turn count, only what runs out
+            # this turn is left to drop
+            if self.turn_count in cache.effect_wheel or (
+                self.turn_count in cache.timer_wheel
+            ):
+                self.board.record(cache)
+                cache.effect_wheel.pop(self.turn_count, None)
+                cache.timer_wheel.pop(self.turn_count, None)
             self.turn_count += 1
         leftover_crumbs = self.crumbs
         old_crumbs = self.crumbs
         self.set_crumbs()
         for entity in self.board.cache.sides[None]:
+            self.board.record(entity)
             entity.reset_stamina()
         for entity in self.board.cache.sides[from_side]:
+            self.board.record(entity)
             entity.reset_stamina()
         event = EndTurnEvent(
             is_from_player_1_side=self.player_1 == from_side,
@@ -429,20 +576,30 @@ class GameManager:
     def apply_timer(self, timer: Timer) -> None:
         if timer.entity.is_dead:
             raise UpdatingTheDeadError(timer.entity)
-        self.board.cache.timers.append(timer)
+        self.board.record(self.board.cache)
+        self.board.record(timer)
+        timer.start(self)
+        self.board.cache.add_timer(timer)
 
     def apply_effect(self, effect: EntityEffect, stack_intensity: bool = False) -> None:
         entity = effect.entity
         if entity.is_dead:
             raise UpdatingTheDeadError(entity)
+        self.board.record(self.board.cache)
+        self.board.record(entity)
+        self.board.record(effect)
         old_effect = entity.effects.get(effect.name)
+        if old_effect is not None:
+            self.board.record(old_effect)
         if stack_intensity and old_effect is not None:
             old_effect.intensity += effect.intensity
             old_effect.duration = effect.duration
+            self.board.cache.schedule_effect(old_effect)
             return
         if old_effect is None:
             entity.effects[effect.name] = effect
-            self.board.cache.effects.append(effect)
+            effect.start(self)
+            self.board.cache.add_effect(effect)
             effect.on_applied(self, is_overriding=False)
             self.event_queue.put_nowait(
                 EntityEffectUpdateEvent(effect, "apply", "normal_apply")
@@ -450,7 +607,8 @@ class GameManager:
             return
         if effect.intensity > old_effect.intensity:
             effect.overridden_effects.append(old_effect)
-            self.board.cache.effects.append(effect)
+            effect.start(self)
+            self.board.cache.add_effect(effect)
             effect.on_applied(self, is_overriding=True)
             self.event_queue.put_nowait(
                 EntityEffectUpdateEvent(effect, "apply", "overriding")
@@ -466,6 +624,7 @@ class GameManager:
             if effect.duration is not None and effect.duration <= old_effect.duration:
                 return
             old_effect.duration = effect.duration
+            self.board.cache.schedule_effect(old_effect)
             return
         elif effect.intensity < old_effect.intensity:
             if old_effect.duration is None:
@@ -473,10 +632,14 @@ class GameManager:
             if effect.duration is not None and effect.duration <= old_effect.duration:
                 return
             old_effect.overridden_effects.append(effect)
-            self.board.cache.effects.append(effect)
+            effect.start(self)
+            self.board.cache.add_effect(effect)
 
     def effect_duration_over(self, effect: EntityEffect) -> None:
-        self.board.cache.effects.remove(effect)
+        self.board.record(self.board.cache)
+        self.board.record(effect)
+        self.board.record(effect.entity)
+        self.board.cache.remove_effect(effect)
         if not effect.overridden_effects:
             effect.on_cleared(self, is_overridden=False)
             self.event_queue.put_nowait(
@@ -490,6 +653,7 @@ class GameManager:
             if (e.duration is None) or (e.duration > 1)
         }
         new_effect = max(effect.overridden_effects, key=lambda e: e.intensity)
+        self.board.record(new_effect)
         new_effect.on_applied(self, is_overriding=True)
         self.event_queue.put_nowait(
             EntityEffectUpdateEvent(
@@ -507,10 +671,14 @@ class GameManager:
         effect.entity.effects[effect.name] = new_effect
 
     def force_clear_effect(self, effect: EntityEffect) -> None:
-        self.board.cache.effects.remove(effect)
+        self.board.record(self.board.cache)
+        self.board.record(effect)
+        self.board.record(effect.entity)
+        self.board.cache.remove_effect(effect)
         del effect.entity.effects[effect.name]
         for _effect in effect.overridden_effects:
-            self.board.cache.effects.remove(_effect)
+            self.board.record(_effect)
+            self.board.cache.remove_effect(_effect)
         effect.on_cleared(self, is_overridden=False)
         self.event_queue.put_nowait(
             EntityEffectUpdateEvent(effect, "clear", "force_clear")
@@ -524,6 +692,7 @@ class GameManager:
         """
         if entity.is_dead:
             raise UpdatingTheDeadError(entity)
+        self.board.record(entity)
         is_dead, damage_taken = entity._take_damage(self, damage, source)
         self.event_queue.put_nowait(
             EntityDamagedEvent(entity, damage, damage_taken, source)
@@ -533,16 +702,21 @@ class GameManager:
         is_dead = entity.on_death(source)
         if not is_dead:
             return
+        self._record_game_manager()
         if isinstance(source, Entity):
+            self.board.record(source)
             source.on_kill_entity(self, entity)
             if source.side is not None and entity.side == source.side.other_side():
                 self.game_stats.enemy_rodent_killed[source.side] += 1
         tile = self.board.get_tile(entity.pos)
         if tile is None:
             raise EntityInvalidPosError()
+        self.board.record_tile(tile)
         tile.entities.remove(entity)
+        self.board.grid.remove_entity(entity)
         if entity in self.board.cache.entities_in_features:
             for feature in self.board.cache.entities_in_features[entity]:
+                self.board.record(feature)
                 feature.on_entity_exit(self, entity, None)
         self.board.remove_entity(entity)
         self.event_queue.put_nowait(EntityDieEvent(entity))
@@ -559,6 +733,7 @@ class GameManager:
         """
         if entity.is_dead:
             raise UpdatingTheDeadError(entity)
+        self.board.record(entity)
         heal_taken = entity._heal(self, heal, source, overheal_cap)
         self.event_queue.put_nowait(
             EntityHealedEvent(entity, heal, heal_taken, overheal_cap, source)
@@ -572,6 +747,7 @@ class GameManager:
         """
         if feature.is_dead:
             raise UpdatingTheDeadError(feature)
+        self.board.record(feature)
         is_dead, damage_taken = feature._take_damage(self, damage, source)
         self.event_queue.put_nowait(
             FeatureDamagedEvent(feature, damage, damage_taken, source)
@@ -587,26 +763,20 @@ class GameManager:
         *,
         is_trigger_on_death: bool = True,
     ) -> None:
+        self.board.record(feature)
+        self._record_game_manager()
         if is_trigger_on_death:
             is_dead = feature.on_death(self, source)
             if not is_dead:
                 return
 
         if isinstance(source, Entity):
+            self.board.record(source)
             source.on_kill_feature(self, feature)
 
-        for pos in feature.shape:
-            tile = self.board.get_tile(pos)
-            if tile is None:
-                raise ValueError("Feature is existing on invalid tile")
-            tile.features.remove(feature)
-        self.board.cache.features.remove(feature)
-        if isinstance(feature, DeploymentZone):
-            self.board.cache.deployment_zones[feature.side].remove(feature)
-        elif isinstance(feature, Lair):
-            if feature.side is None:
-                raise ValueError("Lair cannot have side of None")
-            self.board.cache.lairs[feature.side].remove(feature)
+        self.board.remove_feature(feature)
+        if isinstance(feature, Lair):
+            assert feature.side is not None
             if len(self.board.cache.lairs[feature.side]) == 0:
                 game_over_event = GameOverEvent(
                     feature.side.other_side() == self.player_1,
@@ -615,6 +785,8 @@ class GameManager:
                 self.event_queue.put_nowait(game_over_event)
                 self.game_over_event = game_over_event
                 if not self.is_disable_reward:
+                    for player_info in self.players_info.values():
+                        self.board.record(player_info)
                     self.players_info[feature.side.other_side()].game_won(self)
                     self.players_info[feature.side].game_lost(self)
         self.event_queue.put_nowait(FeatureDieEvent(feature))
@@ -0,0 +1,176 @@
+from typing import TYPE_CHECKING, Any
+
+from ..utils import OrderedSet
+from .cython_board import BoardGrid
+
+if TYPE_CHECKING:
+    from .game_manager import GameManager
+    from .tile import Tile
+
+_Container = list[Any] | dict[Any, Any] | OrderedSet[Any]
+
+
+def _save_container(
+    container: _Container, containers: list[tuple[_Container, _Container]]
+) -> None:
+    """Shallow copy a container and every builtin container nested in it"""
+    contents = container.copy()
+    containers.append((container, contents))
+    values = contents.values() if isinstance(contents, dict) else contents
+    for value in values:
+        if isinstance(value, (list, dict, OrderedSet)):
+            _save_container(value, containers)
+
+
+def _restore_container(container: _Container, contents: _Container) -> None:
+    if isinstance(container, list):
+        container[:] = contents
+        return
+    container.clear()
+    container.update(contents)
+
+
+class GameSnapshot:
+    """
+    Everything in a `GameManager` that changes during a game: turn, crumbs,
+    hands, decks, random state, action log, board cache, tiles, entities,
+    features, effects, timers and pending events. Restoring writes the state back into the same objects,
+    so references to them stay valid and a snapshot can be restored any
+    number of times. Objects created after the snapshot are simply dropped.
+
+    Callbacks are kept as they are, so state hidden in closures is not saved.
+    """
+
+    __slots__ = (
+        "game_manager",
+        "_objects",
+        "_containers",
+        "_grid_state",
+        "_events",
+        "_random_state",
+    )
+
+    def __init__(self, game_manager: "GameManager") -> None:
+        self.game_manager = game_manager
+        board = game_manager.board
+        cache = board.cache
+        objects: list[Any] = [
+            game_manager,
+            game_manager.game_stats,
+            game_manager.crumbs_per_turn_modifier,
+            game_manager.action_log,
+            board,
+            cache,
+            *game_manager.players_info.values(),
+            *cache.entities,
+            *cache.features,
+            *cache.effects,
+            *cache.timers,
+        ]
+        self._objects: list[tuple[Any, dict[str, Any]]] = []
+        self._containers: list[tuple[_Container, _Container]] = []
+        for obj in objects:
+            state = obj.__dict__.copy()
+            self._objects.append((obj, state))
+            for value in state.values():
+                if isinstance(value, (list, dict, OrderedSet)):
+                    _save_container(value, self._containers)
+        for row in board.tiles:
+            for tile in row:
+                if tile is None:
+                    continue
+                self._containers.append((tile.entities, tile.entities.copy()))
+                self._containers.append((tile.features, tile.features.copy()))
+        self._grid_state = board.grid.get_state()
+        self._events = board.event_queue.queue.copy()
+        self._random_state = game_manager.random.getstate()
+
+    def restore(self) -> None:
+        for obj, state in self._objects:
+            obj.__dict__.clear()
+            obj.__dict__.update(state)
+        for container, contents in self._containers:
+            _restore_container(container, contents)
+        board = self.game_manager.board
+        grid: BoardGrid = board.grid
+        grid.set_state(self._grid_state)
+        board.event_queue.replace(self._events)
+        self.game_manager.random.setstate(self._random_state)
+
+
+class GameJournal:
+    """
+    Saves each object, container and tile the first time it's changed after
+    the journal began, so rolling back costs the amount of things changed
+    rather than the size of the game. Changes are recorded by `Board.record`
+    and `Board.record_tile`, which every mutation in `Board` and `GameManager`
+    calls before changing anything.
+    """
+
+    __slots__ = (
+        "game_manager",
+        "board",
+        "_objects",
+        "_containers",
+        "_tiles",
+        "_version",
+        "_events",
+        "_random_state",
+        "_action_count",
+    )
+
+    def __init__(
+        self, game_manager: "GameManager", *, is_recording_events: bool = True
+    ) -> None:
+        self.game_manager = game_manager
+        board = game_manager.board
+        self.board = board
+        self._objects: dict[int, tuple[Any, dict[str, Any]]] = {}
+        self._containers: dict[int, tuple[_Container, _Container]] = {}
+        self._tiles: dict[int, tuple[int, int, int, int, int]] = {}
+        self._version = board.version
+        self._events = board.event_queue.queue.copy() if is_recording_events else None
+        self._random_state = game_manager.random.getstate()
+        self._action_count = len(game_manager.action_log)
+
+    def record(self, obj: Any) -> None:
+        if id(obj) in self._objects:
+            return
+        state = obj.__dict__.copy()
+        self._objects[id(obj)] = (obj, state)
+        for value in state.values():
+            if isinstance(value, (list, dict, OrderedSet)):
+                self.record_container(value)
+
+    def record_container(self, container: _Container) -> None:
+        if id(container) in self._containers:
+            return
+        contents = container.copy()
+        self._containers[id(container)] = (container, contents)
+        values = contents.values() if isinstance(contents, dict) else contents
+        for value in values:
+            if isinstance(value, (list, dict, OrderedSet)):
+                self.record_container(value)
+
+    def record_tile(self, tile: "Tile") -> None:
+        index = self.board.grid.get_index(tile.coord)
+        if index in self._tiles:
+            return
+        self._tiles[index] = self.board.grid.get_tile_state(index)
+        self.record_container(tile.entities)
+        self.record_container(tile.features)
+
+    def rollback(self) -> None:
+        for obj, state in self._objects.values():
+            obj.__dict__.clear()
+            obj.__dict__.update(state)
+        for container, contents in self._containers.values():
+            _restore_container(container, contents)
+        grid = self.board.grid
+        for index, tile_state in self._tiles.items():
+            grid.set_tile_state(index, tile_state)
+        self.board.version = self._version
+        if self._events is not None:
+            self.board.event_queue.replace(self._events)
+        self.game_manager.random.setstate(self._random_state)
+        del self.game_manager.action_log.actions[self._action_count :]
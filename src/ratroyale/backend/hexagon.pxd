@@ -2,6 +2,30 @@ cdef class _AxialCoord
 cdef class OddRCoord
 cdef class _CubeCoord
 cdef class _CubeCoordFloat
+cdef class IsCoordBlocked
+
+cdef class IsCoordBlocked:
+    cdef bint is_blocked(self, OddRCoord target_coord, OddRCoord source_coord) except -1
+    cdef object search_path(self, OddRCoord start, OddRCoord goal, bint is_bidirectional)
+
+cpdef void set_template_backend(bint is_enabled)
+cpdef bint is_template_backend_enabled()
+cpdef tuple get_line_template(int dq, int dr)
+cpdef tuple get_disk_template(int N)
+cpdef void precompute_templates(int max_reach)
+
+cdef struct _AStarItem:
+    float priority
+    int index
+
+cdef class _AStarHeap:
+    cdef _AStarItem *items
+    cdef Py_ssize_t size, capacity
+    cdef int push(self, float priority, int index) except -1
+    cdef int pop(self) noexcept
+    cdef void clear(self) noexcept
+    cdef void _sift_down(self, Py_ssize_t start_pos, Py_ssize_t pos) noexcept
+    cdef void _sift_up(self, Py_ssize_t pos) noexcept
 
 cdef class _CubeCoordFloat:
     cdef readonly double q, r, s
@@ -30,7 +54,12 @@ cdef class OddRCoord:
         self,
         OddRCoord goal,
         object is_coord_blocked,
-        get_cost: Callable[[OddRCoord, OddRCoord], float] = *,
+        object get_cost = *,
+    )
+    cpdef list[OddRCoord] path_find_bidirectional(
+        self,
+        OddRCoord goal,
+        object is_coord_blocked,
     )
     cpdef set[OddRCoord] get_reachable_coords(
         self,
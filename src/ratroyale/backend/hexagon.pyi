@@ -1,9 +1,12 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass
 from typing import Any, Callable, Iterator, Protocol, Self
 
 class IsCoordBlocked(Protocol):
     """
     A callback function that evaluate whether target coord is accessible from source coord
+
+    Subclasses of the compiled `IsCoordBlocked` (e.g. `BoardIsCoordBlocked`) are
+    evaluated without calling back into Python. Any other callable also works.
     """
 
     def __call__(self, target_coord: OddRCoord, source_coord: OddRCoord) -> bool:
@@ -12,6 +15,33 @@ class IsCoordBlocked(Protocol):
         """
         ...
 
+def set_template_backend(is_enabled: bool) -> None:
+    """
+    Choose whether `line_draw`, `all_in_range` and `get_attackable_coords` use
+    cached offset templates or compute every coord from scratch
+    """
+    ...
+
+def is_template_backend_enabled() -> bool: ...
+def get_line_template(dq: int, dr: int) -> tuple[tuple[int, int], ...]:
+    """
+    :returns: Axial offsets that a line from origin to (dq, dr) passes through
+    """
+    ...
+
+def get_disk_template(N: int) -> tuple[tuple[int, int], ...]:
+    """
+    :returns: Axial offsets of every coord within N of origin
+    """
+    ...
+
+def precompute_templates(max_reach: int) -> None:
+    """
+    Fill line templates of every offset within max_reach ahead of time, as far
+    as the templates are cached
+    """
+    ...
+
 @dataclass(frozen=True)
 class OddRCoord:
     """
@@ -94,7 +124,7 @@ class OddRCoord:
         self,
         goal: OddRCoord,
         is_coord_blocked: IsCoordBlocked,
-        get_cost: Callable[[OddRCoord, OddRCoord], float] = ...,
+        get_cost: Callable[[OddRCoord, OddRCoord], float] | None = None,
     ) -> list["OddRCoord"] | None:
         """
         https://www.redblobgames.com/pathfinding/a-star/introduction.html#astar
@@ -103,7 +133,21 @@ class OddRCoord:
 
         :param goal: Goal coord
         :param is_coord_blocked: A callback function that evaluate whether target coord is accessible from source coord
-        :param get_cost: A callback function to evaluate cost to travel from first coord to second coord, defaults to `lambda: a, b: 1.0`
+        :param get_cost: A callback function to evaluate cost to travel from first coord to second coord, defaults to 1.0 per step
+        :returns: Path calculated or None if goal is not reachable
+        """
+        ...
+
+    def path_find_bidirectional(
+        self, goal: OddRCoord, is_coord_blocked: IsCoordBlocked
+    ) -> list["OddRCoord"] | None:
+        """
+        Breadth first search from both self and goal at the same time with
+        unit cost. Faster than `path_find` for long paths, but may return a
+        different path of the same length.
+
+        :param goal: Goal coord
+        :param is_coord_blocked: A callback function that evaluate whether target coord is accessible from source coord
         :returns: Path calculated or None if goal is not reachable
         """
         ...
@@ -216,8 +260,3 @@ class _CubeCoordFloat:
         https://www.redblobgames.com/grids/hexagons/#line-drawing
         """
         ...
-
-@dataclass(order=True)
-class _AStarCoord:
-    priority: float
-    coord: OddRCoord = field(compare=False)
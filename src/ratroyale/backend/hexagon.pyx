@@ -1,34 +1,173 @@
+from cpython cimport array
+from cpython.mem cimport PyMem_Free, PyMem_Malloc, PyMem_Realloc
 from libc.math cimport sqrt, fabs as c_abs
-from queue import PriorityQueue
+import array
 from typing import Callable, Iterator, Self
 
 
 cdef double lerp(double a, double b, double t) noexcept:
     return a + t * (b - a)
 
-cdef float _get_default_cost(OddRCoord a, OddRCoord b) noexcept:
-    return 1.0
-
-cdef bint _coord_never_blocked(OddRCoord target_coord, OddRCoord source_coord) noexcept:
-    return 0
-
 cdef class IsCoordBlocked:
-    pass
-
-cdef class _AStarCoord:
-    cdef readonly float priority
-    cdef readonly OddRCoord coord
-
-    def __init__(self, priority: float, coord: OddRCoord):
-        self.priority = <float>priority
-        self.coord = coord
-
-    def __lt__(self, other):
-        return self.priority < other.priority
-    
-    def __eq__(self, other):
-        return self.priority == other.priority
-
+    """
+    Compiled version of `is_coord_blocked` callback. Search routines call
+    `is_blocked` directly instead of going through Python. Any other callable
+    still works as a fallback.
+    """
+
+    cdef bint is_blocked(self, OddRCoord target_coord, OddRCoord source_coord) except -1:
+        return 0
+
+    def __call__(self, OddRCoord target_coord, OddRCoord source_coord):
+        return self.is_blocked(target_coord, source_coord)
+
+    cdef object search_path(self, OddRCoord start, OddRCoord goal, bint is_bidirectional):
+        """
+        Unit cost path search specialized for this predicate. Return
+        `NotImplemented` to use the generic search instead.
+        """
+        return NotImplemented
+
+
+cdef IsCoordBlocked _coord_never_blocked = IsCoordBlocked()
+
+# Hex lines and ranges are translation invariant in axial space, so they're
+# computed once around the origin and reused as offsets for every coord. Only
+# offsets up to `_TEMPLATE_MAX_REACH` are kept so the caches stay bounded, any
+# further one is computed on every call.
+cdef bint _is_template_backend_enabled = 1
+cdef int _TEMPLATE_MAX_REACH = 32
+cdef dict _line_templates = {}
+cdef dict _disk_templates = {}
+
+
+cpdef void set_template_backend(bint is_enabled):
+    global _is_template_backend_enabled
+    _is_template_backend_enabled = is_enabled
+
+
+cpdef bint is_template_backend_enabled():
+    return _is_template_backend_enabled
+
+
+cpdef tuple get_line_template(int dq, int dr):
+    cdef tuple key = (dq, dr)
+    cdef tuple template = _line_templates.get(key)
+    cdef list offsets
+    cdef _CubeCoord origin, cube
+    if template is None:
+        offsets = []
+        origin = _CubeCoord(0, 0, 0)
+        for cube in origin.line_draw(_CubeCoord(dq, dr, -dq - dr)):
+            offsets.append((<int>cube.q, <int>cube.r))
+        template = tuple(offsets)
+        if max(abs(dq), abs(dr), abs(dq + dr)) <= _TEMPLATE_MAX_REACH:
+            _line_templates[key] = template
+    return template
+
+
+cpdef tuple get_disk_template(int N):
+    cdef tuple template = _disk_templates.get(N)
+    cdef list offsets
+    cdef int q, r
+    if template is None:
+        offsets = []
+        for q in range(-N, N + 1):
+            for r in range(max(-N, -q - N), min(N, -q + N) + 1):
+                offsets.append((q, r))
+        template = tuple(offsets)
+        if N <= _TEMPLATE_MAX_REACH:
+            _disk_templates[N] = template
+    return template
+
+
+cpdef void precompute_templates(int max_reach):
+    cdef int dq, dr
+    for dq, dr in get_disk_template(min(max_reach, _TEMPLATE_MAX_REACH)):
+        get_line_template(dq, dr)
+
+
+cdef inline OddRCoord _axial_to_odd_r(int q, int r):
+    return OddRCoord(q + (r - (r & 1)) // 2, r)
+
+cdef class _AStarHeap:
+    """
+    Binary min-heap of (priority, index) compared by priority only.
+    Push and pop follow `heapq` exactly, so ties are broken the same way
+    `queue.PriorityQueue` of `_AStarCoord` used to.
+    """
+
+    def __cinit__(self, Py_ssize_t capacity = 64):
+        if capacity < 1:
+            capacity = 1
+        self.items = <_AStarItem *>PyMem_Malloc(capacity * sizeof(_AStarItem))
+        if self.items == NULL:
+            raise MemoryError()
+        self.size = 0
+        self.capacity = capacity
+
+    def __dealloc__(self):
+        PyMem_Free(self.items)
+
+    cdef int push(self, float priority, int index) except -1:
+        cdef _AStarItem *items
+        if self.size == self.capacity:
+            items = <_AStarItem *>PyMem_Realloc(
+                self.items, 2 * self.capacity * sizeof(_AStarItem)
+            )
+            if items == NULL:
+                raise MemoryError()
+            self.items = items
+            self.capacity *= 2
+        self.items[self.size].priority = priority
+        self.items[self.size].index = index
+        self.size += 1
+        self._sift_down(0, self.size - 1)
+        return 0
+
+    cdef int pop(self) noexcept:
+        cdef _AStarItem last = self.items[self.size - 1]
+        cdef _AStarItem item
+        self.size -= 1
+        if self.size == 0:
+            return last.index
+        item = self.items[0]
+        self.items[0] = last
+        self._sift_up(0)
+        return item.index
+
+    cdef void clear(self) noexcept:
+        self.size = 0
+
+    cdef void _sift_down(self, Py_ssize_t start_pos, Py_ssize_t pos) noexcept:
+        cdef _AStarItem new_item = self.items[pos]
+        cdef Py_ssize_t parent_pos
+        while pos > start_pos:
+            parent_pos = (pos - 1) >> 1
+            if new_item.priority < self.items[parent_pos].priority:
+                self.items[pos] = self.items[parent_pos]
+                pos = parent_pos
+                continue
+            break
+        self.items[pos] = new_item
+
+    cdef void _sift_up(self, Py_ssize_t pos) noexcept:
+        cdef Py_ssize_t end_pos = self.size
+        cdef Py_ssize_t start_pos = pos
+        cdef _AStarItem new_item = self.items[pos]
+        cdef Py_ssize_t child_pos = 2 * pos + 1
+        cdef Py_ssize_t right_pos
+        while child_pos < end_pos:
+            right_pos = child_pos + 1
+            if right_pos < end_pos and not (
+                self.items[child_pos].priority < self.items[right_pos].priority
+            ):
+                child_pos = right_pos
+            self.items[pos] = self.items[child_pos]
+            pos = child_pos
+            child_pos = 2 * pos + 1
+        self.items[pos] = new_item
+        self._sift_down(start_pos, pos)
 
 
 cdef class _CubeCoord:
@@ -249,11 +388,30 @@ cdef class OddRCoord:
 
     
     cpdef list line_draw(self, OddRCoord other):
-        return [cube.to_odd_r() for cube in self.to_cube().line_draw(other.to_cube())]
+        cdef _AxialCoord axial, other_axial
+        cdef int dq, dr
+        cdef list result
+        if not _is_template_backend_enabled:
+            return [cube.to_odd_r() for cube in self.to_cube().line_draw(other.to_cube())]
+        axial = self.to_axial()
+        other_axial = other.to_axial()
+        result = []
+        for dq, dr in get_line_template(other_axial.q - axial.q, other_axial.r - axial.r):
+            result.append(_axial_to_odd_r(axial.q + dq, axial.r + dr))
+        return result
 
     
     cpdef list all_in_range(self, int N):
-        return self.to_axial().all_in_range(N)
+        cdef _AxialCoord axial
+        cdef int dq, dr
+        cdef list result
+        if not _is_template_backend_enabled:
+            return self.to_axial().all_in_range(N)
+        axial = self.to_axial()
+        result = []
+        for dq, dr in get_disk_template(N):
+            result.append(_axial_to_odd_r(axial.q + dq, axial.r + dr))
+        return result
 
     
     cpdef tuple[double, double] to_pixel(
@@ -310,6 +468,11 @@ cdef class OddRCoord:
         cdef list fringes = []
         cdef int k
         cdef OddRCoord coord, neighbor
+        cdef IsCoordBlocked compiled_is_coord_blocked = None
+        cdef bint is_blocked
+
+        if isinstance(is_coord_blocked, IsCoordBlocked):
+            compiled_is_coord_blocked = <IsCoordBlocked>is_coord_blocked
         
         visited.add(self)
         fringes.append([self])
@@ -318,7 +481,13 @@ cdef class OddRCoord:
             fringes.append([])
             for coord in fringes[k]:
                 for neighbor in coord.get_neighbors():
-                    if neighbor not in visited and not is_coord_blocked(neighbor, coord):
+                    if neighbor in visited:
+                        continue
+                    if compiled_is_coord_blocked is not None:
+                        is_blocked = compiled_is_coord_blocked.is_blocked(neighbor, coord)
+                    else:
+                        is_blocked = is_coord_blocked(neighbor, coord)
+                    if not is_blocked:
                         visited.add(neighbor)
                         fringes[k + 1].append(neighbor)
 
@@ -347,51 +516,172 @@ cdef class OddRCoord:
         self,
         OddRCoord goal,
         object is_coord_blocked,
-        get_cost: Callable[[OddRCoord, OddRCoord], float] = _get_default_cost,
+        object get_cost = None,
     ):
-        cdef object frontier = PriorityQueue()
-        cdef dict came_from = {self: None}
-        cdef dict cost_so_far = {self: 0.0}
+        cdef _AStarHeap frontier
+        # Coords are numbered in discovery order, came_from and cost_so_far are indexed by it
+        cdef dict indices
+        cdef list coords
+        cdef array.array came_from
+        cdef array.array cost_so_far
         cdef OddRCoord current
         cdef OddRCoord next_coord
+        cdef int current_index, next_index
         cdef float new_cost, priority
         cdef list path
-        cdef OddRCoord current_
-        cdef _AStarCoord frontier_item
-
-        frontier.put(_AStarCoord(0.0, self))
-
-        while not frontier.empty():
-            frontier_item = frontier.get()
-            current = frontier_item.coord
+        cdef object specialized_path
+        cdef IsCoordBlocked compiled_is_coord_blocked = None
+        cdef bint is_blocked
+
+        if isinstance(is_coord_blocked, IsCoordBlocked):
+            compiled_is_coord_blocked = <IsCoordBlocked>is_coord_blocked
+            if get_cost is None:
+                specialized_path = compiled_is_coord_blocked.search_path(self, goal, 0)
+                if specialized_path is not NotImplemented:
+                    return specialized_path
+
+        frontier = _AStarHeap()
+        indices = {self: 0}
+        coords = [self]
+        came_from = array.array("i", [-1])
+        cost_so_far = array.array("f", [0.0])
+        frontier.push(0.0, 0)
+
+        while frontier.size:
+            current_index = frontier.pop()
+            current = coords[current_index]
             
             if current == goal:
                 break
             
             for next_coord in current.get_neighbors():
-                if is_coord_blocked(next_coord, current):
+                if compiled_is_coord_blocked is not None:
+                    is_blocked = compiled_is_coord_blocked.is_blocked(next_coord, current)
+                else:
+                    is_blocked = is_coord_blocked(next_coord, current)
+                if is_blocked:
                     continue
 
-                new_cost = cost_so_far[current] + get_cost(current, next_coord)
-
-                if next_coord not in cost_so_far or new_cost < cost_so_far[next_coord]:
-                    cost_so_far[next_coord] = new_cost
-                    priority = new_cost + goal.get_distance(next_coord)
-                    frontier.put(_AStarCoord(priority, next_coord))
-                    came_from[next_coord] = current
+                if get_cost is None:
+                    new_cost = cost_so_far.data.as_floats[current_index] + 1.0
+                else:
+                    new_cost = cost_so_far.data.as_floats[current_index] + get_cost(current, next_coord)
+
+                next_index = indices.get(next_coord, -1)
+                if next_index == -1:
+                    next_index = len(coords)
+                    indices[next_coord] = next_index
+                    coords.append(next_coord)
+                    array.resize_smart(came_from, next_index + 1)
+                    array.resize_smart(cost_so_far, next_index + 1)
+                elif new_cost >= cost_so_far.data.as_floats[next_index]:
+                    continue
+                cost_so_far.data.as_floats[next_index] = new_cost
+                priority = new_cost + goal.get_distance(next_coord)
+                frontier.push(priority, next_index)
+                came_from.data.as_ints[next_index] = current_index
 
-        if goal not in came_from:
+        current_index = indices.get(goal, -1)
+        if current_index == -1:
             return None
 
         path = []
-        current_ = goal
-        while current_ is not None:
-            path.append(current_)
-            current_ = came_from[current_]
+        while current_index != -1:
+            path.append(coords[current_index])
+            current_index = came_from.data.as_ints[current_index]
         
         path.pop()
         path.reverse()
         return path
 
+    cpdef list[OddRCoord] path_find_bidirectional(
+        self,
+        OddRCoord goal,
+        object is_coord_blocked,
+    ):
+        cdef dict forward_parents
+        cdef dict backward_parents
+        cdef list forward_fringe, backward_fringe, next_fringe
+        cdef list path
+        cdef OddRCoord coord, neighbor
+        cdef object meeting_coord = None
+        cdef object current
+        cdef object specialized_path
+        cdef IsCoordBlocked compiled_is_coord_blocked = None
+        cdef bint is_blocked
+
+        if isinstance(is_coord_blocked, IsCoordBlocked):
+            compiled_is_coord_blocked = <IsCoordBlocked>is_coord_blocked
+            specialized_path = compiled_is_coord_blocked.search_path(self, goal, 1)
+            if specialized_path is not NotImplemented:
+                return specialized_path
+
+        if self == goal:
+            return []
+
+        forward_parents = {self: None}
+        backward_parents = {goal: None}
+        forward_fringe = [self]
+        backward_fringe = [goal]
+
+        # Expand a whole layer of the smaller side at a time. The first coord
+        # seen by both sides lies on a shortest path.
+        while forward_fringe and backward_fringe and meeting_coord is None:
+            next_fringe = []
+            if len(forward_fringe) <= len(backward_fringe):
+                for coord in forward_fringe:
+                    for neighbor in coord.get_neighbors():
+                        if neighbor in forward_parents:
+                            continue
+                        if compiled_is_coord_blocked is not None:
+                            is_blocked = compiled_is_coord_blocked.is_blocked(neighbor, coord)
+                        else:
+                            is_blocked = is_coord_blocked(neighbor, coord)
+                        if is_blocked:
+                            continue
+                        forward_parents[neighbor] = coord
+                        if neighbor in backward_parents:
+                            meeting_coord = neighbor
+                            break
+                        next_fringe.append(neighbor)
+                    if meeting_coord is not None:
+                        break
+                forward_fringe = next_fringe
+            else:
+                for coord in backward_fringe:
+                    for neighbor in coord.get_neighbors():
+                        if neighbor in backward_parents:
+                            continue
+                        if compiled_is_coord_blocked is not None:
+                            is_blocked = compiled_is_coord_blocked.is_blocked(coord, neighbor)
+                        else:
+                            is_blocked = is_coord_blocked(coord, neighbor)
+                        if is_blocked:
+                            continue
+                        backward_parents[neighbor] = coord
+                        if neighbor in forward_parents:
+                            meeting_coord = neighbor
+                            break
+                        next_fringe.append(neighbor)
+                    if meeting_coord is not None:
+                        break
+                backward_fringe = next_fringe
+
+        if meeting_coord is None:
+            return None
+
+        path = []
+        current = meeting_coord
+        while current is not None:
+            path.append(current)
+            current = forward_parents[current]
+        path.pop()
+        path.reverse()
+        current = backward_parents[meeting_coord]
+        while current is not None:
+            path.append(current)
+            current = backward_parents[current]
+        return path
+
     def __str__(self) -> str:
         return f"({self.x}, {self.y})"
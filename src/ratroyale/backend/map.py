@@ -1,4 +1,6 @@
 import inspect
+from dataclasses import dataclass
+from mmap import mmap
 from pathlib import Path
 from pprint import pformat
 from typing import Any, Final
@@ -27,6 +29,17 @@ def _debug(text: str) -> None:
     pass
 
 
+@dataclass(frozen=True)
+class MapHeader:
+    """What a map file says about the map before its tiles and objects"""
+
+    name: str
+    size_x: int
+    size_y: int
+    feature_count: int
+    entity_count: int
+
+
 class Map:
     name: str
     size_x: int
@@ -39,17 +52,23 @@ class Map:
     _FORMAT_SPEC = """
         1 byte for map_name_length
         map_name_length byte for `name`
-        5 bits 
+        1 bit for tile_grids_flag
+        4 bits 
         1 bit for large_map_flag
         1 bit for many_features_flag
         1 bit for many_entities_flag
         (1 + large_map_flag) bytes for `size_x`
         (1 + large_map_flag) bytes for `size_y`
 
-        loop (`size_x`*`size_y`) times {
-            1 byte for tile's `tile_id` (`None if byte == 0 else byte`)
-            if `tile_id` is not None {
-                1 byte for tile's `height`
+        if tile_grids_flag {
+            (`size_x`*`size_y`) bytes for tiles' `tile_id` (`None if byte == 0 else byte`)
+            (`size_x`*`size_y`) bytes for tiles' `height` (0 if `tile_id` is None)
+        } else {
+            loop (`size_x`*`size_y`) times {
+                1 byte for tile's `tile_id` (`None if byte == 0 else byte`)
+                if `tile_id` is not None {
+                    1 byte for tile's `height`
+                }
             }
         }
 
@@ -162,26 +181,24 @@ class Map:
         large_map_flag = 1 if self.size_x > 255 or self.size_y > 255 else 0
         many_features_flag = 1 if len(self.features) > 255 else 0
         many_entities_flag = 1 if len(self.entities) > 255 else 0
+        tile_grids_flag = 1
 
         data.append(
-            (large_map_flag << 2) | (many_features_flag << 1) | many_entities_flag
+            (tile_grids_flag << 7)
+            | (large_map_flag << 2)
+            | (many_features_flag << 1)
+            | many_entities_flag
         )
 
         data.extend(self.size_x.to_bytes(1 + large_map_flag, ENDIAN))
         data.extend(self.size_y.to_bytes(1 + large_map_flag, ENDIAN))
 
-        i = 0
-        for row in self.tiles:
-            for tile in row:
-                if tile is None:
-                    data.append(0)
-                    _debug(f"{i=}")
-                    i += 1
-                else:
-                    data.append(tile.tile_id)
-                    data.append(tile.height)
-                    _debug(f"{i=}, {tile.tile_id=}, {tile.height=}")
-                    i += 1
+        data.extend(
+            0 if tile is None else tile.tile_id for row in self.tiles for tile in row
+        )
+        data.extend(
+            0 if tile is None else tile.height for row in self.tiles for tile in row
+        )
 
         data.extend(len(self.features).to_bytes(1 + many_features_flag, ENDIAN))
         for feature in self.features:
@@ -244,6 +261,7 @@ class Map:
         name = data_pointer.get_raw_bytes(map_name_length).decode()
         _debug(f"{name=}")
         flags = data_pointer.get_byte()
+        tile_grids_flag = bool(flags & 1 << 7)
         large_map_flag = bool(flags & 1 << 2)
         _debug(f"{large_map_flag=}")
         many_features_flag = bool(flags & 1 << 1)
@@ -256,18 +274,34 @@ class Map:
         _debug(f"{size_y=}")
 
         tiles: list[list[Tile | None]] = []
-        i = 0
-        for y in range(size_y):
-            tiles.append([])
-            for x in range(size_x):
-                tile_id = data_pointer.get_byte()
-                if tile_id == 0:
-                    tiles[y].append(None)
-                    continue
-                height = data_pointer.get_byte()
-                _debug(f"{i=}, {tile_id=}, {height=}")
-                i += 1
-                tiles[y].append(Tile(tile_id, OddRCoord(x, y), height))
+        if tile_grids_flag:
+            tile_count = size_x * size_y
+            tile_ids = data_pointer.get_view(tile_count)
+            heights = data_pointer.get_view(tile_count)
+            for y in range(size_y):
+                row_start = y * size_x
+                row_end = row_start + size_x
+                tiles.append(
+                    [
+                        None if tile_id == 0 else Tile(tile_id, OddRCoord(x, y), height)
+                        for x, (tile_id, height) in enumerate(
+                            zip(tile_ids[row_start:row_end], heights[row_start:row_end])
+                        )
+                    ]
+                )
+        else:
+            i = 0
+            for y in range(size_y):
+                tiles.append([])
+                for x in range(size_x):
+                    tile_id = data_pointer.get_byte()
+                    if tile_id == 0:
+                        tiles[y].append(None)
+                        continue
+                    height = data_pointer.get_byte()
+                    _debug(f"{i=}, {tile_id=}, {height=}")
+                    i += 1
+                    tiles[y].append(Tile(tile_id, OddRCoord(x, y), height))
 
         feature_count = data_pointer.get_byte(1 + many_features_flag)
         _debug(f"{feature_count=}")
@@ -338,6 +372,47 @@ class Map:
             name, size_x, size_y, tiles, entities, features, base_crumbs_per_turn
         )
 
+    @classmethod
+    def load_header(cls, data: bytes | mmap) -> MapHeader:
+        """
+        Read the header of a map, skipping over tiles and features without
+        decoding them
+        """
+        data_pointer = DataPointer(data, ENDIAN)
+        map_name_length = data_pointer.get_byte()
+        name = data_pointer.get_raw_bytes(map_name_length).decode()
+        flags = data_pointer.get_byte()
+        tile_grids_flag = bool(flags & 1 << 7)
+        large_map_flag = bool(flags & 1 << 2)
+        many_features_flag = bool(flags & 1 << 1)
+        many_entities_flag = bool(flags & 1 << 0)
+
+        coord_size = 1 + large_map_flag
+        size_x = data_pointer.get_byte(coord_size)
+        size_y = data_pointer.get_byte(coord_size)
+
+        if tile_grids_flag:
+            data_pointer.skip(2 * size_x * size_y)
+        else:
+            for _ in range(size_x * size_y):
+                if data_pointer.get_byte() != 0:
+                    data_pointer.skip(1)
+
+        feature_count = data_pointer.get_byte(1 + many_features_flag)
+        for _ in range(feature_count):
+            unique_constructor_flag = bool(data_pointer.get_byte(2) & (1 << 15))
+            # health, defense and side
+            data_pointer.skip(3)
+            shape_size = data_pointer.get_byte()
+            data_pointer.skip(shape_size * 2 * coord_size)
+            if unique_constructor_flag:
+                data_pointer.skip(data_pointer.get_byte())
+
+        entity_count = data_pointer.get_byte(1 + many_entities_flag)
+        if data_pointer.pointer > len(data):
+            raise ValueError("Map data ends before its header does")
+        return MapHeader(name, size_x, size_y, feature_count, entity_count)
+
     def __repr__(self) -> str:
         return f"""Map(
     name={self.name!r},
@@ -0,0 +1,125 @@
+import json
+from dataclasses import asdict, dataclass
+from mmap import ACCESS_READ, mmap
+from pathlib import Path
+from typing import Any, Iterator
+
+from .map import MAP_FILE_EXTENSION, Map, MapHeader
+
+MAP_INDEX_FILE_NAME = ".rrmap-index.json"
+MAP_INDEX_VERSION = 1
+
+
+@dataclass(frozen=True)
+class MapEntry:
+    path: Path
+    mtime_ns: int
+    file_size: int
+    header: MapHeader
+
+    def load(self) -> Map | None:
+        """Decode the whole map"""
+        return Map.from_file(self.path)
+
+
+def read_map_header(file_path: Path) -> MapHeader:
+    """Read the header of a map file without reading the rest of it"""
+    with (
+        file_path.open("rb") as file,
+        mmap(file.fileno(), 0, access=ACCESS_READ) as data,
+    ):
+        return Map.load_header(data)
+
+
+class MapCatalog:
+    """
+    Every map in a directory, known by header only. The headers are kept in
+    an index file, so only maps that were added or changed since are read.
+    Full maps are only decoded when they're loaded.
+    """
+
+    def __init__(self, directory: Path, index_path: Path | None = None) -> None:
+        self.directory = directory
+        self.index_path = (
+            directory / MAP_INDEX_FILE_NAME if index_path is None else index_path
+        )
+        self.entries: dict[str, MapEntry] = {}
+        """Entries by file name, sorted"""
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Read headers of maps that aren't in the index or changed since"""
+        index = self._read_index()
+        entries: dict[str, MapEntry] = {}
+        for file_path in sorted(self.directory.glob(f"*.{MAP_FILE_EXTENSION}")):
+            try:
+                stat = file_path.stat()
+                entry = index.get(file_path.name)
+                if (
+                    entry is None
+                    or entry.mtime_ns != stat.st_mtime_ns
+                    or entry.file_size != stat.st_size
+                ):
+                    entry = MapEntry(
+                        file_path,
+                        stat.st_mtime_ns,
+                        stat.st_size,
+                        read_map_header(file_path),
+                    )
+            except (OSError, ValueError, IndexError):
+                # Empty, truncated or otherwise corrupt maps aren't listed
+                continue
+            entries[file_path.name] = entry
+        self.entries = entries
+        if entries != index:
+            self._write_index()
+
+    def get(self, file_name: str) -> MapEntry | None:
+        return self.entries.get(file_name)
+
+    def __iter__(self) -> Iterator[MapEntry]:
+        return iter(self.entries.values())
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _read_index(self) -> dict[str, MapEntry]:
+        """
+        :returns: Entries from the index file, or none if it's missing or
+        can't be read, since it can always be built again
+        """
+        try:
+            with self.index_path.open("r") as file:
+                index_json = json.load(file)
+            if index_json["version"] != MAP_INDEX_VERSION:
+                return {}
+            return {
+                file_name: MapEntry(
+                    self.directory / file_name,
+                    entry_json["mtime_ns"],
+                    entry_json["file_size"],
+                    MapHeader(**entry_json["header"]),
+                )
+                for file_name, entry_json in index_json["maps"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError):
+            return {}
+
+    def _write_index(self) -> None:
+        index_json: dict[str, Any] = {
+            "version": MAP_INDEX_VERSION,
+            "maps": {
+                file_name: {
+                    "mtime_ns": entry.mtime_ns,
+                    "file_size": entry.file_size,
+                    "header": asdict(entry.header),
+                }
+                for file_name, entry in self.entries.items()
+            },
+        }
+        try:
+            with self.index_path.open("w") as file:
+                json.dump(index_json, file, indent=2)
+        except OSError:
+            # Only a cache, the maps can still be listed without it
+            pass
@@ -36,9 +36,9 @@ GACHA_POOL_WEIGHTS: dict[Squeak, float] = {
 
 
 def gacha_squeak(seed: int, count: int = 1) -> tuple[list[Squeak], int]:
-    random.seed(seed)
-    result = random.choices(
+    rng = random.Random(seed)
+    result = rng.choices(
         list(GACHA_POOL_WEIGHTS.keys()), list(GACHA_POOL_WEIGHTS.values()), k=count
     )
-    new_seed = random.randrange(sys.maxsize)
+    new_seed = rng.randrange(sys.maxsize)
     return result, new_seed
@@ -1,6 +1,7 @@
 from enum import Enum, auto
 from typing import TYPE_CHECKING, Protocol, TypeVar
 
+from .countdown import Countdown
 from .side import Side
 
 if TYPE_CHECKING:
@@ -23,9 +24,8 @@ def empty_timer_callback(timer: "Timer", game_manager: "GameManager") -> None:
     pass
 
 
-class Timer:
+class Timer(Countdown):
     _has_timer_data = False
-    duration: int
     timer_clear_side: TimerClearSide
     on_timer_over: TimerCallback
     on_turn_change: TimerCallback
@@ -51,6 +51,10 @@ class Timer:
         else:
             self.on_timer_over = empty_timer_callback
 
+    @property
+    def has_on_turn_change(self) -> bool:
+        return self.on_turn_change is not empty_timer_callback
+
     def should_clear(self, turn: Side) -> bool:
         match self.timer_clear_side:
             case TimerClearSide.ENEMY:
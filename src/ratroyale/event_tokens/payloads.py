@@ -9,7 +9,9 @@ from ratroyale.backend.player_info.squeak import Squeak
 from ratroyale.backend.entity import SkillTargeting, SkillCompleted
 from ratroyale.backend.instant_kill import InstantKill
 from ratroyale.backend.source_of_damage_or_heal import SourceOfDamageOrHeal
+from ratroyale.backend.ai.background_ai import AITurn
 from ratroyale.backend.ai.base_ai import BaseAI
+from concurrent.futures import Future
 from ratroyale.backend.side import Side
 from ratroyale.backend.crumbs_per_turn_modifier import CrumbsPerTurnModifier
 from pathlib import Path
@@ -162,3 +164,8 @@ class SaveFilesPayload(Payload):
 class PlayerInfoPayload(Payload):
     player_1_info: PlayerInfo
     player_1_path: Path
+
+
+@dataclass
+class AITurnPayload(Payload):
+    ai_turn: Future[AITurn]
@@ -27,7 +27,7 @@ from ratroyale.game_data import RRMAPS_DIR_PATH
 
 
 from ..page_managers.base_page import Page
-from ratroyale.backend.map import Map
+from ratroyale.backend.map_catalog import MapCatalog
 from ratroyale.backend.ai.base_ai import BaseAI
 from ratroyale.backend.ai.random_ai import RandomAI
 from ratroyale.backend.player_info.preset_player_info import (
@@ -45,7 +45,8 @@ class ChooseAIPlayerInfo(Page):
         self, coordination_manager: CoordinationManager, camera: Camera
     ) -> None:
         super().__init__(coordination_manager, theme_name="main_menu", camera=camera)
-        self.map = Map.from_file(RRMAPS_DIR_PATH / "starting-kitchen.rrmap")
+        # Only decoded when the game starts
+        self.map_entry = MapCatalog(RRMAPS_DIR_PATH).get("starting-kitchen.rrmap")
         self.ai_type: type[BaseAI] | None = None
 
     def define_initial_gui(self) -> list[ElementWrapper]:
@@ -113,12 +114,14 @@ class ChooseAIPlayerInfo(Page):
         self.open_page("ChoosePlayer")
 
     def start_game(self) -> None:
-        assert self.map
+        assert self.map_entry
+        game_map = self.map_entry.load()
+        assert game_map
         self.post(
             GameManagerEvent(
                 "start",
                 BackendStartPayload(
-                    self.map,
+                    game_map,
                     self.player_1_info,
                     self.player_2_info,
                     Side.RAT,
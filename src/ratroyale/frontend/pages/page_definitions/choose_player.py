@@ -20,11 +20,7 @@ from ratroyale.frontend.pages.page_elements.spatial_component import (
     Camera,
 )
 
-from ratroyale.game_data import RRMAPS_DIR_PATH
-
-
 from ..page_managers.base_page import Page
-from ratroyale.backend.map import Map
 from ratroyale.backend.ai.base_ai import BaseAI
 
 
@@ -35,7 +31,6 @@ class ChoosePlayer(Page):
         self, coordination_manager: CoordinationManager, camera: Camera
     ) -> None:
         super().__init__(coordination_manager, theme_name="main_menu", camera=camera)
-        self.map = Map.from_file(RRMAPS_DIR_PATH / "starting-kitchen.rrmap")
         self.ai_type: type[BaseAI] | None = None
 
     def define_initial_gui(self) -> list[ElementWrapper]:
@@ -137,7 +137,13 @@ class GameBoard(Page):
         if self.is_game_over:
             self.post(PageNavigationEvent([(PageNavigation.OPEN, "GameOver")]))
             self.open_page("GameOver")
-        if self.game_state == GameState.PLAYER2 and self.is_playing_with_ai:
+        # The AI plays in the background, so animations can run out before
+        # its turn is over
+        if (
+            self.game_state == GameState.PLAYER2
+            and self.is_playing_with_ai
+            and self.is_player_1_now
+        ):
             self.game_state = GameState.PLAYER1
             self.show_player_hand(1)
             self.hide_player_hand(2)
@@ -1,3 +1,4 @@
+from concurrent.futures import Future
 from typing import TYPE_CHECKING, Callable
 
 from ratroyale.backend.game_manager import GameManager
@@ -23,10 +24,12 @@ from ratroyale.event_tokens.payloads import (
     SidePayload,
     DeckPayload,
     PlayerInfoPayload,
+    AITurnPayload,
 )
 from ratroyale.backend.game_event import (
     GameEvent,
 )
+from ratroyale.backend.ai.background_ai import AITurn, BackgroundAI
 from ratroyale.backend.ai.base_ai import BaseAI
 from ratroyale.backend.side import Side
 
@@ -46,10 +49,11 @@ class BackendAdapter:
         self.game_manager = game_manager
         self.page_manager = page_manager
         self.coordination_manager = coordination_manager
-        self.ai: BaseAI | None = (
-            ai_type(self.game_manager, Side.MOUSE) if ai_type else None
+        self.ai: BackgroundAI | None = (
+            BackgroundAI(self.game_manager, ai_type, Side.MOUSE) if ai_type else None
         )
-        self._ai_turn: bool = False
+        self._ai_turn: Future[AITurn] | None = None
+        """AI turn being played in the background"""
         self.game_manager_response: dict[str, Callable[[GameManagerEvent], None]] = {
             "start_game": self.handle_game_start,
             "squeak_tile_interaction": self.handle_squeak_tile_interaction,
@@ -63,8 +67,14 @@ class BackendAdapter:
             "get_player_1": self.handle_get_player_1,
             "update_after_game_over": self.handle_update_after_game_over,
             "gacha": self.handle_gacha,
+            "ai_turn_done": self.handle_ai_turn_done,
         }
 
+    def close(self) -> None:
+        self._ai_turn = None
+        if self.ai:
+            self.ai.close()
+
     def execute_backend_callback(self) -> None:
         msg_queue_from_backend: EventQueue[GameEvent] = self.game_manager.event_queue
 
@@ -98,7 +108,13 @@ class BackendAdapter:
             )
         )
 
+    def is_ai_turn_pending(self) -> bool:
+        """Whether the AI is still playing its turn in the background"""
+        return self._ai_turn is not None
+
     def handle_squeak_tile_interaction(self, event: GameManagerEvent) -> None:
+        if self.is_ai_turn_pending():
+            return
         payload = event.payload
         if payload:
             assert isinstance(payload, SqueakPlacementPayload)
@@ -115,6 +131,8 @@ class BackendAdapter:
             )
 
     def handle_skill_canceled(self, event: GameManagerEvent) -> None:
+        if self.is_ai_turn_pending():
+            return
         self.game_manager.cancel_selecting_target()
 
     def handle_squeak_placable_tiles(self, event: GameManagerEvent) -> None:
@@ -133,6 +151,8 @@ class BackendAdapter:
             )
 
     def handle_ability_activation(self, event: GameManagerEvent) -> None:
+        if self.is_ai_turn_pending():
+            return
         payload = event.payload
         assert isinstance(payload, SkillActivationPayload)
         entity = payload.entity
@@ -166,6 +186,8 @@ class BackendAdapter:
             )
 
     def handle_resolve_movement(self, event: GameManagerEvent) -> None:
+        if self.is_ai_turn_pending():
+            return
         payload = event.payload
         assert isinstance(payload, EntityMovementPayload)
         entity = payload.entity
@@ -182,11 +204,46 @@ class BackendAdapter:
         )
 
     def handle_end_turn(self, event: GameManagerEvent) -> None:
+        if self.is_ai_turn_pending():
+            return
         self.game_manager.end_turn()
-        if self.ai:
-            self.ai.run_ai_and_update_game_manager()
+        self.start_ai_turn()
+
+    def start_ai_turn(self) -> None:
+        """
+        Let the AI think in the background, the frame loop keeps going and
+        gets its actions back through the coordination manager
+        """
+        if self.ai is None or not self.ai.is_ai_turn():
+            return
+        ai_turn = self.ai.start_turn()
+        self._ai_turn = ai_turn
+
+        def on_done(ai_turn: Future[AITurn]) -> None:
+            self.coordination_manager.put_message(
+                GameManagerEvent("ai_turn_done", payload=AITurnPayload(ai_turn))
+            )
+
+        ai_turn.add_done_callback(on_done)
+
+    def handle_ai_turn_done(self, event: GameManagerEvent) -> None:
+        payload = event.payload
+        assert isinstance(payload, AITurnPayload)
+        if payload.ai_turn is not self._ai_turn or self.ai is None:
+            # Turn of a game that has been stopped
+            return
+        self._ai_turn = None
+        ai_turn = payload.ai_turn
+        if ai_turn.cancelled() or ai_turn.exception() is not None:
+            # The worker couldn't play the turn, so play it here instead
+            self.ai.play_turn()
+        elif not self.ai.apply_turn(ai_turn.result()):
+            # The game moved on while the AI was thinking
+            self.start_ai_turn()
 
     def handle_target_selected(self, event: GameManagerEvent) -> None:
+        if self.is_ai_turn_pending():
+            return
         payload = event.payload
         assert isinstance(payload, AbilityTargetPayload)
         selected_coords = payload.selected_targets
@@ -97,6 +97,9 @@ class PageManager:
         while not msg_queue_from_page.empty():
             msg_from_page: GameManagerEvent = msg_queue_from_page.get_nowait()
             if self.backend_adapter is None:
+                if msg_from_page.game_action == "ai_turn_done":
+                    # The AI finished thinking after the game stopped
+                    continue
                 if msg_from_page.game_action != "start":
                     raise ValueError(
                         "Attempting to issue event to GameManager without starting it"
@@ -116,6 +119,7 @@ class PageManager:
                 )
                 continue
             if msg_from_page.game_action == "stop":
+                self.backend_adapter.close()
                 self.backend_adapter = None
                 continue
             if msg_from_page.game_action == "start":
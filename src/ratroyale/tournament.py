@@ -0,0 +1,335 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Final, Iterable
+
+from .backend.action_log import ACTION_LOG_FILE_EXTENSION
+from .backend.ai.base_ai import BaseAI
+from .backend.ai.mcts_ai import MCTSAI
+from .backend.ai.random_ai import RandomAI
+from .backend.ai.rushb_ai import RushBAI
+from .backend.board_template import BoardTemplate
+from .backend.game_manager import GameManager
+from .backend.map import Map
+from .backend.map_catalog import MapCatalog
+from .backend.player_info.preset_player_info import AI_PLAYER_INFO, AIPlayerInfo
+from .backend.side import Side
+
+AI_TYPES: Final[dict[str, type[BaseAI]]] = {
+    "MCTSAI": MCTSAI,
+    "RandomAI": RandomAI,
+    "RushBAI": RushBAI,
+}
+
+DEFAULT_MAX_TURNS = 200
+
+
+@dataclass(frozen=True)
+class GameSetup:
+    """Everything a worker process needs to play one game"""
+
+    game_index: int
+    seed: int
+    map_path: Path
+    ai_types: tuple[str, str]
+    player_infos: tuple[AIPlayerInfo, AIPlayerInfo]
+    ai_1_side: Side
+    player_1: Side
+    max_turns: int
+    log_dir: Path | None = None
+
+
+@dataclass
+class GameResult:
+    """
+    Outcome of one game. Everything indexed by AI is in the same order as
+    `GameSetup.ai_types`.
+    """
+
+    game_index: int
+    seed: int
+    map_name: str
+    ai_1_side: str
+    player_1: str
+    winner: int | None
+    """Index of the winning AI, None for a draw or an error"""
+    turn_count: int
+    squeak_placed: tuple[int, int]
+    enemy_rodent_killed: tuple[int, int]
+    turn_times: tuple[list[float], list[float]]
+    """Seconds each AI took for each of its turns"""
+    error: str | None = None
+
+
+@dataclass
+class AIReport:
+    name: str
+    wins: int = 0
+    squeak_placed: int = 0
+    enemy_rodent_killed: int = 0
+    turns: int = 0
+    mean_turn_time: float = 0
+    p95_turn_time: float = 0
+    max_turn_time: float = 0
+
+
+@dataclass
+class TournamentReport:
+    games: int
+    draws: int
+    errors: int
+    mean_turn_count: float
+    wall_time: float
+    games_per_second: float
+    ais: tuple[AIReport, AIReport]
+    results: list[GameResult] = field(default_factory=list)
+
+
+def create_game_setups(
+    map_paths: list[Path],
+    ai_types: tuple[str, str],
+    player_infos: tuple[AIPlayerInfo, AIPlayerInfo],
+    game_count: int,
+    seed: int,
+    max_turns: int = DEFAULT_MAX_TURNS,
+    log_dir: Path | None = None,
+) -> list[GameSetup]:
+    """
+    Games cycle through the maps and through every combination of which side
+    the first AI plays and which side goes first, so neither AI is favoured
+    """
+    return [
+        GameSetup(
+            game_index,
+            seed + game_index,
+            map_paths[game_index % len(map_paths)],
+            ai_types,
+            player_infos,
+            ai_1_side=Side.RAT if game_index % 2 == 0 else Side.MOUSE,
+            player_1=Side.RAT if game_index // 2 % 2 == 0 else Side.MOUSE,
+            max_turns=max_turns,
+            log_dir=log_dir,
+        )
+        for game_index in range(game_count)
+    ]
+
+
+@lru_cache
+def _load_board_template(map_path: Path) -> BoardTemplate | None:
+    """Decode and set up each map once per worker, boards are cloned from it"""
+    game_map = Map.from_file(map_path)
+    if game_map is None:
+        return None
+    return BoardTemplate(game_map)
+
+
+def get_map_paths(paths: Iterable[Path]) -> list[Path]:
+    """
+    :returns: Every map file, with directories replaced by the maps in them
+    """
+    map_paths: list[Path] = []
+    for path in paths:
+        if path.is_dir():
+            map_paths.extend(entry.path for entry in MapCatalog(path))
+        else:
+            map_paths.append(path)
+    return map_paths
+
+
+def play_game(setup: GameSetup) -> GameResult:
+    """Play a whole game between 2 AIs without any rendering"""
+    # AIs use the global random, the game itself uses its own seeded random
+    random.seed(setup.seed)
+    board_template = _load_board_template(setup.map_path)
+    if board_template is None:
+        raise ValueError(f"Cannot load {setup.map_path}")
+    game_map = board_template.map
+    sides = (setup.ai_1_side, setup.ai_1_side.other_side())
+    players_info = [AI_PLAYER_INFO[player_info] for player_info in setup.player_infos]
+    if setup.player_1 != setup.ai_1_side:
+        players_info.reverse()
+    game_manager = GameManager(
+        game_map,
+        (players_info[0], players_info[1]),
+        setup.player_1,
+        is_disable_reward=True,
+        seed=setup.seed,
+        board_template=board_template,
+    )
+    ais: dict[Side, BaseAI] = {}
+    turn_times: dict[Side, list[float]] = {side: [] for side in sides}
+    error = None
+    try:
+        for side, ai_type in zip(sides, setup.ai_types):
+            ais[side] = AI_TYPES[ai_type](game_manager, side)
+        while (
+            game_manager.game_over_event is None
+            and game_manager.turn_count <= setup.max_turns
+        ):
+            side = game_manager.turn
+            start = time.perf_counter()
+            ais[side].run_ai_and_update_game_manager()
+            turn_times[side].append(time.perf_counter() - start)
+            for _ in game_manager.event_queue:
+                pass
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        for ai in ais.values():
+            ai.close()
+    if setup.log_dir is not None:
+        game_manager.action_log.to_file(
+            setup.log_dir / f"{setup.game_index}.{ACTION_LOG_FILE_EXTENSION}"
+        )
+    winner = None
+    if game_manager.game_over_event is not None:
+        winner = sides.index(game_manager.game_over_event.victory_side)
+    game_stats = game_manager.game_stats
+    return GameResult(
+        setup.game_index,
+        setup.seed,
+        game_map.name,
+        setup.ai_1_side.name,
+        setup.player_1.name,
+        winner,
+        game_manager.turn_count,
+        squeak_placed=(
+            game_stats.squeak_placed[sides[0]],
+            game_stats.squeak_placed[sides[1]],
+        ),
+        enemy_rodent_killed=(
+            game_stats.enemy_rodent_killed[sides[0]],
+            game_stats.enemy_rodent_killed[sides[1]],
+        ),
+        turn_times=(turn_times[sides[0]], turn_times[sides[1]]),
+        error=error,
+    )
+
+
+def create_report(
+    ai_types: tuple[str, str], results: list[GameResult], wall_time: float
+) -> TournamentReport:
+    ai_reports = (AIReport(ai_types[0]), AIReport(ai_types[1]))
+    for ai_index, ai_report in enumerate(ai_reports):
+        turn_times: list[float] = []
+        for result in results:
+            if result.winner == ai_index:
+                ai_report.wins += 1
+            ai_report.squeak_placed += result.squeak_placed[ai_index]
+            ai_report.enemy_rodent_killed += result.enemy_rodent_killed[ai_index]
+            turn_times.extend(result.turn_times[ai_index])
+        ai_report.turns = len(turn_times)
+        if not turn_times:
+            continue
+        turn_times.sort()
+        ai_report.mean_turn_time = statistics.fmean(turn_times)
+        ai_report.p95_turn_time = turn_times[int(len(turn_times) * 0.95)]
+        ai_report.max_turn_time = turn_times[-1]
+    errors = sum(result.error is not None for result in results)
+    return TournamentReport(
+        games=len(results),
+        draws=sum(result.winner is None for result in results) - errors,
+        errors=errors,
+        mean_turn_count=(
+            statistics.fmean(result.turn_count for result in results) if results else 0
+        ),
+        wall_time=wall_time,
+        games_per_second=len(results) / wall_time if wall_time else 0,
+        ais=ai_reports,
+        results=results,
+    )
+
+
+def run_tournament(setups: list[GameSetup], workers: int | None) -> list[GameResult]:
+    """Play every game across a pool of worker processes"""
+    if workers == 1:
+        return [play_game(setup) for setup in setups]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(play_game, setups))
+
+
+def format_report(report: TournamentReport) -> Iterable[str]:
+    yield (
+        f"{report.games} games in {report.wall_time:.1f} s "
+        f"({report.games_per_second:.2f} games/s), "
+        f"{report.draws} draws, {report.errors} errors, "
+        f"{report.mean_turn_count:.1f} turns on average"
+    )
+    for ai_report in report.ais:
+        yield (
+            f"{ai_report.name:>10}: {ai_report.wins} wins, "
+            f"{ai_report.squeak_placed} squeaks placed, "
+            f"{ai_report.enemy_rodent_killed} rodents killed, "
+            f"turn time mean {ai_report.mean_turn_time * 1e3:.1f} ms "
+            f"p95 {ai_report.p95_turn_time * 1e3:.1f} ms "
+            f"max {ai_report.max_turn_time * 1e3:.1f} ms"
+        )
+    for result in report.results:
+        if result.error is not None:
+            yield f"Game {result.game_index} (seed {result.seed}): {result.error}"
+
+
+def main(args: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        description="Play AI versus AI games without rendering"
+    )
+    parser.add_argument("ai_1", choices=AI_TYPES.keys())
+    parser.add_argument("ai_2", choices=AI_TYPES.keys())
+    parser.add_argument(
+        "maps",
+        nargs="+",
+        type=Path,
+        help=".rrmap files or directories of them to play on",
+    )
+    parser.add_argument("-n", "--games", type=int, default=10)
+    parser.add_argument(
+        "-j", "--workers", type=int, default=os.cpu_count(), help="Worker processes"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=DEFAULT_MAX_TURNS)
+    parser.add_argument(
+        "--player-info",
+        nargs=2,
+        default=["Balanced", "Balanced"],
+        choices=AI_PLAYER_INFO.keys(),
+    )
+    parser.add_argument("-o", "--output", type=Path, help="Write JSON report here")
+    parser.add_argument(
+        "--log-dir", type=Path, help="Save the action log of every game here"
+    )
+    parsed_args = parser.parse_args(args)
+    if parsed_args.log_dir is not None:
+        parsed_args.log_dir.mkdir(parents=True, exist_ok=True)
+    ai_types = (parsed_args.ai_1, parsed_args.ai_2)
+    map_paths = get_map_paths(parsed_args.maps)
+    if not map_paths:
+        parser.error("No maps to play on")
+    setups = create_game_setups(
+        map_paths,
+        ai_types,
+        (parsed_args.player_info[0], parsed_args.player_info[1]),
+        parsed_args.games,
+        parsed_args.seed,
+        parsed_args.max_turns,
+        parsed_args.log_dir,
+    )
+    start = time.perf_counter()
+    results = run_tournament(setups, parsed_args.workers)
+    report = create_report(ai_types, results, time.perf_counter() - start)
+    for line in format_report(report):
+        print(line)
+    if parsed_args.output is not None:
+        report_json: dict[str, Any] = asdict(report)
+        with parsed_args.output.open("w") as file:
+            json.dump(report_json, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
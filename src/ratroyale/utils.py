@@ -1,15 +1,60 @@
-import dis
+from mmap import mmap
 from queue import Empty, Queue
-from typing import Any, Callable, Literal, TypeVar, cast
+from typing import (
+    Generic,
+    Iterable,
+    Iterator,
+    Literal,
+    Protocol,
+    TypeVar,
+    cast,
+)
 
 T = TypeVar("T")
+T_contra = TypeVar("T_contra", contravariant=True)
 
 
 def lerp(a: float, b: float, t: float) -> float:
     return a + (b - a) * t
 
 
+class EventListener(Protocol[T_contra]):
+    def on_event(self, event: T_contra) -> None:
+        """Called for every item put into the queue, while the queue is locked"""
+        ...
+
+    def on_replace(self) -> None:
+        """Called after every item in the queue was replaced at once"""
+        ...
+
+
 class EventQueue(Queue[T]):
+    def __init__(self, maxsize: int = 0) -> None:
+        super().__init__(maxsize)
+        self.listeners: list[EventListener[T]] = []
+        """Notified of every item put into the queue, even if nobody gets it"""
+        self.generation = 0
+        """Changes whenever an item is put or the items are replaced"""
+        self.is_muted = False
+        """Drop items put while True. Only for changes that are undone right after."""
+
+    def _put(self, item: T) -> None:
+        if self.is_muted:
+            return
+        super()._put(item)
+        self.generation += 1
+        for listener in self.listeners:
+            listener.on_event(item)
+
+    def replace(self, items: Iterable[T]) -> None:
+        """Replace every item in the queue without notifying `on_event`"""
+        with self.mutex:
+            self.queue.clear()
+            self.queue.extend(items)
+            self.generation += 1
+        for listener in self.listeners:
+            listener.on_replace()
+
     def get_or_none(self) -> T | None:
         try:
             return self.get_nowait()
@@ -32,11 +77,69 @@ class EventQueue(Queue[T]):
         return next
 
 
+class OrderedSet(Generic[T]):
+    """
+    Insertion-ordered set with O(1) `append` and `remove`. Iteration goes over
+    a snapshot and skips items removed in the meantime, so it's safe to add or
+    remove items while iterating. Items added during iteration aren't visited.
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items: Iterable[T] = ()) -> None:
+        self._items: dict[T, None] = dict.fromkeys(items)
+
+    def append(self, item: T) -> None:
+        self._items[item] = None
+
+    def remove(self, item: T) -> None:
+        try:
+            del self._items[item]
+        except KeyError:
+            raise ValueError(f"{item!r} is not in OrderedSet") from None
+
+    def discard(self, item: T) -> None:
+        self._items.pop(item, None)
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    def update(self, items: Iterable[T]) -> None:
+        if isinstance(items, OrderedSet):
+            self._items.update(items._items)
+            return
+        self._items.update(dict.fromkeys(items))
+
+    def copy(self) -> "OrderedSet[T]":
+        new = OrderedSet[T]()
+        new._items = self._items.copy()
+        return new
+
+    def __contains__(self, item: object) -> bool:
+        return item in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[T]:
+        items = self._items
+        for item in list(items):
+            if item in items:
+                yield item
+
+    def __getitem__(self, index: int) -> T:
+        """O(n), prefer iterating"""
+        return list(self._items)[index]
+
+    def __repr__(self) -> str:
+        return f"OrderedSet({list(self._items)!r})"
+
+
 class DataPointer:
-    data: bytes
+    data: bytes | mmap
     pointer: int
 
-    def __init__(self, data: bytes, endian: Literal["little", "big"]) -> None:
+    def __init__(self, data: bytes | mmap, endian: Literal["little", "big"]) -> None:
         self.data = data
         self.pointer = 0
         self.endian: Literal["little", "big"] = endian
@@ -49,21 +152,14 @@ class DataPointer:
         self.pointer += size
         return value
 
-    def verify_end(self) -> bool:
-        return self.pointer == len(self.data)
+    def get_view(self, size: int) -> memoryview:
+        """Same as `get_raw_bytes` but without copying"""
+        value = memoryview(self.data)[self.pointer : self.pointer + size]
+        self.pointer += size
+        return value
 
+    def skip(self, size: int) -> None:
+        self.pointer += size
 
-def is_ellipsis_body(func: Callable[..., Any]) -> bool:
-    """Checks if a function's body is solely the ellipsis (...)"""
-    instructions = list(dis.get_instructions(func))
-
-    if len(instructions) != 4:
-        return False
-    return (
-        instructions[0].opname == "LOAD_CONST"
-        and instructions[0].argval is Ellipsis
-        and instructions[1].opname == "POP_TOP"
-        and instructions[2].opname == "LOAD_CONST"
-        and instructions[2].argval is None
-        and instructions[3].opname == "RETURN_VALUE"
-    )
+    def verify_end(self) -> bool:
+        return self.pointer == len(self.data)
@@ -1,15 +1,41 @@
+import random
+import time
+from concurrent.futures import Future
+from itertools import combinations
+from pathlib import Path
+from typing import TYPE_CHECKING, cast
+
 import pytest
 
+from ratroyale.backend.ai.background_ai import AITurn, BackgroundAI
 from ratroyale.backend.ai.base_ai import BaseAI
+from ratroyale.backend.ai.incremental_actions import IncrementalActions
+from ratroyale.backend.ai.mcts_ai import MCTSAI
 from ratroyale.backend.ai.random_ai import RandomAI
 from ratroyale.backend.ai.rushb_ai import RushBAI
+from ratroyale.backend.ai.target_combinations import iter_target_combinations
+from ratroyale.backend.entities.rodents.vanguard import Tailblazer
+from ratroyale.backend.entity import SkillCompleted, SkillResult, SkillTargeting
 from ratroyale.backend.features.common import DeploymentZone, Lair
 from ratroyale.backend.game_manager import GameManager
 from ratroyale.backend.hexagon import OddRCoord
 from ratroyale.backend.map import Map, heights_to_tiles
 from ratroyale.backend.player_info.player_info import PlayerInfo
+from ratroyale.backend.player_info.preset_player_info import AI_PLAYER_INFO
 from ratroyale.backend.player_info.squeaks.rodents.vanguard import TAILBLAZER
 from ratroyale.backend.side import Side
+from ratroyale.coordination_manager import CoordinationManager
+from ratroyale.event_tokens.game_token import GameManagerEvent
+from ratroyale.event_tokens.payloads import AITurnPayload
+from ratroyale.frontend.pages.page_managers.backend_adapter import BackendAdapter
+from ratroyale.tournament import create_game_setups, create_report, run_tournament
+
+if TYPE_CHECKING:
+    from ratroyale.frontend.pages.page_managers.page_manager import PageManager
+
+STARTING_KITCHEN_PATH = (
+    Path(__file__).parents[2] / "src/ratroyale/assets/rrmaps/starting-kitchen.rrmap"
+)
 
 
 @pytest.fixture
@@ -120,3 +146,197 @@ def test_long_map(long_map: Map, ai_type: type[BaseAI]) -> None:
             assert game_manager.game_over_event.victory_side == ai.ai_side
             return
     assert False
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("workers", [0, 1])
+def test_mcts_ai(small_map: Map, workers: int) -> None:
+    player_info = PlayerInfo(
+        {TAILBLAZER: 5},
+        [{TAILBLAZER: 5}],
+        [{TAILBLAZER: 5}],
+        selected_squeak_set_index=0,
+        exp=0,
+        cheese=0,
+        is_progression_frozen=True,
+    )
+    game_manager = GameManager(
+        small_map, players_info=(player_info, player_info), player_1=Side.RAT
+    )
+    ai = MCTSAI(
+        game_manager, Side.MOUSE, iterations=20, time_budget=None, workers=workers
+    )
+    try:
+        for _ in range(100):
+            game_manager.end_turn()
+            ai.run_ai_and_update_game_manager()
+            if game_manager.game_over_event is not None:
+                assert game_manager.game_over_event.victory_side == ai.ai_side
+                return
+    finally:
+        ai.close()
+    assert False
+
+
+def test_target_combinations() -> None:
+    def callback(
+        game_manager: GameManager, selected_targets: list[OddRCoord]
+    ) -> SkillResult:
+        return SkillCompleted.SUCCESS
+
+    targets = [OddRCoord(i, 0) for i in range(8)]
+    tailblazer = Tailblazer(OddRCoord(0, 0), Side.RAT)
+    skill_targeting = SkillTargeting(
+        3, tailblazer, tailblazer.skills[0], targets + targets[:2], callback, True
+    )
+    all_combinations = list(combinations(targets, 3))
+
+    unique = list(iter_target_combinations(skill_targeting, is_unique=True))
+    assert unique == all_combinations
+    best = list(
+        iter_target_combinations(
+            skill_targeting, score=lambda coord: coord.x, top_k=4, is_unique=True
+        )
+    )
+    assert best == list(combinations(reversed(targets[4:]), 3))
+    sampled = list(
+        iter_target_combinations(
+            skill_targeting, is_unique=True, max_count=20, rng=random.Random(0)
+        )
+    )
+    assert len(set(sampled)) == 20
+    assert sampled == [
+        combination for combination in all_combinations if combination in sampled
+    ]
+    spread = list(
+        iter_target_combinations(skill_targeting, is_unique=True, max_count=20)
+    )
+    assert len(set(spread)) == 20
+    assert spread == list(
+        iter_target_combinations(skill_targeting, is_unique=True, max_count=20)
+    )
+    assert spread[0] == all_combinations[0]
+
+
+@pytest.mark.integration
+def test_incremental_actions() -> None:
+    game_map = Map.from_file(STARTING_KITCHEN_PATH)
+    assert game_map is not None
+    player_info = AI_PLAYER_INFO["Balanced"]
+    game_manager = GameManager(
+        game_map, (player_info, player_info), player_1=Side.RAT, seed=0
+    )
+    ais = {side: RandomAI(game_manager, side) for side in Side}
+    snapshot = game_manager.snapshot()
+    for turn in range(60):
+        if turn == 30:
+            game_manager.restore(snapshot)
+        ai = ais[game_manager.turn]
+        for _ in ai._run_ai_and_update_game_manager():
+            if game_manager.skill_targeting is not None:
+                continue
+            actions = ai._get_all_actions()
+            expected = IncrementalActions(game_manager, ai.ai_side)
+            assert actions.move_ally == expected.get_move_ally()
+            assert actions.activate_skill == expected.get_activate_skill()
+            assert actions.place_squeak == expected.get_place_squeak()
+        if game_manager.game_over_event is not None:
+            break
+
+
+@pytest.mark.integration
+def test_background_ai() -> None:
+    game_map = Map.from_file(STARTING_KITCHEN_PATH)
+    assert game_map is not None
+    player_info = AI_PLAYER_INFO["Balanced"]
+    game_manager = GameManager(
+        game_map, (player_info, player_info), player_1=Side.RAT, seed=0
+    )
+    ai = RushBAI(game_manager, Side.RAT)
+    background_ai = BackgroundAI(game_manager, RushBAI, Side.MOUSE)
+    try:
+        for _ in range(20):
+            if game_manager.game_over_event is not None:
+                break
+            if game_manager.turn == Side.RAT:
+                ai.run_ai_and_update_game_manager()
+                continue
+            ai_turn = background_ai.start_turn().result()
+            assert ai_turn.action_count == len(game_manager.action_log)
+            assert background_ai.apply_turn(ai_turn)
+            assert not background_ai.apply_turn(ai_turn)
+            assert not background_ai.is_ai_turn()
+    finally:
+        background_ai.close()
+
+
+def test_backend_adapter_ai_turn() -> None:
+    game_map = Map.from_file(STARTING_KITCHEN_PATH)
+    assert game_map is not None
+    player_info = AI_PLAYER_INFO["Balanced"]
+    game_manager = GameManager(
+        game_map, (player_info, player_info), player_1=Side.RAT, seed=0
+    )
+    coordination_manager = CoordinationManager()
+    mailbox = coordination_manager.mailboxes[GameManagerEvent]
+    while not mailbox.empty():
+        mailbox.get_nowait()
+    adapter = BackendAdapter(
+        game_manager, cast("PageManager", None), coordination_manager, RushBAI
+    )
+    try:
+        adapter.handle_end_turn(GameManagerEvent("end_turn"))
+        assert adapter.is_ai_turn_pending()
+        # Player actions are ignored until the AI's turn is applied
+        action_count = len(game_manager.action_log)
+        adapter.handle_end_turn(GameManagerEvent("end_turn"))
+        assert len(game_manager.action_log) == action_count
+        assert adapter.ai is not None and adapter.ai.is_ai_turn()
+
+        deadline = time.monotonic() + 60
+        while mailbox.empty():
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        event = mailbox.get_nowait()
+        assert event.game_action == "ai_turn_done"
+        adapter.handle_ai_turn_done(event)
+        assert not adapter.is_ai_turn_pending()
+        assert len(game_manager.action_log) > action_count
+        assert game_manager.turn == Side.RAT
+
+        # The AI plays its turn in place if the worker fails
+        game_manager.end_turn()
+        failed_turn: Future[AITurn] = Future()
+        failed_turn.set_exception(RuntimeError("Worker died"))
+        adapter._ai_turn = failed_turn
+        adapter.handle_ai_turn_done(
+            GameManagerEvent("ai_turn_done", payload=AITurnPayload(failed_turn))
+        )
+        assert not adapter.is_ai_turn_pending()
+        assert game_manager.turn == Side.RAT
+    finally:
+        adapter.close()
+        while not mailbox.empty():
+            mailbox.get_nowait()
+
+
+@pytest.mark.integration
+def test_tournament() -> None:
+    setups = create_game_setups(
+        [STARTING_KITCHEN_PATH],
+        ("RushBAI", "RandomAI"),
+        ("Balanced", "Balanced"),
+        game_count=4,
+        seed=0,
+        max_turns=60,
+    )
+    assert {(setup.ai_1_side, setup.player_1) for setup in setups} == {
+        (ai_1_side, player_1) for ai_1_side in Side for player_1 in Side
+    }
+    results = run_tournament(setups, workers=1)
+    report = create_report(("RushBAI", "RandomAI"), results, wall_time=1)
+    assert report.games == 4
+    assert report.errors == 0
+    assert report.ais[0].wins + report.ais[1].wins + report.draws == 4
+    assert report.ais[0].turns > 0
+    assert report.ais[1].turns > 0
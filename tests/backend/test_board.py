@@ -1,12 +1,16 @@
 import pytest
 
 from ratroyale.backend.board import Board
+from ratroyale.backend.board_template import BoardTemplate
+from ratroyale.backend.entities.rodent import ENTITY_JUMP_HEIGHT
+from ratroyale.backend.entities.rodents.specialist import TheOne
 from ratroyale.backend.entities.rodents.vanguard import Tailblazer
 from ratroyale.backend.features.common import Lair
 from ratroyale.backend.game_event import EntitySpawnEvent
-from ratroyale.backend.hexagon import OddRCoord
+from ratroyale.backend.hexagon import OddRCoord, set_template_backend
 from ratroyale.backend.map import Map
 from ratroyale.backend.side import Side
+from ratroyale.backend.timer import Timer, TimerClearSide
 
 
 @pytest.fixture
@@ -32,6 +36,19 @@ def test_add_entity(empty_board: Board) -> None:
     assert empty_board.event_queue.get_or_none() == EntitySpawnEvent(tailblazer)
 
 
+def test_overridden_hooks(example_board: Board) -> None:
+    assert Tailblazer.overridden_hooks == {"on_turn_change"}
+    assert TheOne.overridden_hooks == {"on_ally_move"}
+    the_one = TheOne(OddRCoord(2, 2), Side.MOUSE)
+    example_board.add_entity(the_one)
+    cache = example_board.cache
+    assert list(cache.entities_with_on_ally_move[Side.MOUSE]) == [the_one]
+    assert not cache.entities_with_on_enemy_move[Side.RAT]
+    assert the_one not in cache.entities_with_turn_change
+    example_board.remove_entity(the_one)
+    assert not cache.entities_with_on_ally_move[Side.MOUSE]
+
+
 def test_get_tile(example_board: Board) -> None:
     tile = example_board.get_tile(OddRCoord(0, 0))
     assert tile is not None
@@ -60,3 +77,286 @@ def test_get_tile(example_board: Board) -> None:
 #     assert example_board.event_queue.get_or_none() == FeatureDamagedEvent(
 #         lair, damage, damage - lair.defense
 #     )
+
+
+def test_grid_neighbors(example_board: Board) -> None:
+    grid = example_board.grid
+    for index in range(grid.tile_count):
+        coord = grid.get_coord(index)
+        assert grid.get_index(coord) == index
+        for direction, neighbor in enumerate(coord.get_neighbors()):
+            neighbor_index = grid.neighbors[index * 6 + direction]
+            if example_board.get_tile(neighbor) is None:
+                assert neighbor_index == -1
+            else:
+                assert grid.get_coord(neighbor_index) == neighbor
+
+
+def test_get_reachable_coords(example_board: Board) -> None:
+    tailblazer = example_board.cache.rodents[0]
+
+    def is_coord_blocked(target_coord: OddRCoord, source_coord: OddRCoord) -> bool:
+        target_tile = example_board.get_tile(target_coord)
+        source_tile = example_board.get_tile(source_coord)
+        if target_tile is None or source_tile is None:
+            return True
+        if target_tile.is_collision(tailblazer.collision):
+            return True
+        return (
+            target_tile.get_total_height(tailblazer.side)
+            - source_tile.get_total_height(tailblazer.side)
+            > 1
+        )
+
+    for speed in range(6):
+        tailblazer.speed = speed
+        assert example_board.get_reachable_coords(
+            tailblazer
+        ) == tailblazer.pos.get_reachable_coords(speed, is_coord_blocked)
+
+
+def test_path_find(example_board: Board) -> None:
+    tailblazer = example_board.cache.entities_with_hp[0]
+    is_coord_blocked = example_board.is_coord_blocked(tailblazer)
+
+    def python_is_coord_blocked(
+        target_coord: OddRCoord, source_coord: OddRCoord
+    ) -> bool:
+        return is_coord_blocked(target_coord, source_coord)
+
+    for y in range(example_board.size_y):
+        for x in range(example_board.size_x):
+            goal = OddRCoord(x, y)
+            path = example_board.path_find(tailblazer, goal)
+            assert path == tailblazer.pos.path_find(goal, python_is_coord_blocked)
+            bidirectional_path = example_board.path_find(
+                tailblazer, goal, is_bidirectional=True
+            )
+            if path is None:
+                assert bidirectional_path is None
+                continue
+            assert bidirectional_path is not None
+            assert len(bidirectional_path) == len(path)
+            assert bidirectional_path[-1:] == path[-1:]
+
+
+def test_template_backend(example_board: Board) -> None:
+    tailblazer = example_board.cache.entities_with_hp[0]
+    assert isinstance(tailblazer, Tailblazer)
+    origin = OddRCoord(2, 3)
+    try:
+        set_template_backend(False)
+        expected_lines = [origin.line_draw(target) for target in origin.all_in_range(6)]
+        expected_attackable = [
+            list(example_board.get_attackable_coords(tailblazer, skill))
+            for skill in tailblazer.skills
+        ]
+        set_template_backend(True)
+        assert [
+            origin.line_draw(target) for target in origin.all_in_range(6)
+        ] == expected_lines
+        assert [
+            list(example_board.get_attackable_coords(tailblazer, skill))
+            for skill in tailblazer.skills
+        ] == expected_attackable
+    finally:
+        set_template_backend(True)
+
+
+def test_query_cache(example_board: Board) -> None:
+    tailblazer = example_board.cache.entities_with_hp[0]
+    assert isinstance(tailblazer, Tailblazer)
+    reachable_coords = example_board.get_reachable_coords(tailblazer)
+    assert example_board.get_reachable_coords(tailblazer) == reachable_coords
+    assert example_board.query_cache.hits == 1
+    assert example_board.query_cache.misses == 1
+
+    version = example_board.version
+    blocker = Tailblazer(OddRCoord(1, 0), Side.RAT)
+    example_board.add_entity(blocker)
+    assert example_board.version > version
+    assert OddRCoord(1, 0) not in example_board.get_reachable_coords(tailblazer)
+    assert example_board.query_cache.misses == 2
+
+
+def test_distance_map(example_board: Board) -> None:
+    tailblazer = example_board.cache.entities_with_hp[0]
+    goal = OddRCoord(4, 4)
+    distance_map = example_board.get_distance_map(
+        [goal], tailblazer.collision, tailblazer.side
+    )
+    assert distance_map is example_board.get_distance_map(
+        [goal], tailblazer.collision, tailblazer.side
+    )
+    for y in range(example_board.size_y):
+        for x in range(example_board.size_x):
+            coord = OddRCoord(x, y)
+            if example_board.get_tile(coord) is None:
+                assert distance_map.get_distance(coord) is None
+                continue
+            path = coord.path_find(goal, example_board.is_coord_blocked(tailblazer))
+            if path is None:
+                assert distance_map.get_distance(coord) is None
+                continue
+            assert distance_map.get_distance(coord) == len(path)
+            distance_path = distance_map.get_path(coord)
+            assert distance_path is not None
+            assert len(distance_path) == len(path)
+
+
+def test_total_heights(example_board: Board) -> None:
+    grid = example_board.grid
+    example_board.add_entity(Tailblazer(OddRCoord(1, 1), Side.RAT))
+    tailblazer = example_board.cache.entities_with_hp[0]
+    example_board.set_entity_height(tailblazer, 2)
+    for index, tile in enumerate(grid.tiles):
+        if tile is None:
+            continue
+        for side in (None, Side.RAT, Side.MOUSE):
+            assert grid.get_total_height(index, side) == tile.get_total_height(side)
+
+
+def test_remove_entity_clears_timers(example_board: Board) -> None:
+    tailblazer = example_board.cache.entities_with_hp[0]
+    for _ in range(3):
+        example_board.cache.add_timer(
+            Timer(
+                tailblazer,
+                TimerClearSide.ANY,
+                on_turn_change=None,
+                on_timer_over=None,
+                duration=1,
+            )
+        )
+    for entity in example_board.cache.entities_with_hp:
+        example_board.remove_entity(entity)
+    assert tailblazer not in example_board.cache.entities
+    assert len(example_board.cache.timers) == 0
+    assert tailblazer not in example_board.cache.entity_timers
+
+
+def test_threat_map(empty_board: Board) -> None:
+    empty_board.add_entity(Tailblazer(OddRCoord(1, 4), Side.MOUSE))
+    empty_board.add_entity(Tailblazer(OddRCoord(4, 1), Side.RAT))
+    threat_map = empty_board.get_threat_map()
+    assert threat_map is empty_board.get_threat_map()
+    expected: dict[Side, dict[OddRCoord, int]] = {Side.RAT: {}, Side.MOUSE: {}}
+    for rodent in list(empty_board.cache.rodents):
+        start = rodent.pos
+        attackable_coords: set[OddRCoord] = set()
+        for pos in empty_board.get_reachable_coords(rodent, is_include_self=True):
+            if pos != start:
+                assert empty_board.try_move(rodent, [pos])
+            for skill in rodent.skills:
+                if skill.reach is not None:
+                    attackable_coords.update(
+                        empty_board.get_attackable_coords(rodent, skill)
+                    )
+            if pos != start:
+                assert empty_board.try_move(rodent, [start])
+        assert rodent.side is not None
+        for coord in attackable_coords:
+            damages = expected[rodent.side]
+            damages[coord] = damages.get(coord, 0) + rodent.attack
+    for y in range(empty_board.size_y):
+        for x in range(empty_board.size_x):
+            coord = OddRCoord(x, y)
+            for side in Side:
+                damage = expected[side].get(coord, 0)
+                assert threat_map.get_damage(coord, side) == damage
+                assert threat_map.get_threat(coord, side.other_side()) == damage
+            rat_damage = expected[Side.RAT].get(coord, 0)
+            mouse_damage = expected[Side.MOUSE].get(coord, 0)
+            if rat_damage == mouse_damage:
+                assert threat_map.get_controller(coord) is None
+            else:
+                assert threat_map.get_controller(coord) == (
+                    Side.RAT if rat_damage > mouse_damage else Side.MOUSE
+                )
+
+
+def test_get_all_reachable_coords(example_board: Board) -> None:
+    example_board.add_entity(Tailblazer(OddRCoord(2, 4), Side.MOUSE))
+    example_board.add_entity(Tailblazer(OddRCoord(4, 1), Side.RAT))
+    rodents = list(example_board.cache.rodents)
+    masks = example_board.get_all_reachable_coords(rodents)
+    assert masks == example_board.get_all_reachable_coords(rodents)
+    for rodent in rodents:
+        coords = example_board.grid.get_coords_from_mask(masks[rodent])
+        assert set(coords) == example_board.get_reachable_coords(rodent)
+    # More starts than fit in one batch
+    tailblazer = rodents[0]
+    batch_masks = example_board.grid.get_reachable_masks(
+        [tailblazer.pos] * 70,
+        list(range(70)),
+        tailblazer.collision,
+        tailblazer.side,
+        ENTITY_JUMP_HEIGHT,
+    )
+    for reach, mask in enumerate(batch_masks):
+        assert set(example_board.grid.get_coords_from_mask(mask)) == set(
+            example_board.grid.get_reachable_coords(
+                tailblazer.pos,
+                reach,
+                tailblazer.collision,
+                tailblazer.side,
+                ENTITY_JUMP_HEIGHT,
+            )
+        )
+
+
+def test_get_attackable_masks(example_board: Board) -> None:
+    example_board.add_entity(Tailblazer(OddRCoord(2, 4), Side.MOUSE))
+    example_board.add_entity(Tailblazer(OddRCoord(4, 1), Side.RAT))
+    grid = example_board.grid
+    for side in Side:
+        masks = example_board.get_attackable_masks(side)
+        assert masks is example_board.get_attackable_masks(side)
+        assert {rodent for rodent, _ in masks} == {
+            rodent for rodent in example_board.cache.rodents if rodent.side == side
+        }
+        for (rodent, skill_index), mask in masks.items():
+            coords = [
+                coord
+                for coord in example_board.get_attackable_coords(
+                    rodent, rodent.skills[skill_index]
+                )
+                if grid.get_index(coord) != -1
+            ]
+            assert grid.get_coords_from_mask(mask) == sorted(coords, key=grid.get_index)
+            for tile in grid.tiles:
+                if tile is not None:
+                    assert grid.is_coord_in_mask(mask, tile.coord) == (
+                        tile.coord in coords
+                    )
+
+
+def test_board_template(example_map: Map) -> None:
+    example_map.entities.append(Tailblazer(OddRCoord(1, 1), Side.RAT))
+    board_template = BoardTemplate(example_map)
+    expected_board = Board(example_map)
+    board = board_template.create_board()
+    other_board = board_template.create_board()
+    assert board.version != other_board.version
+    tailblazer = board.cache.entities_with_hp[0]
+    assert tailblazer not in other_board.cache.entities
+    assert isinstance(tailblazer, Tailblazer)
+    assert tailblazer.is_on_speed_passive
+    tile = board.get_tile(OddRCoord(1, 1))
+    assert tile is not None and tile.entities == [tailblazer]
+    assert board.event_queue.get_or_none() == EntitySpawnEvent(tailblazer)
+    assert board.grid.get_state() == expected_board.grid.get_state()
+    assert str(board.tiles) == str(expected_board.tiles)
+
+    lair = board.cache.lairs[Side.RAT][0]
+    assert board.cache.features == [lair]
+    tile = board.get_tile(OddRCoord(0, 0))
+    assert tile is not None and tile.features == [lair]
+    board.remove_feature(lair)
+    board.set_entity_height(tailblazer, 2)
+    assert not board.cache.lairs[Side.RAT]
+    assert len(other_board.cache.lairs[Side.RAT]) == 1
+    assert other_board.grid.get_state() == expected_board.grid.get_state()
+    assert board_template.create_board().grid.get_state() == (
+        expected_board.grid.get_state()
+    )
@@ -0,0 +1,186 @@
+import pytest
+
+from ratroyale.backend.action_log import ActionLog, replay
+from ratroyale.backend.effects.global_rodent_effects import Slowed
+from ratroyale.backend.error import ReplayDesyncError
+from ratroyale.backend.features.common import DeploymentZone
+from ratroyale.backend.game_manager import GameManager
+from ratroyale.backend.hexagon import OddRCoord
+from ratroyale.backend.map import Map, heights_to_tiles
+from ratroyale.backend.player_info.player_info import PlayerInfo
+from ratroyale.backend.player_info.squeaks.rodents.vanguard import TAILBLAZER
+from ratroyale.backend.side import Side
+from ratroyale.backend.timer import Timer, TimerClearSide
+
+
+def create_map() -> Map:
+    return Map(
+        "Game Manager Map",
+        3,
+        1,
+        heights_to_tiles([[0, 0, 0]]),
+        entities=[],
+        features=[
+            DeploymentZone([OddRCoord(0, 0)], side=Side.RAT),
+            DeploymentZone([OddRCoord(2, 0)], side=Side.MOUSE),
+        ],
+    )
+
+
+def create_player_info() -> PlayerInfo:
+    return PlayerInfo(
+        {TAILBLAZER: 5},
+        [{TAILBLAZER: 5}],
+        [{TAILBLAZER: 5}],
+        selected_squeak_set_index=0,
+        exp=0,
+        cheese=0,
+        is_progression_frozen=True,
+    )
+
+
+@pytest.fixture
+def game_manager() -> GameManager:
+    player_info = create_player_info()
+    return GameManager(create_map(), (player_info, player_info), player_1=Side.RAT)
+
+
+def test_snapshot_restore(game_manager: GameManager) -> None:
+    game_manager.crumbs = 100
+    snapshot = game_manager.snapshot()
+    grid_state = game_manager.board.grid.get_state()
+    version = game_manager.board.version
+    for _ in range(2):
+        game_manager.place_squeak(0, OddRCoord(0, 0))
+        tailblazer = game_manager.board.cache.rodents[0]
+        game_manager.move_rodent(tailblazer, OddRCoord(1, 0))
+        game_manager.end_turn()
+        assert game_manager.turn != game_manager.player_1
+        game_manager.restore(snapshot)
+        assert game_manager.turn == game_manager.player_1
+        assert game_manager.crumbs == 100
+        assert len(game_manager.board.cache.entities) == 0
+        assert all(not tile.entities for tile in game_manager.board.tiles[0] if tile)
+        assert game_manager.board.grid.get_state() == grid_state
+        assert game_manager.board.version == version
+        assert game_manager.event_queue.get_or_none() is None
+
+
+def test_restore_other_game_manager(game_manager: GameManager) -> None:
+    snapshot = game_manager.snapshot()
+    other_game_manager = GameManager.__new__(GameManager)
+    with pytest.raises(ValueError):
+        other_game_manager.restore(snapshot)
+
+
+def test_journal_rollback(game_manager: GameManager) -> None:
+    game_manager.crumbs = 100
+    grid_state = game_manager.board.grid.get_state()
+    outer_journal = game_manager.begin_journal()
+    game_manager.place_squeak(0, OddRCoord(0, 0))
+    tailblazer = game_manager.board.cache.rodents[0]
+    inner_journal = game_manager.begin_journal()
+    game_manager.move_rodent(tailblazer, OddRCoord(1, 0))
+    game_manager.end_turn()
+    with pytest.raises(ValueError):
+        game_manager.rollback(outer_journal)
+    game_manager.rollback(inner_journal)
+    assert tailblazer.pos == OddRCoord(0, 0)
+    assert game_manager.turn == game_manager.player_1
+    assert tailblazer in game_manager.board.tiles[0][0].entities  # type: ignore[union-attr]
+    game_manager.rollback(outer_journal)
+    assert game_manager.crumbs == 100
+    assert len(game_manager.board.cache.entities) == 0
+    assert game_manager.board.grid.get_state() == grid_state
+    assert game_manager.event_queue.get_or_none() is None
+
+
+def test_effect_countdown(game_manager: GameManager) -> None:
+    game_manager.crumbs = 100
+    game_manager.place_squeak(0, OddRCoord(0, 0))
+    tailblazer = game_manager.board.cache.rodents[0]
+    speed = tailblazer.speed
+    slowed = Slowed(tailblazer, duration=2, intensity=1)
+    game_manager.apply_effect(slowed)
+    timers_over: list[Timer] = []
+    timer = Timer(
+        tailblazer,
+        TimerClearSide.ANY,
+        on_turn_change=None,
+        on_timer_over=lambda timer, game_manager: timers_over.append(timer),
+        duration=1,
+    )
+    game_manager.apply_timer(timer)
+    cache = game_manager.board.cache
+    assert slowed not in cache.effects_with_turn_change
+    assert timer not in cache.timers_with_turn_change
+
+    game_manager.end_turn()
+    assert timers_over == [timer]
+    assert timer not in cache.timers
+    game_manager.end_turn()
+    assert slowed.duration == 1
+    assert slowed.turn_passed == 1
+    assert tailblazer.speed == speed - 1
+
+    journal = game_manager.begin_journal()
+    game_manager.end_turn()
+    assert slowed not in cache.effects
+    assert tailblazer.speed == speed
+    game_manager.end_turn()
+    assert slowed.duration == 1
+    game_manager.rollback(journal)
+    assert slowed in cache.effects
+    assert slowed.duration == 1
+    assert tailblazer.speed == speed - 1
+
+
+def test_action_log_replay(game_manager: GameManager) -> None:
+    for _ in game_manager.event_queue:
+        pass
+    events = []
+    game_manager.place_squeak(0, OddRCoord(0, 0))
+    events.append([str(event) for event in game_manager.event_queue])
+    game_manager.move_rodent(game_manager.board.cache.rodents[0], OddRCoord(1, 0))
+    events.append([str(event) for event in game_manager.event_queue])
+    game_manager.end_turn()
+    events.append([str(event) for event in game_manager.event_queue])
+    action_log = ActionLog.load(game_manager.action_log.save())
+    assert action_log == game_manager.action_log
+
+    player_info = create_player_info()
+    players_info = (player_info, player_info)
+    replayed, replayed_events = replay(create_map(), players_info, action_log, events)
+    assert replayed_events == events
+    assert replayed.hands == game_manager.hands
+    assert replayed.decks == game_manager.decks
+    events[1].append("Something else")
+    with pytest.raises(ReplayDesyncError):
+        replay(create_map(), players_info, action_log, events)
+
+
+def test_preview_skill(game_manager: GameManager) -> None:
+    game_manager.crumbs = 100
+    game_manager.place_squeak(0, OddRCoord(0, 0))
+    rat_tailblazer = game_manager.board.cache.rodents[0]
+    for _ in game_manager.event_queue:
+        pass
+    version = game_manager.board.version
+    assert not rat_tailblazer.can_activate(0, game_manager)
+    assert rat_tailblazer.preview_targets(0, game_manager) == []
+    assert game_manager.board.version == version
+    game_manager.end_turn()
+    game_manager.crumbs = 100
+    game_manager.place_squeak(0, OddRCoord(2, 0))
+    mouse_tailblazer = game_manager.board.cache.rodents[1]
+    for _ in game_manager.event_queue:
+        pass
+    version = game_manager.board.version
+    generation = game_manager.event_queue.generation
+    assert mouse_tailblazer.can_activate(0, game_manager)
+    assert mouse_tailblazer.preview_targets(0, game_manager) == [OddRCoord(0, 0)]
+    assert game_manager.board.version == version
+    assert game_manager.event_queue.generation == generation
+    assert game_manager.event_queue.get_or_none() is None
+    assert game_manager.skill_targeting is None
+    assert len(game_manager.action_log) == 3
@@ -1,6 +1,80 @@
-from ratroyale.backend.map import Map
+from pathlib import Path
+
+import pytest
+
+from ratroyale.backend import map_catalog
+from ratroyale.backend.map import Map, MapHeader
+from ratroyale.backend.map_catalog import MapCatalog
+
+STARTING_KITCHEN_PATH = (
+    Path(__file__).parents[2] / "src/ratroyale/assets/rrmaps/starting-kitchen.rrmap"
+)
 
 
 def test_map_load_save(example_map: Map) -> None:
     map_bytes = example_map.save()
     assert map_bytes == Map.load(map_bytes).save()
+
+
+def test_map_load_tile_grids() -> None:
+    # Saved before tiles were stored as grids
+    old_map_bytes = STARTING_KITCHEN_PATH.read_bytes()
+    old_map = Map.load(old_map_bytes)
+    new_map = Map.load(old_map.save())
+    assert old_map.save() == new_map.save()
+    for old_row, new_row in zip(old_map.tiles, new_map.tiles):
+        for old_tile, new_tile in zip(old_row, new_row):
+            if old_tile is None:
+                assert new_tile is None
+                continue
+            assert new_tile is not None
+            assert new_tile.tile_id == old_tile.tile_id
+            assert new_tile.height == old_tile.height
+            assert new_tile.coord == old_tile.coord
+
+
+def _get_header(map: Map) -> MapHeader:
+    return MapHeader(
+        map.name, map.size_x, map.size_y, len(map.features), len(map.entities)
+    )
+
+
+def test_map_load_header(example_map: Map) -> None:
+    assert Map.load_header(example_map.save()) == _get_header(example_map)
+    old_map_bytes = STARTING_KITCHEN_PATH.read_bytes()
+    assert Map.load_header(old_map_bytes) == _get_header(Map.load(old_map_bytes))
+
+
+def test_map_catalog(
+    example_map: Map, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    (tmp_path / "example.rrmap").write_bytes(example_map.save())
+    (tmp_path / "kitchen.rrmap").write_bytes(STARTING_KITCHEN_PATH.read_bytes())
+    catalog = MapCatalog(tmp_path)
+    assert [entry.path.name for entry in catalog] == ["example.rrmap", "kitchen.rrmap"]
+    example_entry = catalog.get("example.rrmap")
+    assert example_entry is not None
+    assert example_entry.header == _get_header(example_map)
+    loaded_map = example_entry.load()
+    assert loaded_map is not None
+    assert loaded_map.save() == example_map.save()
+
+    def read_map_header(file_path: Path) -> MapHeader:
+        raise AssertionError(f"{file_path} should've come from the index")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(map_catalog, "read_map_header", read_map_header)
+        assert MapCatalog(tmp_path).entries == catalog.entries
+
+    example_map.name = "renamed"
+    (tmp_path / "example.rrmap").write_bytes(example_map.save())
+    example_entry = MapCatalog(tmp_path).get("example.rrmap")
+    assert example_entry is not None
+    assert example_entry.header.name == "renamed"
+
+    (tmp_path / "empty.rrmap").write_bytes(b"")
+    (tmp_path / "truncated.rrmap").write_bytes(example_map.save()[:8])
+    assert [entry.path.name for entry in MapCatalog(tmp_path)] == [
+        "example.rrmap",
+        "kitchen.rrmap",
+    ]